@@ -1,20 +1,30 @@
-from bs4 import BeautifulSoup
+import json
+import os
+
 from scrape_kit import ScrapeMode, fetch, get_logger
 
 from book_crawler.bookstores.BaseBookstore import BaseBookstore
-from book_framework.core.Book import Book, BookCategory, Offer
+from book_framework.core import HtmlParser
+from book_framework.core.Book import BookCategory
 
 logger = get_logger(__name__)
 
 ANTICARIAT_UNU_BASE_URL = "https://www.anticariat-unu.ro/"
 ANTICARIAT_UNU_NAME = "Anticariat Unu"
 ANTICARIAT_UNU_PAGE_QUERY = "/%s"  # %s start from 0 and increments 30 by 30
-MAX_CONCURRENCY = 3
+INITIAL_CONCURRENCY = 3  # starting limit; the domain's AIMD controller adapts it while scraping
+DISCOVERY_CONCURRENCY = 4  # categories searched at once during get_urls()
+# Last page with unsold books per category, from the previous discovery run; seeds the next search.
+DISCOVERY_STATE_PATH = "anticariat_unu_discovery.json"
 
 
 class AnticariatUnu(BaseBookstore):
-    def __init__(self, add_book_callback) -> None:
+    store_name = ANTICARIAT_UNU_NAME
+
+    def __init__(self, add_book_callback, state_path=DISCOVERY_STATE_PATH) -> None:
         super().__init__(add_book_callback)
+        self.state_path = state_path
+        self._last_pages = {}
         self.cats = {
             BookCategory.LITERATURE: [
                 "https://www.anticariat-unu.ro/autori-romani-c21",
@@ -64,60 +74,60 @@ class AnticariatUnu(BaseBookstore):
         }
 
     def get_urls(self):
-        """Discover available page URLs using binary search on each category."""
-        urls = []
+        """Discover available page URLs, searching each category for its last page with unsold books."""
         all_cat_urls = [url for urls in self.cats.values() for url in urls]
+        self._last_pages = _load_state(self.state_path)
 
         logger.info("Discovering Anticariat Unu URLs from %d categories", len(all_cat_urls))
-        for base_cat_url in all_cat_urls:
-            try:
-                resp = fetch(
-                    base_cat_url + ANTICARIAT_UNU_PAGE_QUERY % 0,
-                    stealthy_headers=True,
-                )
-                if not resp:
-                    logger.warning("No HTML for URL discovery page: %s", base_cat_url)
-                    continue
+        pages = self.discover(self._category_urls, all_cat_urls, max_concurrency=DISCOVERY_CONCURRENCY)
+        urls = [url for cat_urls in pages for url in cat_urls]
+        _save_state(self.state_path, self._last_pages)
 
-                soup = BeautifulSoup(resp, "html.parser")
-                last_page_tag = soup.find("li", class_="last")
-                if not last_page_tag:
-                    urls.append(base_cat_url + ANTICARIAT_UNU_PAGE_QUERY % 0)
-                    continue
+        logger.info("Discovered %d Anticariat Unu URLs", len(urls))
+        return urls
 
-                # Binary search to find the last page with unsold books
-                max_pages = int(last_page_tag.find("a")["data-ci-pagination-page"]) - 2
-                low, high = 0, max_pages
-                last_valid_page = 0
-
-                while low <= high:
-                    mid = (low + high) // 2
-                    resp_mid = fetch(
-                        base_cat_url + (ANTICARIAT_UNU_PAGE_QUERY % (mid * 30)),
-                        stealthy_headers=True,
-                    )
-                    if not resp_mid:
-                        high = mid - 1
-                        continue
-
-                    soup_mid = BeautifulSoup(resp_mid, "html.parser")
-                    # Count "VANDUT" (Sold) items
-                    sold_count = len([s for s in soup_mid.select("span.text-danger") if s.get_text(strip=True) == "VANDUT"])
-
-                    if sold_count < 30:  # If at least one book is available
-                        last_valid_page = mid
-                        low = mid + 1
-                    else:
-                        high = mid - 1
-
-                for i in range(last_valid_page + 1):
-                    urls.append(base_cat_url + (ANTICARIAT_UNU_PAGE_QUERY % (i * 30)))
+    def _category_urls(self, base_cat_url):
+        """Page URLs of one category, up to its last page with unsold books."""
+        try:
+            resp = fetch(
+                base_cat_url + ANTICARIAT_UNU_PAGE_QUERY % 0,
+                stealthy_headers=True,
+            )
+            if not resp:
+                logger.warning("No HTML for URL discovery page: %s", base_cat_url)
+                return []
 
-            except Exception as e:
-                logger.error("Error getting URLs for %s: %s", base_cat_url, e)
+            last_page_tags = HtmlParser.select(resp, "li.last")
+            if not last_page_tags:
+                return [base_cat_url + ANTICARIAT_UNU_PAGE_QUERY % 0]
 
-        logger.info("Discovered %d Anticariat Unu URLs", len(urls))
-        return urls
+            max_pages = int(last_page_tags[0].css_first("a").attr("data-ci-pagination-page")) - 2
+            probes = []
+
+            def has_unsold(page):
+                probes.append(page)
+                resp_page = fetch(
+                    base_cat_url + (ANTICARIAT_UNU_PAGE_QUERY % (page * 30)),
+                    stealthy_headers=True,
+                )
+                if not resp_page:
+                    return False
+                # Count "VANDUT" (Sold) items
+                sold_tags = HtmlParser.select(resp_page, "span.text-danger")
+                sold_count = len([s for s in sold_tags if s.text(strip=True) == "VANDUT"])
+                return sold_count < 30  # If at least one book is available
+
+            previous = self._last_pages.get(base_cat_url)
+            last_valid_page = last_true_page(has_unsold, max_pages, guess=previous)
+            self._last_pages[base_cat_url] = last_valid_page
+            logger.debug(
+                "Last unsold page of %s: %d (was %s, %d probes)", base_cat_url, last_valid_page, previous, len(probes)
+            )
+
+            return [base_cat_url + (ANTICARIAT_UNU_PAGE_QUERY % (i * 30)) for i in range(last_valid_page + 1)]
+        except Exception as e:
+            logger.error("Error getting URLs for %s: %s", base_cat_url, e)
+            return []
 
     def get_books(self, urls=None) -> None:
         """Entry point for scraping books."""
@@ -127,70 +137,123 @@ class AnticariatUnu(BaseBookstore):
             return
 
         logger.info("Scraping %d pages from Anticariat Unu", len(target_urls))
-        # Concurrency 10-20
         self.scrape_urls(
             target_urls,
             self._parse_page,
             mode=ScrapeMode.FAST,
-            max_concurrency=MAX_CONCURRENCY,
+            initial_concurrency=INITIAL_CONCURRENCY,
+            parse_rows=parse_rows,
         )
 
     def _parse_page(self, url, html) -> None:
         """Parser for a single page of results."""
-        try:
-            soup = BeautifulSoup(html, "html.parser")
-            # Extract bookstore's inner list container
-            book_anchors = soup.find_all(class_="book")
-            if not book_anchors:
-                return
-
-            # Determine category based on URL
-            category = BookCategory.NONE
-            for cat, cat_urls in self.cats.items():
-                if any(u in url for u in cat_urls):
-                    category = cat
-                    break
-
-            for book_anchor in book_anchors:
-                try:
-                    title_author_tag = book_anchor.find("h3").find("a")
-                    price_tag = book_anchor.find(class_="price")
-
-                    if not title_author_tag or not price_tag:
-                        continue
-
-                    # skip if already sold (has span.text-danger with VANDUT)
-                    sold_tag = book_anchor.find("span", class_="text-danger")
-                    if sold_tag and "VANDUT" in sold_tag.get_text():
-                        continue
-
-                    title_author = title_author_tag.get_text().strip()
-                    title, author = title_author, None
-
-                    # Split title and author using known separators
-                    for separator in [" de ", " by ", " par ", "..."]:
-                        if separator in title_author:
-                            parts = title_author.rsplit(separator, 1)
-                            title = parts[0].strip()
-                            author = parts[1].split(",")[0].strip()
-                            break
-
-                    book_url = title_author_tag["href"]
-                    if not book_url.startswith("http"):
-                        book_url = ANTICARIAT_UNU_BASE_URL.rstrip("/") + book_url
-
-                    price_text = price_tag.get_text().replace("Lei", "").replace(",", ".").strip()
-                    price = float(price_text)
-
-                    book = Book(
-                        title=title,
-                        author=author,
-                        isbn=None,
-                        category=category,
-                        offers=[Offer(ANTICARIAT_UNU_NAME, book_url, price)],
-                    )
-                    self.add_book(book)
-                except Exception as e:
-                    logger.debug("Skipping malformed Anticariat Unu row on %s: %s", url, e)
-        except Exception as e:
-            logger.error("Error parsing page %s: %s", url, e)
+        self.add_rows(url, parse_rows(url, html))
+
+
+def parse_rows(url, html, backend=None):
+    """(title, author, book url, price) of every unsold book on one listing page.
+
+    A pure function of the page, so the pipeline can run it in a worker process.
+    Only the book containers are parsed; backend picks the HtmlParser backend.
+    """
+    rows = []
+    try:
+        # Extract bookstore's inner list container
+        book_anchors = HtmlParser.select(html, ".book", backend)
+
+        for book_anchor in book_anchors:
+            try:
+                title_author_tag = book_anchor.css_first("h3 a")
+                price_tag = book_anchor.css_first(".price")
+
+                if not title_author_tag or not price_tag:
+                    continue
+
+                # skip if already sold (has span.text-danger with VANDUT)
+                sold_tag = book_anchor.css_first("span.text-danger")
+                if sold_tag and "VANDUT" in sold_tag.text():
+                    continue
+
+                title_author = title_author_tag.text(strip=True)
+                title, author = title_author, None
+
+                # Split title and author using known separators
+                for separator in [" de ", " by ", " par ", "..."]:
+                    if separator in title_author:
+                        parts = title_author.rsplit(separator, 1)
+                        title = parts[0].strip()
+                        author = parts[1].split(",")[0].strip()
+                        break
+
+                book_url = title_author_tag.attr("href")
+                if not book_url.startswith("http"):
+                    book_url = ANTICARIAT_UNU_BASE_URL.rstrip("/") + book_url
+
+                price_text = price_tag.text().replace("Lei", "").replace(",", ".").strip()
+                price = float(price_text)
+
+                rows.append((title, author, book_url, price))
+            except Exception as e:
+                logger.debug("Skipping malformed Anticariat Unu row on %s: %s", url, e)
+    except Exception as e:
+        logger.error("Error parsing page %s: %s", url, e)
+    return rows
+
+
+def last_true_page(predicate, max_page, guess=None):
+    """Largest page in [0, max_page] for which predicate holds, 0 if none.
+
+    The listing is ordered so that predicate holds up to some page and
+    never after it. Without a guess this is a plain binary search (about
+    log2(max_page) probes). With the previous run's answer as guess, it
+    gallops outward from the guess in steps of 1, 2, 4, ... until the
+    answer is bracketed, then bisects the bracket, so an unchanged boundary
+    costs two probes and one that moved by d costs about 2*log2(d).
+    """
+    lo, hi = -1, max_page + 1  # predicate(lo) holds, predicate(hi) does not (both are sentinels)
+    if guess is not None:
+        guess = min(max(int(guess), 0), max_page)
+        step = 1
+        if predicate(guess):
+            lo = guess
+            while lo + step <= max_page and predicate(lo + step):
+                lo += step
+                step *= 2
+            hi = min(lo + step, max_page + 1)
+        else:
+            hi = guess
+            while hi - step >= 0 and not predicate(hi - step):
+                hi -= step
+                step *= 2
+            lo = max(hi - step, -1)
+
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if predicate(mid):
+            lo = mid
+        else:
+            hi = mid
+    return max(lo, 0)
+
+
+def _load_state(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable discovery state %s: %s", path, e)
+        return {}
+    return {url: page for url, page in state.items() if isinstance(page, int)} if isinstance(state, dict) else {}
+
+
+def _save_state(path, last_pages):
+    """Write the state next to its destination and rename it over, so a crash never leaves half a file."""
+    try:
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(dict(sorted(last_pages.items())), f, indent=2)
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning("Could not save discovery state %s: %s", path, e)
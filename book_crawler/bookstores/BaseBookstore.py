@@ -1,15 +1,30 @@
+import queue
+import threading
 from abc import ABC, abstractmethod
-from collections.abc import Callable
+from collections import deque
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import suppress
 
-from scrape_kit import ScrapeMode, get_logger, scrape
+from scrape_kit import ScrapeMode, get_logger
+
+from book_framework.core.AdaptiveConcurrency import controller_for, scrape_adaptive
+from book_framework.core.Book import Book, BookCategory, Offer
 
 logger = get_logger(__name__)
 
+PIPELINE_QUEUE_SIZE = 64  # fetched pages waiting for a parser; fetching blocks beyond this
+_DONE = object()
+
 
 class BaseBookstore(ABC):
+    store_name = None  # name on the offers built by add_rows()
+    parse_workers = 0  # >0: parse pages in that many processes, see scrape_urls()
+
     def __init__(self, add_book_callback: Callable) -> None:
         super().__init__()
         self.add_book_callback = add_book_callback
+        self.cats = {}
 
     @abstractmethod
     def get_urls(self):
@@ -25,16 +40,128 @@ class BaseBookstore(ABC):
         """Parse a single scraped page. Used as callback for scrape_urls()."""
         raise NotImplementedError()
 
-    def scrape_urls(self, urls, callback, mode=ScrapeMode.FAST, max_concurrency=1) -> None:
-        """Scrape URLs with concurrency, calling callback(url, html) for each page."""
+    def discover(self, probe: Callable, items: Iterable, max_concurrency=1) -> list:
+        """Run probe(item) for every item on up to max_concurrency threads; results keep the item order.
+
+        Used by get_urls() to fetch the category probes of one store (one
+        domain) concurrently; max_concurrency is that domain's limit.
+        """
+        items = list(items)
+        if max_concurrency <= 1 or len(items) <= 1:
+            return [probe(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, len(items))) as pool:
+            return list(pool.map(probe, items))
+
+    def scrape_urls(self, urls, callback, mode=ScrapeMode.FAST, initial_concurrency=1, parse_rows=None) -> None:
+        """Scrape URLs with concurrency, calling callback(url, html) for each page.
+
+        Concurrency starts at initial_concurrency (unless concurrency_config.yaml
+        sets the domain's) and is adapted per wave by the domain's AIMD
+        controller, see AdaptiveConcurrency.
+
+        When the store has parse_workers and passes its module-level
+        parse_rows(url, html), pages are parsed in a process pool instead,
+        see _scrape_pipeline(); callback is then not used.
+        """
+        if not urls:
+            return
+        controller = controller_for(urls[0], initial=initial_concurrency)
+        pipelined = parse_rows is not None and self.parse_workers > 0
         logger.info(
-            "Starting scrape for %d URLs (mode=%s, concurrency=%d)",
+            "Starting scrape for %d URLs (mode=%s, concurrency=%d, parse workers=%d)",
             len(urls),
             mode,
-            max_concurrency,
+            controller.limit,
+            self.parse_workers if pipelined else 0,
         )
-        scrape(urls, callback, mode=mode, max_concurrency=max_concurrency)
-        logger.info("Finished scrape batch")
+        if pipelined:
+            self._scrape_pipeline(urls, parse_rows, mode, controller)
+        else:
+            scrape_adaptive(urls, callback, mode=mode, controller=controller)
+        logger.info("Finished scrape batch (concurrency now %d)", controller.limit)
+
+    def _scrape_pipeline(self, urls, parse_rows, mode, controller) -> None:
+        """Fetch, parse and store as three stages that overlap.
+
+        A thread runs the fetcher, which only queues (url, html) into a
+        bounded queue, so slow parsing holds fetching back instead of piling
+        pages up in memory. This thread feeds a process pool running
+        parse_rows, which must be a picklable pure function, and is the single
+        writer: it hands each page's rows to add_rows() in fetch order, so
+        add_book_callback never needs a lock.
+        """
+        pages = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        stopped = threading.Event()
+
+        def queue_page(url, html):
+            if not stopped.is_set():  # nobody reads the queue any more
+                pages.put((url, html))
+
+        def fetch_all():
+            try:
+                scrape_adaptive(urls, queue_page, mode=mode, controller=controller, stop=stopped)
+            except Exception as e:
+                logger.error("Fetching stopped early: %s", e)
+            finally:
+                pages.put(_DONE)
+
+        fetcher = threading.Thread(target=fetch_all, name=f"{type(self).__name__}-fetch", daemon=True)
+        fetcher.start()
+        try:
+            self._parse_pages(pages, parse_rows)
+        finally:
+            # If the pool broke or a write failed, the fetcher may be blocked on a full queue:
+            # stop it after the current wave and keep the queue drained until it has finished.
+            stopped.set()
+            while fetcher.is_alive():
+                with suppress(queue.Empty):
+                    pages.get(timeout=0.1)
+
+    def _parse_pages(self, pages: queue.Queue, parse_rows) -> None:
+        """Parse queued pages in the process pool and write their rows in queue order, until _DONE."""
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=self.parse_workers) as pool:
+            while True:
+                item = pages.get()
+                if item is _DONE:
+                    break
+                url, html = item
+                pending.append((url, pool.submit(parse_rows, url, html)))
+                # Keep a couple of pages per worker in flight; write the oldest once that is reached.
+                while len(pending) > 2 * self.parse_workers:
+                    self._write_rows(*pending.popleft())
+            while pending:
+                self._write_rows(*pending.popleft())
+
+    def _write_rows(self, url, future) -> None:
+        try:
+            rows = future.result()
+        except Exception as e:
+            logger.error("Error parsing page %s: %s", url, e)
+            return
+        self.add_rows(url, rows)
+
+    def category_of(self, url) -> BookCategory:
+        """Category of a page, from the category URL it was paged from."""
+        for cat, cat_urls in self.cats.items():
+            if any(u in url for u in cat_urls):
+                return cat
+        return BookCategory.NONE
+
+    def add_rows(self, url, rows) -> int:
+        """Add the (title, author, book url, price) rows parsed from one page; returns how many were added."""
+        category = self.category_of(url)
+        added = 0
+        for title, author, book_url, price in rows:
+            book = Book(
+                title=title,
+                author=author,
+                isbn=None,  # Will be rated later
+                category=category,
+                offers=[Offer(self.store_name, book_url, price)],
+            )
+            added += self.add_book(book)
+        return added
 
     def add_book(self, book) -> bool:
         """Add a book via callback."""
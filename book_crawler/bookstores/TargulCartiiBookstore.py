@@ -1,18 +1,21 @@
-from bs4 import BeautifulSoup
 from scrape_kit import ScrapeMode, fetch, get_logger
 
 from book_crawler.bookstores.BaseBookstore import BaseBookstore
-from book_framework.core.Book import Book, BookCategory, Offer
+from book_framework.core import HtmlParser
+from book_framework.core.Book import BookCategory
 
 logger = get_logger(__name__)
 
 TARGUL_CARTII_BASE_URL = "https://www.targulcartii.ro/"
 TARGUL_CARTII_NAME = "Targul Cartii"
 TARGUL_CARTII_PAGE_QUERY = "?limit=40&page=%s"
-MAX_CONCURRENCY = 3
+INITIAL_CONCURRENCY = 3  # starting limit; the domain's AIMD controller adapts it while scraping
+DISCOVERY_CONCURRENCY = 4  # category first pages fetched at once during get_urls()
 
 
 class TargulCartii(BaseBookstore):
+    store_name = TARGUL_CARTII_NAME
+
     def __init__(self, add_book_callback) -> None:
         super().__init__(add_book_callback)
         self.cats = {
@@ -33,33 +36,34 @@ class TargulCartii(BaseBookstore):
 
     def get_urls(self):
         """Return list of all page URLs to scrape."""
-        urls = []
         all_cat_urls = [url for urls in self.cats.values() for url in urls]
 
         logger.info("Discovering Targul Cartii URLs from %d categories", len(all_cat_urls))
-        for base_cat_url in all_cat_urls:
-            try:
-                first_page_url = base_cat_url + TARGUL_CARTII_PAGE_QUERY % 1
-                html = fetch(first_page_url, stealthy_headers=True)
-                if not html:
-                    logger.warning("No HTML for URL discovery page: %s", first_page_url)
-                    continue
-
-                soup = BeautifulSoup(html, "html.parser")
-                total_pages_tag = soup.find("span", class_="pagination_total_pages")
-                if not total_pages_tag:
-                    urls.append(first_page_url)
-                    continue
-
-                max_pages = int(total_pages_tag.get_text())
-                for i in range(max_pages):
-                    urls.append(base_cat_url + TARGUL_CARTII_PAGE_QUERY % (i + 1))
-            except Exception as e:
-                logger.error("Error getting URLs for %s: %s", base_cat_url, e)
+        pages = self.discover(self._category_urls, all_cat_urls, max_concurrency=DISCOVERY_CONCURRENCY)
+        urls = [url for cat_urls in pages for url in cat_urls]
 
         logger.info("Discovered %d Targul Cartii URLs", len(urls))
         return urls
 
+    def _category_urls(self, base_cat_url):
+        """Page URLs of one category, read from the page count on its first page."""
+        try:
+            first_page_url = base_cat_url + TARGUL_CARTII_PAGE_QUERY % 1
+            html = fetch(first_page_url, stealthy_headers=True)
+            if not html:
+                logger.warning("No HTML for URL discovery page: %s", first_page_url)
+                return []
+
+            total_pages_tags = HtmlParser.select(html, "span.pagination_total_pages")
+            if not total_pages_tags:
+                return [first_page_url]
+
+            max_pages = int(total_pages_tags[0].text())
+            return [base_cat_url + TARGUL_CARTII_PAGE_QUERY % (i + 1) for i in range(max_pages)]
+        except Exception as e:
+            logger.error("Error getting URLs for %s: %s", base_cat_url, e)
+            return []
+
     def get_books(self, urls=None) -> None:
         """Entry point for scraping books."""
         target_urls = urls if urls is not None else self.get_urls()
@@ -72,54 +76,51 @@ class TargulCartii(BaseBookstore):
             target_urls,
             self._parse_page,
             mode=ScrapeMode.STEALTH,
-            max_concurrency=MAX_CONCURRENCY,
+            initial_concurrency=INITIAL_CONCURRENCY,
+            parse_rows=parse_rows,
         )
 
     def _parse_page(self, url, html) -> None:
         """Parser for a single page of results."""
-        if "Pagina cautata nu exista pe acest site!" in html:
-            return
+        self.add_rows(url, parse_rows(url, html))
 
-        try:
-            soup = BeautifulSoup(html, "html.parser")
-            product_grid = soup.find(class_="product-grid")
-            if not product_grid:
-                return
-
-            book_rows = product_grid.find_all(class_="product-list-row")
-            for book_row in book_rows:
-                try:
-                    title_tag = book_row.find(class_="name").find("a")
-                    author_tag = book_row.find(class_="name").find(class_="author_name")
-                    price_tag = book_row.find(class_="price_value")
-
-                    if not title_tag or not price_tag:
-                        continue
-
-                    book_url = title_tag.get("href")
-                    if not book_url.startswith("http"):
-                        book_url = TARGUL_CARTII_BASE_URL.rstrip("/") + book_url
-
-                    title = title_tag.get("title")
-                    author = author_tag.get_text().strip() if author_tag else None
-                    price = float(price_tag.get_text().replace("LEI", "").strip())
-
-                    # Determine category based on URL
-                    category = BookCategory.NONE
-                    for cat, cat_urls in self.cats.items():
-                        if any(u in url for u in cat_urls):
-                            category = cat
-                            break
-
-                    book = Book(
-                        title=title,
-                        author=author,
-                        isbn=None,  # Will be rated later
-                        category=category,
-                        offers=[Offer(TARGUL_CARTII_NAME, book_url, price)],
-                    )
-                    self.add_book(book)
-                except Exception as e:
-                    logger.debug("Skipping malformed Targul Cartii row on %s: %s", url, e)
-        except Exception as e:
-            logger.error("Error parsing page %s: %s", url, e)
+
+def parse_rows(url, html, backend=None):
+    """(title, author, book url, price) of every book on one results page.
+
+    A pure function of the page, so the pipeline can run it in a worker process.
+    Only the product grid is parsed; backend picks the HtmlParser backend.
+    """
+    if "Pagina cautata nu exista pe acest site!" in html:
+        return []
+
+    rows = []
+    try:
+        product_grids = HtmlParser.select(html, ".product-grid", backend)
+        if not product_grids:
+            return []
+
+        book_rows = product_grids[0].css(".product-list-row")
+        for book_row in book_rows:
+            try:
+                title_tag = book_row.css_first(".name a")
+                author_tag = book_row.css_first(".name .author_name")
+                price_tag = book_row.css_first(".price_value")
+
+                if not title_tag or not price_tag:
+                    continue
+
+                book_url = title_tag.attr("href")
+                if not book_url.startswith("http"):
+                    book_url = TARGUL_CARTII_BASE_URL.rstrip("/") + book_url
+
+                title = title_tag.attr("title")
+                author = author_tag.text(strip=True) if author_tag else None
+                price = float(price_tag.text().replace("LEI", "").strip())
+
+                rows.append((title, author, book_url, price))
+            except Exception as e:
+                logger.debug("Skipping malformed Targul Cartii row on %s: %s", url, e)
+    except Exception as e:
+        logger.error("Error parsing page %s: %s", url, e)
+    return rows
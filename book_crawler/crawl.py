@@ -26,7 +26,9 @@ import random
 import sqlite3
 import sys
 import threading
+import time
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import redirect_stdout, suppress
 from types import SimpleNamespace
 from urllib.parse import urlparse
@@ -36,6 +38,7 @@ from scrape_kit import SettingsManager, configure, get_logger
 logger = get_logger(__name__)
 
 from book_framework.BooksManager import BooksManager
+from book_framework.core.AdaptiveConcurrency import configure_concurrency, metrics_text
 from book_framework.core.Goodreads import rateBooks
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -76,11 +79,48 @@ def get_runner_classes(runner: str) -> list:
     return [_STORE_KEYS[k]() for k in keys]
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Scrape concurrency
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def _configure_concurrency(config_dir: str) -> None:
+    """Per-domain AIMD limits from concurrency_config.yaml, signals from scraper_config.yaml's indicators."""
+    settings = SettingsManager(config_dir)
+    configure_concurrency(settings.get("concurrency_config"), settings.get("scraper_config"))
+
+
+def _write_concurrency_metrics(metrics_path: str | None) -> None:
+    if not metrics_path:
+        return
+    with open(metrics_path, "w", encoding="utf-8") as f:
+        f.write(metrics_text())
+    logger.info(f"📈 Concurrency metrics written to: {metrics_path}")
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Mode: prepare-scrape
 # ─────────────────────────────────────────────────────────────────────────────
 
 
+def _discover_store_urls(cls) -> tuple[list, float]:
+    """get_urls() of one store, retried up to 3 times; returns the URLs and the wall time spent."""
+    started = time.perf_counter()
+    instance = cls(None)
+    for attempt in range(3):
+        try:
+            new_urls = instance.get_urls()
+            if new_urls:
+                return new_urls, time.perf_counter() - started
+            logger.warning(f"⚠️  No URLs found for {cls.__name__} (attempt {attempt + 1}/3)")
+        except Exception as e:
+            logger.error(f"❌ Error in {cls.__name__}.get_urls() (attempt {attempt + 1}/3): {e}")
+
+        if attempt < 2:
+            time.sleep(2)
+    return [], time.perf_counter() - started
+
+
 def mode_prepare_scrape(runner: str, config_dir: str) -> None:
     configure(config_dir)
 
@@ -89,25 +129,19 @@ def mode_prepare_scrape(runner: str, config_dir: str) -> None:
         logger.error("❌ No stores found for runner type.")
         sys.exit(1)
 
+    # Stores are different domains, so they are discovered at the same time; each store
+    # limits its own category probes (DISCOVERY_CONCURRENCY in its module).
+    with (
+        open(os.devnull, "w") as devnull,
+        redirect_stdout(devnull),
+        ThreadPoolExecutor(max_workers=len(store_classes)) as pool,
+    ):
+        discovered = list(pool.map(_discover_store_urls, store_classes))
+
     urls = []
-    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
-        for cls in store_classes:
-            instance = cls(None)
-            for attempt in range(3):
-                try:
-                    new_urls = instance.get_urls()
-                    if new_urls:
-                        urls.extend(new_urls)
-                        break
-                    logger.warning(f"⚠️  No URLs found for {cls.__name__} (attempt {attempt + 1}/3)")
-                except Exception as e:
-                    logger.error(f"❌ Error in {cls.__name__}.get_urls() (attempt {attempt + 1}/3): {e}")
-
-                if attempt < 2:
-                    import time
-
-                    time.sleep(2)
-            del instance
+    for cls, (store_urls, seconds) in zip(store_classes, discovered, strict=True):
+        logger.info(f"⏱️  {cls.__name__}: {len(store_urls)} URLs discovered in {seconds:.1f}s")
+        urls.extend(store_urls)
 
     random.shuffle(urls)
 
@@ -133,8 +167,11 @@ def mode_prepare_scrape(runner: str, config_dir: str) -> None:
 # ─────────────────────────────────────────────────────────────────────────────
 
 
-def mode_scrape(books_db_path: str, urls_str: str, config_dir: str) -> None:
+def mode_scrape(
+    books_db_path: str, urls_str: str, config_dir: str, parse_workers: int = 0, metrics_path: str | None = None
+) -> None:
     configure(config_dir)
+    _configure_concurrency(config_dir)
 
     if os.path.isfile(urls_str):
         with open(urls_str, encoding="utf-8") as f:
@@ -161,11 +198,13 @@ def mode_scrape(books_db_path: str, urls_str: str, config_dir: str) -> None:
         logger.info(f"  [{i + 1}/{len(groups)}] Scraping {domain_key} ({len(group_urls)} URLs)...")
         try:
             store = get_store_class(group_urls[0])(_on_book)
+            store.parse_workers = parse_workers
             store.get_books(group_urls)
         except Exception as e:
             logger.error(f"    ⚠️ Error scraping {domain_key}: {e}")
 
     books_manager.close()
+    _write_concurrency_metrics(metrics_path)
     logger.info(f"✅ Scrape complete. Database saved to: {books_db_path}")
 
 
@@ -218,8 +257,9 @@ def mode_prepare_rate(books_db_path: str, chunks_dir: str) -> None:
 # ─────────────────────────────────────────────────────────────────────────────
 
 
-def mode_rate(books_db_path: str, urls_str: str, config_dir: str) -> None:
+def mode_rate(books_db_path: str, urls_str: str, config_dir: str, metrics_path: str | None = None) -> None:
     configure(config_dir)
+    _configure_concurrency(config_dir)
 
     conn = sqlite3.connect(books_db_path, check_same_thread=False)
     cursor = conn.cursor()
@@ -262,6 +302,7 @@ def mode_rate(books_db_path: str, urls_str: str, config_dir: str) -> None:
     rateBooks(books, _save_rating_to_chunk, similarity_config=similarity_config)
 
     conn.close()
+    _write_concurrency_metrics(metrics_path)
     logger.info(f"🏁 Finished. Results saved in {books_db_path}")
 
 
@@ -281,6 +322,8 @@ def mode_merge(books_db_path: str, chunks_dir: str, config_dir: str) -> None:
     books_manager.reset_db()
     books_manager.merge_databases(chunks_dir)
     books_manager.close()
+    # Ratings still change this DB, so the column store is only written after apply-rates.
+    BooksManager.finalize_release(books_db_path, column_store=False)
 
     logger.info(f"✅ Merged into: {books_db_path}")
 
@@ -346,6 +389,7 @@ def mode_apply_rates(books_db_path: str, chunks_dir: str) -> None:
                 cursor.execute("DETACH DATABASE chunk_db")
 
     main_conn.close()
+    BooksManager.finalize_release(books_db_path)
     logger.info(f"🏁 Final Rated Database saved at: {books_db_path}")
 
 
@@ -382,6 +426,13 @@ def build_parser() -> argparse.ArgumentParser:
     # Backward-compatible alias.
     p.add_argument("--config_path", dest="config_dir", help=argparse.SUPPRESS)
     p.add_argument("--runners", choices=list(_RUNNER_SETS.keys()))
+    p.add_argument(
+        "--parse_workers",
+        type=int,
+        default=0,
+        help="scrape: parse pages in this many processes while fetching continues (0: parse inline)",
+    )
+    p.add_argument("--metrics_path", help="scrape/rate: write the concurrency controller's metrics (Prometheus text) here")
     return p
 
 
@@ -396,7 +447,7 @@ if __name__ == "__main__":
     elif args.mode == "scrape":
         if not args.urls or not args.books_db_path or not args.config_dir:
             build_parser().error("--urls, --books_db_path, and --config_dir are required for scrape")
-        mode_scrape(args.books_db_path, args.urls, args.config_dir)
+        mode_scrape(args.books_db_path, args.urls, args.config_dir, args.parse_workers, args.metrics_path)
 
     elif args.mode == "prepare-rate":
         if not args.books_db_path or not args.chunks_dir:
@@ -406,7 +457,7 @@ if __name__ == "__main__":
     elif args.mode == "rate":
         if not args.urls or not args.books_db_path or not args.config_dir:
             build_parser().error("--urls, --books_db_path, and --config_dir are required for rate")
-        mode_rate(args.books_db_path, args.urls, args.config_dir)
+        mode_rate(args.books_db_path, args.urls, args.config_dir, args.metrics_path)
 
     elif args.mode == "merge":
         if not args.books_db_path or not args.chunks_dir or not args.config_dir:
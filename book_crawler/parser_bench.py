@@ -0,0 +1,119 @@
+"""
+Parser benchmark — pages/s of each page parser per HTML backend
+===============================================================
+Runs the Targul Cartii, Anticariat Unu and Goodreads search parsers over
+the same pages once per installed HtmlParser backend and prints one line
+per (parser, backend): pages/s, and whether the rows match bs4's.
+
+    python -m book_crawler.parser_bench --books 40 --repeat 200
+    python -m book_crawler.parser_bench --parser targul --pages saved/*.html
+
+Without --pages it times synthetic pages shaped like the real listings,
+padded with navigation markup the strainers skip; pass pages saved from the
+sites for real numbers. Install selectolax and/or lxml + cssselect to see
+their rows. Parsing is single-threaded, so the numbers are per core.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from book_crawler.bookstores.AnticariatUnuBookstore import parse_rows as anticariat_rows  # noqa: E402
+from book_crawler.bookstores.TargulCartiiBookstore import parse_rows as targul_rows  # noqa: E402
+from book_framework.core import HtmlParser  # noqa: E402
+from book_framework.core.Goodreads import _parse_search_page  # noqa: E402
+
+# Menus, filters and footers around the product list: what a strained parse skips.
+_CHROME = "".join(f'<li class="menu"><a href="/c{i}">Categorie {i}</a><span>({i})</span></li>' for i in range(300))
+
+
+class _AlwaysSimilar:
+    def is_similar(self, a, b):
+        return False, 0.0  # no match, so every result row is read
+
+
+def _page(body: str) -> str:
+    return f"<html><head><title>x</title></head><body><ul>{_CHROME}</ul>{body}<ul>{_CHROME}</ul></body></html>"
+
+
+def _targul_page(books: int) -> str:
+    rows = "".join(
+        f'<div class="product-list-row"><div class="image"><img src="/i{i}.jpg"></div><div class="name">'
+        f'<a href="/carte-{i}" title="Carte {i}">Carte {i}</a><span class="author_name">Autor {i}</span></div>'
+        f'<div class="price"><span class="price_value">{10 + i}.50 LEI</span></div></div>'
+        for i in range(books)
+    )
+    return _page(f'<div class="product-grid">{rows}</div>')
+
+
+def _anticariat_page(books: int) -> str:
+    rows = "".join(
+        f'<div class="book"><img src="/i{i}.jpg"><h3><a href="/carte-{i}">Carte {i} de Autor {i}, Editura</a></h3>'
+        f'<span class="price">{10 + i},50 Lei</span>{"<span class=text-danger>VANDUT</span>" if i % 3 == 0 else ""}</div>'
+        for i in range(books)
+    )
+    return _page(rows)
+
+
+def _goodreads_page(books: int) -> str:
+    rows = "".join(
+        f'<tr itemtype="http://schema.org/Book"><td><a href="book/show/{i}"><img src="/i{i}.jpg"></a></td><td>'
+        f'<a class="bookTitle"><span itemprop="name">Carte {i}</span></a>'
+        f'<a class="authorName"><span itemprop="name">Autor {i}</span></a>'
+        f'<span class="minirating">4.{i % 10}0 avg rating — 1,{i:03d} ratings</span></td></tr>'
+        for i in range(books)
+    )
+    return _page(f"<table>{rows}</table>")
+
+
+PARSERS = {
+    "targul": (lambda html, backend: targul_rows("bench", html, backend), _targul_page),
+    "anticariat": (lambda html, backend: anticariat_rows("bench", html, backend), _anticariat_page),
+    "goodreads": (
+        lambda html, backend: _parse_search_page(html, "title", "author", _AlwaysSimilar(), backend),
+        _goodreads_page,
+    ),
+}
+
+
+def _bench(parse, pages: list[str], backend: str, repeat: int) -> tuple[float, list]:
+    rows = [parse(html, backend) for html in pages]  # warm-up, and the rows to compare
+    n = 0
+    start = time.perf_counter()
+    while n < repeat:
+        for html in pages:
+            parse(html, backend)
+            n += 1
+    return n / (time.perf_counter() - start), rows
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--parser", choices=list(PARSERS), action="append", help="parsers to time (default: all)")
+    p.add_argument("--pages", nargs="*", help="saved HTML pages to parse instead of synthetic ones (one --parser)")
+    p.add_argument("--books", type=int, default=40, help="books per synthetic page")
+    p.add_argument("--repeat", type=int, default=200, help="pages parsed per measurement")
+    args = p.parse_args()
+
+    names = args.parser or list(PARSERS)
+    if args.pages and len(names) != 1:
+        p.error("--pages needs exactly one --parser")
+
+    print(f"backends: {', '.join(HtmlParser.available_backends())}")
+    for name in names:
+        parse, make_page = PARSERS[name]
+        pages = [Path(f).read_text(encoding="utf-8") for f in args.pages] if args.pages else [make_page(args.books)]
+        baseline = None
+        for backend in reversed(HtmlParser.available_backends()):  # bs4 first: it is the reference
+            rate, rows = _bench(parse, pages, backend, args.repeat)
+            baseline = rows if baseline is None else baseline
+            same = "same rows" if rows == baseline else "ROWS DIFFER from bs4"
+            print(f"{name:<11} {backend:<11} {rate:9.1f} pages/s  {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Load test — throughput of the backend per worker count
+======================================================
+Starts the API once per worker count against the same DB, drives it with a
+fixed mix of /api/books (search, filters, sorts, deep pages) and
+/api/recommendations calls from concurrent clients, and prints one line per
+run: requests/s, latency percentiles, and how many requests were shed with
+503 by the backpressure gate.
+
+    pip install -r requirements-dev.txt
+    python loadtest.py --db ../../final_books.db --workers 1 2 4 --concurrency 64 --duration 20
+
+Throughput should grow with the worker count up to the number of cores the
+server may use; past that it flattens and 503s appear instead of latency
+growing without bound. The client runs in this process too, so on a small
+machine pin the server (e.g. `taskset`) or read the numbers as a lower
+bound. Nothing here is specific to one engine; pass --engine sql to measure
+BOOKS_ENGINE=sql.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).parent
+REPO_ROOT = BACKEND_DIR.parent.parent
+SORTS = ("title", "author", "price", "rating")
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def _start_server(db: str, workers: int, port: int, engine: str) -> subprocess.Popen:
+    python_path = os.pathsep.join(p for p in (str(REPO_ROOT), os.getenv("PYTHONPATH")) if p)
+    env = dict(os.environ, BOOKS_DB_PATH=str(Path(db).resolve()), BOOKS_ENGINE=engine, PYTHONPATH=python_path)
+    cmd = [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", str(workers)]
+    cmd += ["--log-level", "warning"]
+    return subprocess.Popen(cmd, cwd=BACKEND_DIR, env=env)
+
+
+async def _wait_ready(client: httpx.AsyncClient, workers: int, timeout: float) -> None:
+    """Wait until /api/filters answers, then a few more times so every worker has its snapshot."""
+    deadline = time.monotonic() + timeout
+    ok = 0
+    while ok < 4 * workers:
+        if time.monotonic() > deadline:
+            raise TimeoutError("server did not come up")
+        try:
+            status = (await client.get("/api/filters")).status_code
+        except httpx.TransportError:
+            status = None
+        ok = ok + 1 if status == 200 else 0
+        if status != 200:
+            await asyncio.sleep(0.5)
+
+
+async def _request_mix(client: httpx.AsyncClient, seed: int) -> list:
+    """Deterministic list of (method, path, params/json) built from the catalog's own filters and titles."""
+    filters = (await client.get("/api/filters")).json()
+    titles = [b["title"] for b in (await client.get("/api/books", params={"page_size": 100})).json()["books"]]
+    words = sorted({w for t in titles for w in t.lower().split() if len(w) > 3}) or ["a"]
+    rng = random.Random(seed)
+
+    mix = []
+    for _ in range(500):
+        kind = rng.random()
+        if kind < 0.7:
+            params = {"sort_by": rng.choice(SORTS), "sort_dir": rng.choice(("asc", "desc")), "page": rng.randint(1, 50)}
+            if rng.random() < 0.5:
+                params["search"] = rng.choice(words)[: rng.randint(3, 6)]
+            if filters["categories"] and rng.random() < 0.3:
+                params["categories"] = rng.choice(filters["categories"])
+            if filters["stores"] and rng.random() < 0.3:
+                params["stores"] = rng.choice(filters["stores"])
+            mix.append(("GET", "/api/books", params))
+        else:
+            budget = round(rng.uniform(20, 300), 2)
+            mix.append(("POST", "/api/recommendations", {"budget": budget, "subject": "Any", "source": "Any Available"}))
+    return mix
+
+
+async def _drive(client: httpx.AsyncClient, mix: list, concurrency: int, duration: float) -> dict:
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    errors = 0
+    deadline = time.monotonic() + duration
+
+    async def _client(offset: int) -> None:
+        nonlocal errors
+        i = offset
+        while time.monotonic() < deadline:
+            method, path, payload = mix[i % len(mix)]
+            i += concurrency
+            started = time.perf_counter()
+            try:
+                if method == "GET":
+                    response = await client.get(path, params=payload)
+                else:
+                    response = await client.post(path, json=payload)
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.monotonic()
+    await asyncio.gather(*(_client(i) for i in range(concurrency)))
+    elapsed = time.monotonic() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "rps": statuses.get(200, 0) / elapsed,
+        "p50": _percentile(latencies, 0.50),
+        "p95": _percentile(latencies, 0.95),
+        "p99": _percentile(latencies, 0.99),
+        "shed": statuses.get(503, 0),
+        "errors": errors + sum(n for code, n in statuses.items() if code not in (200, 503)),
+    }
+
+
+async def _run(args: argparse.Namespace) -> None:
+    if args.engine == "sql":
+        # The server only serves prepared releases; prepare an ad-hoc DB once, before any worker opens it.
+        sys.path.insert(0, str(REPO_ROOT))
+        from book_framework.catalog import SqlCatalog
+
+        SqlCatalog.prepare_db(args.db)
+    print(f"{'workers':>7} {'requests':>9} {'ok req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'503':>6} {'errors':>6}")
+    for workers in args.workers:
+        server = _start_server(args.db, workers, args.port, args.engine)
+        try:
+            limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=60) as client:
+                await _wait_ready(client, workers, args.startup_timeout)
+                mix = await _request_mix(client, args.seed)
+                await _drive(client, mix, args.concurrency, args.warmup)
+                r = await _drive(client, mix, args.concurrency, args.duration)
+        finally:
+            server.terminate()
+            server.wait()
+        print(
+            f"{workers:>7} {r['requests']:>9} {r['rps']:>9.1f} {r['p50'] * 1000:>8.1f} {r['p95'] * 1000:>8.1f}"
+            f" {r['p99'] * 1000:>8.1f} {r['shed']:>6} {r['errors']:>6}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=os.getenv("BOOKS_DB_PATH", "final_books.db"))
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20, help="measured seconds per run")
+    parser.add_argument("--warmup", type=float, default=5, help="unmeasured seconds per run (fills query caches)")
+    parser.add_argument("--engine", choices=("pandas", "sql"), default="pandas")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--startup-timeout", type=float, default=300)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
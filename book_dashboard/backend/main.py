@@ -2,37 +2,106 @@
 Classic Librarian — FastAPI Backend
 =====================================
 Endpoints:
-  GET  /api/books            paginated, filtered, sorted catalog
+  GET  /api/books            paginated, filtered, sorted catalog (page numbers or keyset cursor)
+  GET  /api/books/export     the whole filtered, sorted result streamed as NDJSON or CSV
+  GET  /api/autocomplete     typeahead: best-rated titles/authors starting with the typed prefix
   GET  /api/filters          available categories, stores, price bounds
+  GET  /api/facets           per-category/per-store counts and a price histogram under the current filters
   GET  /api/insights         stats + top-rated + books-per-category
-  POST /api/recommendations  greedy-knapsack bundle within a budget
+  POST /api/recommendations  best-rated bundle within a budget (bounded knapsack)
+  GET  /api/diagnostics      memory footprint of the live snapshot and this worker process
+  GET  /api/metrics          Prometheus text: per-route latency, /api/books stage timings, snapshot gauges
+
+/api/filters and /api/insights are computed once per DB snapshot and served
+as pre-serialized JSON with an ETag; clients sending If-None-Match get a 304.
 
 Environment:
-  BOOKS_DB_PATH   path to the SQLite database  (default: final_books.db)
+  BOOKS_DB_PATH          path to the SQLite database  (default: final_books.db); with the pandas
+                         engine, a matching column store next to it (final_books.columns) is
+                         memory-mapped instead of rebuilding the catalog and its indexes
+  BOOKS_RELOAD_INTERVAL  seconds between checks for a new DB release  (default: 30)
+  BOOKS_ENGINE           "pandas" (whole catalog in memory, default) or "sql"
+                         (queries pushed down to SQLite with FTS5; for catalogs larger than RAM).
+                         The DB must be a finalized release: the server never writes to it
+  BOOKS_WORKERS          server processes started by the Docker image  (default: 1)
+  BOOKS_CPU_SLOTS        heavy requests (/api/books, export, facets, recommendations) computing at once
+                         per process  (default: 2)
+  BOOKS_CPU_BACKLOG      heavy requests allowed to wait for a slot before answering 503  (default: 16)
+  BOOKS_CPU_WAIT         seconds a heavy request may wait for a slot before answering 503  (default: 10)
 
 Run:
   uvicorn api.main:app --reload --port 8000
+
+Several workers:
+  uvicorn main:app --workers 4 --port 8000
+  Each worker loads its own snapshot in the background. Memory is shared
+  through the page cache rather than fork copy-on-write (refcount updates
+  would dirty every page of the object columns anyway): with the pandas
+  engine every worker maps the same final_books.columns, with the SQL engine
+  every worker maps the same DB file. loadtest.py measures the scaling.
+  Metrics are per process; every series carries a pid label that tells
+  workers apart (histograms also carry the engine).
 """
 
 from __future__ import annotations
 
+import csv
+import functools
+import hashlib
+import io
+import json
 import math
 import os
+import resource
 import sys
+import time
+from contextlib import ExitStack, asynccontextmanager
 from pathlib import Path
+from typing import Annotated
 
+import numpy as np
 import pandas as pd
-from fastapi import FastAPI, Query
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - falls back to the stdlib encoder
+    orjson = None
+
 # Allow running from repo root: `uvicorn api.main:app`
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from book_framework.BooksManager import BooksManager  # noqa: E402
+from book_framework.catalog import (  # noqa: E402
+    CatalogQuery,
+    CatalogSnapshot,
+    ColumnStore,
+    PageCursor,
+    SnapshotManager,
+    SqlCatalog,
+    Overloaded,
+    WorkGate,
+    category_counts,
+    open_column_store,
+    plain_values,
+    solve_bundle,
+)
+from book_framework.core.Metrics import Metrics  # noqa: E402
 
 # ── App & CORS ────────────────────────────────────────────────────────────────
 
-app = FastAPI(title="Classic Librarian API", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Start loading before the first request arrives; a missing DB is reported per request.
+    _snapshots.start()
+    yield
+    _snapshots.stop()
+
+
+app = FastAPI(title="Classic Librarian API", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -45,131 +114,532 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# ── DB bootstrap (lazy, cached) ───────────────────────────────────────────────
+# ── Metrics ───────────────────────────────────────────────────────────────────
 
-DB_PATH = os.getenv("BOOKS_DB_PATH", "final_books.db")
-_manager: BooksManager | None = None
-_df_cache: pd.DataFrame | None = None
+metrics = Metrics()
+metrics.describe("http_request_duration_seconds", "Request latency by route template, method and status")
+metrics.describe("catalog_stage_seconds", "Time per catalog stage: filter, sort, paginate, serialize, facets (query on SQL)")
 
 
-def get_df() -> pd.DataFrame:
-    """Load + cache the full DataFrame on first call."""
-    global _manager, _df_cache
-    if _df_cache is None:
-        if not os.path.exists(DB_PATH):
-            raise FileNotFoundError(f"Database not found at '{DB_PATH}'. Set the BOOKS_DB_PATH environment variable.")
-        _manager = BooksManager(DB_PATH)
-        _df_cache = _manager.fetch_all_as_dataframe()
-        # Ensure category is always a list
-        if "category" in _df_cache.columns:
-            _df_cache["category"] = _df_cache["category"].apply(
-                lambda x: (
-                    x
-                    if isinstance(x, list)
-                    else (
-                        [s.strip() for s in str(x).split(",") if s.strip()]
-                        if x and not (isinstance(x, float) and math.isnan(x))
-                        else []
-                    )
-                )
+class LatencyMiddleware:
+    """Plain ASGI middleware (no per-request task or body buffering) timing every HTTP request.
+
+    Requests are labelled by route template, so /api/books?page=7 and page=8
+    share one histogram; streamed responses are timed until their last chunk.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def _send(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            route = scope.get("route")
+            metrics.observe(
+                "http_request_duration_seconds",
+                time.perf_counter() - started,
+                route=getattr(route, "path", "unmatched"),
+                method=scope["method"],
+                status=str(status),
             )
-    return _df_cache
 
 
-def _serialize(row: dict) -> dict:
-    """Replace NaN/float-nan with None for clean JSON output."""
-    out = {}
-    for k, v in row.items():
-        if isinstance(v, list):
-            out[k] = v
-        elif isinstance(v, float) and math.isnan(v) or (pd.isna(v) if not isinstance(v, (list, dict, str, bool)) else False):
-            out[k] = None
-        else:
-            out[k] = v
-    return out
+app.add_middleware(LatencyMiddleware)
 
+# ── Backpressure ─────────────────────────────────────────────────────────────
 
-def _apply_filters(
-    df: pd.DataFrame,
-    search: str | None,
-    categories: list[str],
-    stores: list[str],
-    min_rating: float | None,
-    min_price: float | None,
-    max_price: float | None,
-) -> pd.DataFrame:
-    if search:
-        q = search.strip()
-        mask = df["title"].str.contains(q, case=False, na=False) | df["author"].str.contains(q, case=False, na=False)
-        df = df[mask]
+_cpu = WorkGate(
+    limit=int(os.getenv("BOOKS_CPU_SLOTS", "2")),
+    backlog=int(os.getenv("BOOKS_CPU_BACKLOG", "16")),
+    timeout=float(os.getenv("BOOKS_CPU_WAIT", "10")),
+)
+
+
+def _bounded(handler):
+    """Run a CPU-heavy sync handler inside a _cpu slot; FastAPI still sees the original signature."""
+
+    @functools.wraps(handler)
+    def wrapper(*args, **kwargs):
+        with _cpu.slot():
+            return handler(*args, **kwargs)
+
+    return wrapper
+
+
+class _GatedStream:
+    """Streaming body that keeps a _cpu slot until its last chunk is produced, it fails, or it is dropped.
+
+    A StreamingResponse is consumed after the handler has returned, so a slot
+    taken by _bounded would be free again while the rows are still encoded.
+    """
+
+    def __init__(self, slot: ExitStack, chunks) -> None:
+        self._slot = slot
+        self._chunks = chunks
 
-    if categories:
-        cats_lower = [c.lower() for c in categories]
-        df = df[df["category"].apply(lambda x: any(c.lower() in cats_lower for c in x) if isinstance(x, list) else False)]
+    def __iter__(self):
+        return self
 
-    if stores:
-        df = df[df["store"].isin(stores)]
+    def __next__(self) -> bytes:
+        try:
+            return next(self._chunks)
+        except BaseException:
+            self.close()
+            raise
 
-    if min_rating is not None and min_rating > 0:
-        df = df[df["rating"].notna() & (df["rating"] >= min_rating)]
+    def close(self) -> None:
+        close = getattr(self._chunks, "close", None)
+        if close is not None:
+            close()
+        self._slot.close()  # idempotent: the slot is released once
 
-    if min_price is not None:
-        df = df[df["price"] >= min_price]
+    def __del__(self) -> None:
+        # A client that disconnects before the end leaves the iterator unfinished.
+        self.close()
 
-    if max_price is not None:
-        df = df[df["price"] <= max_price]
 
+@app.exception_handler(Overloaded)
+def _overloaded(_request: Request, exc: Overloaded) -> JSONResponse:
+    return JSONResponse({"detail": f"Server busy: {exc}"}, status_code=503, headers={"Retry-After": "1"})
+
+
+# ── DB snapshots (background load, hot-swapped) ──────────────────────────────
+
+DB_PATH = os.getenv("BOOKS_DB_PATH", "final_books.db")
+RELOAD_INTERVAL = float(os.getenv("BOOKS_RELOAD_INTERVAL", "30"))
+ENGINE = os.getenv("BOOKS_ENGINE", "pandas").strip().lower()
+
+
+def _load_books(db_path: str) -> pd.DataFrame | ColumnStore:
+    """Read the whole DB into a DataFrame, or map its column store; runs on the snapshot watcher thread."""
+    store = open_column_store(db_path)
+    if store is not None:
+        return store
+
+    manager = BooksManager(db_path)
+    try:
+        df = manager.fetch_all_as_dataframe()
+    finally:
+        manager.close()
+    # Ensure category is always a list
+    if "category" in df.columns:
+        df["category"] = df["category"].apply(
+            lambda x: (
+                x
+                if isinstance(x, list)
+                else (
+                    [s.strip() for s in str(x).split(",") if s.strip()]
+                    if x and not (isinstance(x, float) and math.isnan(x))
+                    else []
+                )
+            )
+        )
     return df
 
 
+def _snapshot_factory(loaded: pd.DataFrame | ColumnStore, version: int, signature) -> CatalogSnapshot:
+    if isinstance(loaded, ColumnStore):
+        return CatalogSnapshot.from_columns(loaded, version, signature)
+    return CatalogSnapshot(loaded, version, signature)
+
+
+def _prepare_snapshot(snapshot: CatalogSnapshot) -> None:
+    """Warm the per-snapshot payloads before the snapshot goes live."""
+    for key, build in _PAYLOADS.items():
+        snapshot.memo(key, build)
+    snapshot.memo("memory_bytes", _memory_bytes)
+    snapshot.memo("suggest", _suggest_index)
+    if isinstance(snapshot, CatalogSnapshot):
+        snapshot.memo("facets", _facet_index)
+
+
+def _suggest_index(snapshot: CatalogSnapshot | SqlCatalog):
+    return snapshot.suggest_index()
+
+
+def _facet_index(snapshot: CatalogSnapshot):
+    return snapshot.facet_index()
+
+
+def _memory_bytes(snapshot: CatalogSnapshot | SqlCatalog) -> int | None:
+    """Total bytes of frame + indexes; walks every object column, so it is computed once per snapshot."""
+    if isinstance(snapshot, SqlCatalog):
+        return None
+    memory = snapshot.memory_usage()
+    return sum(memory.pop("columns").values()) + sum(memory.values())
+
+
+if ENGINE == "sql":
+    _snapshots = SnapshotManager(
+        DB_PATH,
+        SqlCatalog.check_db,  # read-only: releases are prepared when the crawler finalizes them
+        poll_interval=RELOAD_INTERVAL,
+        prepare=_prepare_snapshot,
+        factory=SqlCatalog,
+    )
+else:
+    _snapshots = SnapshotManager(
+        DB_PATH,
+        _load_books,
+        poll_interval=RELOAD_INTERVAL,
+        prepare=_prepare_snapshot,
+        factory=_snapshot_factory,
+    )
+
+
+def get_snapshot() -> CatalogSnapshot | SqlCatalog:
+    """The live snapshot; grab it once per request and use only that object."""
+    return _snapshots.current()
+
+
+def get_df() -> pd.DataFrame:
+    return get_snapshot().df
+
+
+def _records(df: pd.DataFrame) -> list[dict]:
+    """Rows as JSON-ready dicts: NaN/NA become None column-wise, then rows are zipped in bulk."""
+    names = list(df.columns)
+    return [dict(zip(names, row, strict=True)) for row in zip(*_columns(df), strict=True)]
+
+
+def _columns(df: pd.DataFrame) -> list[list]:
+    """Each column as a plain list with NaN/NA replaced by None (and the compact layout decoded)."""
+    return [plain_values(df[name]) for name in df.columns]
+
+
+def _dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+        default=_json_default,
+    ).encode("utf-8")
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded with orjson when installed.
+
+    Handlers return it directly so FastAPI skips jsonable_encoder on payloads
+    that _records() already made JSON-ready.
+    """
+
+    def render(self, content) -> bytes:
+        return _dumps(content)
+
+
+def _filter_masks(snapshot: CatalogSnapshot, query: CatalogQuery) -> dict[str, np.ndarray]:
+    """One boolean row mask per active filter, keyed by filter name; combine them with _apply_filters().
+
+    Nothing is copied here: callers count the mask and materialize only the
+    rows they actually return.
+    """
+    index = snapshot.filters
+    masks: dict[str, np.ndarray] = {}
+
+    if query.matches_nothing:
+        masks["search"] = np.zeros(len(snapshot), dtype=bool)
+    elif query.search:
+        # Every query token must prefix-match a title/author token, diacritics folded;
+        # fuzzy search also accepts tokens with a similar spelling (shared trigrams).
+        rows = snapshot.search.fuzzy_lookup(query.search) if query.fuzzy else snapshot.search.lookup(query.search)
+        if rows is not None:
+            masks["search"] = np.zeros(len(snapshot), dtype=bool)
+            masks["search"][rows] = True
+
+    if query.categories:
+        masks["categories"] = index.categories_mask(query.categories)
+
+    if query.stores:
+        masks["stores"] = index.stores_mask(query.stores)
+
+    if query.min_rating is not None:
+        masks["rating"] = index.rating.between(low=query.min_rating)
+
+    if query.min_price is not None or query.max_price is not None:
+        masks["price"] = index.price.between(low=query.min_price, high=query.max_price)
+
+    return masks
+
+
+def _apply_filters(masks: dict[str, np.ndarray], without: str | None = None) -> np.ndarray | None:
+    """AND of the filter masks (leaving out the one named without), or None when nothing is filtered.
+
+    The masks themselves are left untouched, so facets can combine them several ways.
+    """
+    selected = [mask for name, mask in masks.items() if name != without]
+    if len(selected) <= 1:
+        return selected[0] if selected else None
+    combined = selected[0].copy()
+    for mask in selected[1:]:
+        combined &= mask
+    return combined
+
+
+def _ordered_rows(snapshot: CatalogSnapshot, query: CatalogQuery) -> np.ndarray:
+    """Every matching row position in sort order; filtered results are cached per snapshot.
+
+    Pages 2..N of a query (and repeats of page 1) are then slices of the cached array.
+    """
+    rows = snapshot.queries.get(query)
+    if rows is not None:
+        return rows
+
+    perm = snapshot.sort.permutation(query.sort_by, query.ascending)
+    with metrics.timer("catalog_stage_seconds", stage="filter"):
+        mask = _apply_filters(_filter_masks(snapshot, query))
+    if mask is None:
+        return perm
+    with metrics.timer("catalog_stage_seconds", stage="sort"):
+        return snapshot.queries.put(query, perm[mask[perm]])
+
+
 # ── Routes ────────────────────────────────────────────────────────────────────
 
-_SORT_COLUMNS = {"title", "author", "price", "rating"}
+def _decode_cursor(query: CatalogQuery, token: str) -> PageCursor:
+    try:
+        cursor = PageCursor.decode(token)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+    if cursor.sort_by != query.sort_by or cursor.ascending != query.ascending:
+        raise HTTPException(status_code=400, detail="Cursor does not match the requested sort")
+    # A well-formed token can still carry a title for a price sort; the indexes would raise on it.
+    if cursor.value is not None and isinstance(cursor.value, str) != (cursor.sort_by in ("title", "author")):
+        raise HTTPException(status_code=400, detail="Cursor value does not match the requested sort")
+    return cursor
+
+
+def _cursor_start(snapshot: CatalogSnapshot, query: CatalogQuery, ordered: np.ndarray, token: str) -> int:
+    """Index in ordered of the first row after the cursor, found by binary search."""
+    cursor = _decode_cursor(query, token)
+    sort = snapshot.sort
+    urls = snapshot.column("url")  # may be a categorical over the column store: read single rows, not the whole column
+    if cursor.version == snapshot.version and 0 <= cursor.row < len(snapshot) and urls.iat[cursor.row] == cursor.url:
+        return sort.seek_row(ordered, query.sort_by, query.ascending, cursor.row)
+
+    # The DB was swapped since the cursor was issued: resume at the cursor's sort
+    # value and step past the same book if it is still among the ties.
+    start = sort.seek_value(ordered, query.sort_by, query.ascending, cursor.value)
+    end = sort.seek_value(ordered, query.sort_by, query.ascending, cursor.value, after=True)
+    ties = urls.take(ordered[start:end]).to_numpy(dtype=object)
+    seen = np.flatnonzero(ties == cursor.url) if cursor.url is not None else []
+    return start + int(seen[0]) + 1 if len(seen) else start
+
+
+def _next_cursor(snapshot: CatalogSnapshot, query: CatalogQuery, rows: np.ndarray, has_more: bool) -> str | None:
+    if not has_more or len(rows) == 0:
+        return None
+    last = int(rows[-1])
+    url = snapshot.column("url").iat[last]
+    return PageCursor(
+        version=snapshot.version,
+        row=last,
+        sort_by=query.sort_by,
+        ascending=query.ascending,
+        value=snapshot.sort.value(query.sort_by, last),
+        url=url if isinstance(url, str) else None,
+    ).encode()
 
 
 @app.get("/api/books")
+@_bounded
 def get_books(
     page: int = Query(1, ge=1, description="1-based page number"),
     page_size: int = Query(24, ge=1, le=100),
     search: str | None = Query(None),
-    categories: list[str] = Query(default=[]),
-    stores: list[str] = Query(default=[]),
+    categories: Annotated[list[str] | None, Query()] = None,
+    stores: Annotated[list[str] | None, Query()] = None,
     min_rating: float | None = Query(None, ge=0, le=5),
     min_price: float | None = Query(None, ge=0),
     max_price: float | None = Query(None, ge=0),
     sort_by: str = Query("title"),
     sort_dir: str = Query("asc"),
+    fuzzy: bool = Query(False, description="also match search words spelled slightly differently"),
+    cursor: str | None = Query(None, description="next_cursor of the previous page; overrides page"),
 ):
-    df = get_df()
-    filtered = _apply_filters(df, search, categories, stores, min_rating, min_price, max_price)
+    snapshot = get_snapshot()
+    query = CatalogQuery.normalize(search, categories, stores, min_rating, min_price, max_price, sort_by, sort_dir, fuzzy)
+    if isinstance(snapshot, SqlCatalog):
+        return _sql_books(snapshot, query, page, page_size, cursor)
+    ordered = _ordered_rows(snapshot, query)
 
-    col = sort_by if sort_by in _SORT_COLUMNS and sort_by in filtered.columns else "title"
-    ascending = sort_dir != "desc"
-    filtered = filtered.sort_values(col, ascending=ascending, na_position="last")
-
-    total = len(filtered)
+    total = len(ordered)
+    total_pages = max(1, math.ceil(total / page_size))
+    with metrics.timer("catalog_stage_seconds", stage="paginate"):
+        if cursor:
+            start = _cursor_start(snapshot, query, ordered, cursor)
+            page = start // page_size + 1
+        else:
+            start = (page - 1) * page_size
+        rows = ordered[start : start + page_size]
+        page_df = snapshot.df.take(rows)
+        next_cursor = _next_cursor(snapshot, query, rows, start + page_size < total)
+
+    with metrics.timer("catalog_stage_seconds", stage="serialize"):
+        return FastJSONResponse(
+            {
+                "total": total,
+                "page": page,
+                "page_size": page_size,
+                "total_pages": total_pages,
+                "books": _records(page_df),
+                "next_cursor": next_cursor,
+            }
+        )
+
+
+def _sql_books(catalog: SqlCatalog, query: CatalogQuery, page: int, page_size: int, token: str | None):
+    """/api/books on the SQL engine: keyset seek for cursors, LIMIT/OFFSET for page numbers.
+
+    One row past the page tells whether another follows. The page number of
+    a cursor page comes from the offset the cursor carries while it still
+    points at the same book of this release; relocated or older cursors
+    count the rows after them instead.
+    """
+    with metrics.timer("catalog_stage_seconds", stage="query"):
+        total = catalog.count(query)
+        if token:
+            cursor = _decode_cursor(query, token)
+            after = catalog.locate(cursor)
+            books = catalog.rows(query, page_size + 1, after=after)
+            start = cursor.offset if after is cursor and cursor.offset is not None else total - catalog.count(query, after)
+            start = min(start, total)
+            page = start // page_size + 1
+        else:
+            start = (page - 1) * page_size
+            books = catalog.rows(query, page_size + 1, offset=start)
+    has_more, books = len(books) > page_size, books[:page_size]
     total_pages = max(1, math.ceil(total / page_size))
-    start = (page - 1) * page_size
-    page_df = filtered.iloc[start : start + page_size]
 
-    books = [_serialize(r) for r in page_df.to_dict("records")]
+    next_cursor = None
+    if has_more:
+        last = books[-1]
+        next_cursor = PageCursor(
+            version=catalog.version,
+            row=last["rowid"],
+            sort_by=query.sort_by,
+            ascending=query.ascending,
+            value=last[query.sort_by],
+            url=last["url"],
+            offset=start + len(books),
+        ).encode()
+
+    with metrics.timer("catalog_stage_seconds", stage="serialize"):
+        return FastJSONResponse(
+            {
+                "total": total,
+                "page": page,
+                "page_size": page_size,
+                "total_pages": total_pages,
+                "books": books,
+                "next_cursor": next_cursor,
+            }
+        )
+
+
+EXPORT_CHUNK_ROWS = 5000
+_EXPORT_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+def _frame_chunks(snapshot: CatalogSnapshot, rows: np.ndarray):
+    for start in range(0, len(rows), EXPORT_CHUNK_ROWS):
+        yield _columns(snapshot.df.take(rows[start : start + EXPORT_CHUNK_ROWS]))
+
+
+def _export_chunks(names: list[str], chunks, fmt: str):
+    """Encode column-wise chunks one at a time so memory stays flat however many rows are exported."""
+    if fmt == "csv":
+        yield _csv_lines([names])
+    category = names.index("category") if "category" in names else None
+    for columns in chunks:
+        if fmt == "ndjson":
+            yield b"".join(_dumps(dict(zip(names, row, strict=True))) + b"\n" for row in zip(*columns, strict=True))
+        else:
+            if category is not None:
+                # Categories are lists in the snapshot; export them the way the DB stores them.
+                columns[category] = [",".join(c) if isinstance(c, list) else c for c in columns[category]]
+            yield _csv_lines(zip(*columns, strict=True))
 
-    return {
-        "total": total,
-        "page": page,
-        "page_size": page_size,
-        "total_pages": total_pages,
-        "books": books,
-    }
 
+def _csv_lines(lines) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(lines)
+    return buffer.getvalue().encode("utf-8")
 
-@app.get("/api/filters")
-def get_filters():
-    df = get_df()
-    all_cats: list[str] = sorted(df["category"].explode().dropna().unique().tolist())
-    all_stores: list[str] = sorted(df["store"].dropna().unique().tolist())
-    price_min = float(df["price"].min()) if not df.empty else 0.0
-    price_max = float(df["price"].max()) if not df.empty else 1000.0
+
+@app.get("/api/books/export")
+def export_books(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    search: str | None = Query(None),
+    categories: Annotated[list[str] | None, Query()] = None,
+    stores: Annotated[list[str] | None, Query()] = None,
+    min_rating: float | None = Query(None, ge=0, le=5),
+    min_price: float | None = Query(None, ge=0),
+    max_price: float | None = Query(None, ge=0),
+    sort_by: str = Query("title"),
+    sort_dir: str = Query("asc"),
+    fuzzy: bool = Query(False),
+):
+    # The slot covers the whole stream, not just this handler: see _GatedStream.
+    slot = ExitStack()
+    slot.enter_context(_cpu.slot())
+    try:
+        # One snapshot for the whole stream: a hot swap mid-export cannot mix two releases.
+        snapshot = get_snapshot()
+        query = CatalogQuery.normalize(
+            search, categories, stores, min_rating, min_price, max_price, sort_by, sort_dir, fuzzy
+        )
+        if isinstance(snapshot, SqlCatalog):
+            names, total = list(SqlCatalog.COLUMNS), snapshot.count(query)
+            chunks = snapshot.iter_columns(query, EXPORT_CHUNK_ROWS)
+        else:
+            rows = _ordered_rows(snapshot, query)
+            names, total = list(snapshot.df.columns), len(rows)
+            chunks = _frame_chunks(snapshot, rows)
+    except BaseException:
+        slot.close()
+        raise
+    return StreamingResponse(
+        _GatedStream(slot, _export_chunks(names, chunks, format)),
+        media_type=_EXPORT_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="books.{format}"',
+            "X-Total-Count": str(total),
+        },
+    )
+
+
+def _build_filters(snapshot: CatalogSnapshot | SqlCatalog) -> dict:
+    if isinstance(snapshot, SqlCatalog):
+        return snapshot.filters()
+    df = snapshot.df
+    all_cats: list[str] = sorted(category_counts(df["category"]).index.tolist())
+    all_stores: list[str] = sorted(snapshot.filters.store_sets)
+    prices = snapshot.filters.price.sorted_values
+    price_min = float(prices[0]) if len(prices) else 0.0
+    price_max = float(prices[-1]) if len(prices) else 1000.0
     return {
         "categories": all_cats,
         "stores": all_stores,
@@ -177,22 +647,24 @@ def get_filters():
     }
 
 
-@app.get("/api/insights")
-def get_insights():
-    df = get_df()
+def _build_insights(snapshot: CatalogSnapshot | SqlCatalog) -> dict:
+    if isinstance(snapshot, SqlCatalog):
+        return snapshot.insights()
+    df = snapshot.df
 
     total_volumes = len(df)
-    avg_price = round(float(df["price"].mean()), 2) if not df.empty else 0.0
+    prices = snapshot.filters.price.sorted_values
+    avg_price = round(float(prices.mean()), 2) if len(prices) else 0.0
 
     # Books per category (top 10 by count)
-    cats_series = df["category"].explode().dropna()
-    num_categories = int(cats_series.nunique())
-    bpc = cats_series.value_counts().head(10).rename_axis("category").reset_index(name="count").to_dict("records")
+    counts = category_counts(df["category"])
+    num_categories = len(counts)
+    bpc = [{"category": category, "count": int(count)} for category, count in counts.head(10).items()]
 
-    # Top rated: sort descending by raw rating field (weighted score)
-    rated = df[df["rating"].notna() & (df["rating"] > 0)].copy()
-    top_rated = rated.nlargest(10, "rating")[["title", "author", "rating", "goodreads_url"]].to_dict("records")
-    top_rated = [_serialize(r) for r in top_rated]
+    # Top rated: first rows of the presorted descending rating order (weighted score)
+    top_rows = snapshot.sort.permutation("rating", ascending=False)[:10]
+    top_rows = top_rows[snapshot.filters.rating.values[top_rows] > 0]
+    top_rated = _records(df.take(top_rows)[["title", "author", "rating", "goodreads_url"]])
 
     return {
         "total_volumes": total_volumes,
@@ -203,6 +675,161 @@ def get_insights():
     }
 
 
+def _json_payload(build):
+    """Wrap a payload builder so the snapshot memo holds (JSON bytes, ETag)."""
+
+    def _encode(snapshot: CatalogSnapshot) -> tuple[bytes, str]:
+        body = _dumps(build(snapshot))
+        # Content-derived, so every worker and every restart on the same DB agrees on it.
+        etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        return body, etag
+
+    return _encode
+
+
+_PAYLOADS = {
+    "filters": _json_payload(_build_filters),
+    "insights": _json_payload(_build_insights),
+}
+
+
+def _etag_response(request: Request, snapshot: CatalogSnapshot, key: str) -> Response:
+    body, etag = snapshot.memo(key, _PAYLOADS[key])
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+@app.get("/api/autocomplete")
+def get_autocomplete(
+    q: str = Query("", max_length=100, description="what the user has typed so far"),
+    limit: int = Query(8, ge=1, le=20),
+):
+    snapshot = get_snapshot()
+    suggestions = snapshot.memo("suggest", _suggest_index).suggest(q, limit)
+    return FastJSONResponse({"query": q, "suggestions": suggestions})
+
+
+@app.get("/api/facets")
+@_bounded
+def get_facets(
+    search: str | None = Query(None),
+    fuzzy: bool = Query(False),
+    categories: Annotated[list[str] | None, Query()] = None,
+    stores: Annotated[list[str] | None, Query()] = None,
+    min_rating: float | None = Query(None, ge=0, le=5),
+    min_price: float | None = Query(None, ge=0),
+    max_price: float | None = Query(None, ge=0),
+):
+    """Counts for the sidebar under the /api/books filters; each facet ignores its own selection."""
+    snapshot = get_snapshot()
+    query = CatalogQuery.normalize(search, categories, stores, min_rating, min_price, max_price, fuzzy=fuzzy)
+    if isinstance(snapshot, SqlCatalog):
+        return FastJSONResponse(snapshot.facets(query))
+
+    facets = snapshot.memo("facets", _facet_index)
+    with metrics.timer("catalog_stage_seconds", stage="filter"):
+        masks = _filter_masks(snapshot, query)
+    with metrics.timer("catalog_stage_seconds", stage="facets"):
+        mask = _apply_filters(masks)
+        counts = facets.counts(
+            _apply_filters(masks, without="categories"),
+            _apply_filters(masks, without="stores"),
+            _apply_filters(masks, without="price"),
+        )
+    return FastJSONResponse({"total": len(snapshot) if mask is None else int(np.count_nonzero(mask)), **counts})
+
+
+@app.get("/api/filters")
+def get_filters(request: Request):
+    return _etag_response(request, get_snapshot(), "filters")
+
+
+@app.get("/api/insights")
+def get_insights(request: Request):
+    return _etag_response(request, get_snapshot(), "insights")
+
+
+@app.get("/api/diagnostics")
+def get_diagnostics():
+    snapshot = get_snapshot()
+    report = {
+        "engine": ENGINE,
+        "version": snapshot.version,
+        "rows": len(snapshot),
+        "process": {"pid": os.getpid(), "rss_bytes": _rss_bytes()},
+        "cpu_gate": {"limit": _cpu.limit, "backlog": _cpu.backlog, "in_flight": _cpu.in_flight, "rejected": _cpu.rejected},
+    }
+    if isinstance(snapshot, SqlCatalog):
+        report["db"] = {"path": snapshot.db_path, "bytes": os.path.getsize(snapshot.db_path), "immutable": snapshot.immutable}
+        return FastJSONResponse(report)
+
+    memory = snapshot.memory_usage()
+    report["build_seconds"] = round(snapshot.build_seconds, 3)
+    report["column_store"] = snapshot.column_store
+    report["memory"] = {
+        **memory,
+        "dtypes": {name: str(dtype) for name, dtype in snapshot.df.dtypes.items()},
+        "total_bytes": sum(memory["columns"].values()) + sum(v for k, v in memory.items() if k != "columns"),
+    }
+    return FastJSONResponse(report)
+
+
+@app.get("/api/metrics")
+def get_metrics():
+    labels = {"pid": str(os.getpid())}
+    samples = [
+        ("process_resident_memory_bytes", "gauge", "Resident memory of this worker", [(labels, _rss_bytes())]),
+        ("backend_cpu_gate_in_flight", "gauge", "Heavy requests running or queued", [(labels, _cpu.in_flight)]),
+        ("backend_cpu_gate_rejected_total", "counter", "Heavy requests shed with 503", [(labels, _cpu.rejected)]),
+        ("catalog_snapshot_failures_total", "counter", "Snapshot loads that failed", [(labels, _snapshots.failures)]),
+    ]
+    snapshot = _snapshots.live
+    if snapshot is not None:
+        labels = {**labels, "engine": ENGINE}
+        samples += [
+            ("catalog_snapshot_version", "gauge", "Version of the live snapshot", [(labels, snapshot.version)]),
+            ("catalog_snapshot_rows", "gauge", "Rows in the live snapshot", [(labels, len(snapshot))]),
+            (
+                "catalog_snapshot_load_seconds",
+                "gauge",
+                "Seconds to load, build and warm the live snapshot",
+                [(labels, _snapshots.load_seconds or 0.0)],
+            ),
+        ]
+        memory_bytes = snapshot.memo("memory_bytes", _memory_bytes)
+        if memory_bytes is not None:
+            samples += [
+                ("catalog_snapshot_bytes", "gauge", "Bytes held by the snapshot frame and indexes", [(labels, memory_bytes)]),
+                ("catalog_query_cache_hits_total", "counter", "Query cache hits", [(labels, snapshot.queries.hits)]),
+                (
+                    "catalog_query_cache_misses_total",
+                    "counter",
+                    "Query cache misses",
+                    [(labels, snapshot.queries.misses)],
+                ),
+            ]
+    text = metrics.render(samples, labels={"pid": str(os.getpid()), "engine": ENGINE})
+    return Response(text, media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def _rss_bytes() -> int:
+    """Current resident set size (peak on systems without /proc)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
 class RecommendationRequest(BaseModel):
     budget: float
     subject: str = "Any"  # maps to a category substring
@@ -210,51 +837,57 @@ class RecommendationRequest(BaseModel):
 
 
 @app.post("/api/recommendations")
+@_bounded
 def get_recommendations(req: RecommendationRequest):
-    df = get_df()
-
-    pool = df[df["price"].notna() & (df["price"] > 0)].copy()
-
-    # Filter by subject/category
+    snapshot = get_snapshot()
     subj = req.subject.strip()
-    if subj and subj.lower() not in ("any", "any available", ""):
-        pool = pool[
-            pool["category"].apply(lambda x: any(subj.lower() in c.lower() for c in x) if isinstance(x, list) else False)
-        ]
-
-    # Filter by store
+    subject = subj if subj and subj.lower() not in ("any", "any available", "") else None
     src = req.source.strip()
-    if src and src.lower() not in ("any", "any available", ""):
-        pool = pool[pool["store"].str.lower() == src.lower()]
-
-    # Cap to budget
-    pool = pool[pool["price"] <= req.budget]
+    source = src if src and src.lower() not in ("any", "any available", "") else None
 
-    # Prefer rated books, fallback to unrated
-    rated_pool = pool[pool["rating"].notna()].sort_values("rating", ascending=False)
-    unrated_pool = pool[pool["rating"].isna()]
+    if isinstance(snapshot, SqlCatalog):
+        rowids, price, rating = snapshot.bundle_pool(req.budget, subject, source)
+        picked = solve_bundle(price, rating, req.budget)
+        bundle = snapshot.rows_by_id(rowids[picked])
+        total_spent = round(float(price[picked].sum()), 2)
+        return FastJSONResponse({"bundle": bundle, "total_spent": total_spent, "budget": req.budget})
 
-    bundle: list[dict] = []
-    remaining = float(req.budget)
+    index = snapshot.filters
+    price = index.price.values
+    rating = index.rating.values
 
-    for frame in (rated_pool, unrated_pool):
-        for _, row in frame.iterrows():
-            price = float(row["price"])
-            if price <= remaining:
-                bundle.append(_serialize(row.to_dict()))
-                remaining -= price
-                if len(bundle) >= 10:
-                    break
-        if len(bundle) >= 10:
-            break
+    # Priced books within budget; rows without a price never match the range.
+    mask = index.price.between(low=0.0, high=req.budget)
+    mask &= price > 0
 
-    total_spent = round(req.budget - remaining, 2)
+    # Filter by subject/category
+    if subject:
+        mask &= index.categories_containing(subject)
 
-    return {
-        "bundle": bundle,
-        "total_spent": total_spent,
-        "budget": req.budget,
-    }
+    # Filter by store
+    if source:
+        mask &= index.stores_named(source)
+
+    # Best total rating within budget (at most 10 books), topped up with unrated books.
+    # Rows outside the pool get a NaN price; the snapshot's presorted orders spare the solver any sorting.
+    picked = solve_bundle(
+        np.where(mask, price, np.nan),
+        rating,
+        req.budget,
+        by_price=index.price.positions,
+        by_rating=snapshot.sort.permutation("rating", ascending=False),
+    )
+    bundle = _records(snapshot.df.take(picked))
+
+    total_spent = round(float(price[picked].sum()), 2)
+
+    return FastJSONResponse(
+        {
+            "bundle": bundle,
+            "total_spent": total_spent,
+            "budget": req.budget,
+        }
+    )
 
 
 # ── Dev entry ─────────────────────────────────────────────────────────────────
@@ -1,25 +1,37 @@
 import client from './client';
-import type { ActiveFilters, BooksResponse, FiltersResponse } from '../types';
+import type {
+    ActiveFilters,
+    AutocompleteResponse,
+    BooksResponse,
+    FacetsResponse,
+    FiltersResponse,
+    Suggestion,
+} from '../types';
+
+function filterParams(filters: ActiveFilters): Record<string, unknown> {
+    const params: Record<string, unknown> = {};
+    if (filters.search) params.search = filters.search;
+    if (filters.categories.length) params.categories = filters.categories;
+    if (filters.stores.length) params.stores = filters.stores;
+    if (filters.min_rating > 0) params.min_rating = filters.min_rating;
+    if (filters.min_price !== null) params.min_price = filters.min_price;
+    if (filters.max_price !== null) params.max_price = filters.max_price;
+    return params;
+}
 
 export async function fetchBooks(
     page: number,
     pageSize: number,
     filters: ActiveFilters,
 ): Promise<BooksResponse> {
-    const params: Record<string, unknown> = {
+    const params = {
         page,
         page_size: pageSize,
         sort_by: filters.sort_by,
         sort_dir: filters.sort_dir,
+        ...filterParams(filters),
     };
 
-    if (filters.search) params.search = filters.search;
-    if (filters.categories.length) params.categories = filters.categories;
-    if (filters.stores.length) params.stores = filters.stores;
-    if (filters.min_rating > 0) params.min_rating = filters.min_rating;
-    if (filters.min_price !== null) params.min_price = filters.min_price;
-    if (filters.max_price !== null) params.max_price = filters.max_price;
-
     const res = await client.get<BooksResponse>('/books', {
         params,
         // axios serialises array params as ?categories=A&categories=B
@@ -28,6 +40,20 @@ export async function fetchBooks(
     return res.data;
 }
 
+export async function fetchFacets(filters: ActiveFilters, signal?: AbortSignal): Promise<FacetsResponse> {
+    const res = await client.get<FacetsResponse>('/facets', {
+        params: filterParams(filters),
+        paramsSerializer: { indexes: null },
+        signal,
+    });
+    return res.data;
+}
+
+export async function fetchSuggestions(q: string, signal?: AbortSignal): Promise<Suggestion[]> {
+    const res = await client.get<AutocompleteResponse>('/autocomplete', { params: { q }, signal });
+    return res.data.suggestions;
+}
+
 export async function fetchFilters(): Promise<FiltersResponse> {
     const res = await client.get<FiltersResponse>('/filters');
     return res.data;
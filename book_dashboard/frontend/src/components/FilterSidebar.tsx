@@ -1,6 +1,10 @@
-import { useEffect, useState } from 'react';
-import { fetchFilters } from '../api/books';
-import type { ActiveFilters, FiltersResponse } from '../types';
+import { useEffect, useRef, useState } from 'react';
+import { fetchFacets, fetchFilters, fetchSuggestions } from '../api/books';
+import type { ActiveFilters, FacetsResponse, FiltersResponse, Suggestion } from '../types';
+
+// Typing only fetches cheap suggestions; the catalog query runs once the user pauses, presses Enter or picks one.
+const SUGGEST_DELAY_MS = 120;
+const SEARCH_DELAY_MS = 500;
 
 interface Props {
     filters: ActiveFilters;
@@ -9,13 +13,71 @@ interface Props {
 
 export default function FilterSidebar({ filters, onChange }: Props) {
     const [meta, setMeta] = useState<FiltersResponse | null>(null);
+    const [text, setText] = useState(filters.search);
+    const [suggestions, setSuggestions] = useState<Suggestion[]>([]);
+    const [open, setOpen] = useState(false);
+    const [facets, setFacets] = useState<FacetsResponse | null>(null);
+    // The debounced search fires after later renders; patch the filters current then, not the ones it was scheduled with.
+    const latest = useRef(filters);
+    latest.current = filters;
 
     useEffect(() => {
         fetchFilters().then(setMeta).catch(console.error);
     }, []);
 
+    // Counts follow the filters (not the sort); a newer filter state cancels the pending request.
+    const facetKey = JSON.stringify([
+        filters.search, filters.categories, filters.stores, filters.min_rating, filters.min_price, filters.max_price,
+    ]);
+    useEffect(() => {
+        const controller = new AbortController();
+        fetchFacets(filters, controller.signal)
+            .then(setFacets)
+            .catch(() => { /* aborted or failed: keep the old counts */ });
+        return () => controller.abort();
+        // eslint-disable-next-line react-hooks/exhaustive-deps
+    }, [facetKey]);
+
+    const categoryCounts = new Map(facets?.categories.map(f => [f.value, f.count]));
+    const storeCounts = new Map(facets?.stores.map(f => [f.value, f.count]));
+    const tallest = Math.max(1, ...(facets?.price_histogram.map(b => b.count) ?? []));
+
+    // Follow outside changes (e.g. reset)
+    useEffect(() => {
+        setText(filters.search);
+    }, [filters.search]);
+
+    useEffect(() => {
+        if (!text.trim()) {
+            setSuggestions([]);
+            return;
+        }
+        const controller = new AbortController();
+        const timer = setTimeout(() => {
+            fetchSuggestions(text, controller.signal)
+                .then(setSuggestions)
+                .catch(() => { /* aborted or failed: keep the old list */ });
+        }, SUGGEST_DELAY_MS);
+        return () => { clearTimeout(timer); controller.abort(); };
+    }, [text]);
+
+    useEffect(() => {
+        if (text === filters.search) return;
+        const timer = setTimeout(() => {
+            if (text !== latest.current.search) set({ search: text });
+        }, SEARCH_DELAY_MS);
+        return () => clearTimeout(timer);
+        // eslint-disable-next-line react-hooks/exhaustive-deps
+    }, [text]);
+
+    function commitSearch(value: string) {
+        setText(value);
+        setOpen(false);
+        if (value !== filters.search) set({ search: value });
+    }
+
     function set(patch: Partial<ActiveFilters>) {
-        onChange({ ...filters, ...patch });
+        onChange({ ...latest.current, ...patch });
     }
 
     function toggleCat(cat: string) {
@@ -48,14 +110,39 @@ export default function FilterSidebar({ filters, onChange }: Props) {
     return (
         <aside className="w-56 shrink-0 space-y-6">
             {/* Search */}
-            <div>
+            <div className="relative">
                 <label className="filter-label">Search</label>
                 <input
                     className="field"
                     placeholder="Title or author…"
-                    value={filters.search}
-                    onChange={e => set({ search: e.target.value })}
+                    value={text}
+                    onChange={e => { setText(e.target.value); setOpen(true); }}
+                    onKeyDown={e => {
+                        if (e.key === 'Enter') commitSearch(text);
+                        if (e.key === 'Escape') setOpen(false);
+                    }}
+                    onFocus={() => setOpen(true)}
+                    onBlur={() => setOpen(false)}
                 />
+                {open && suggestions.length > 0 && (
+                    <ul className="absolute z-10 mt-1 w-full bg-surface border border-rule rounded shadow-md
+                     max-h-72 overflow-y-auto">
+                        {suggestions.map(s => (
+                            <li
+                                key={`${s.kind}:${s.text}`}
+                                // mousedown fires before the input's blur closes the list
+                                onMouseDown={e => { e.preventDefault(); commitSearch(s.text); }}
+                                className="px-3 py-1.5 cursor-pointer hover:bg-navy/5"
+                            >
+                                <span className="text-sm font-sans text-ink line-clamp-1">{s.text}</span>
+                                <span className="text-xs font-sans text-mist">
+                                    {s.kind === 'author' ? 'Author' : 'Title'}
+                                    {s.offers > 1 && ` · ${s.offers} offers`}
+                                </span>
+                            </li>
+                        ))}
+                    </ul>
+                )}
             </div>
 
             {/* Sort */}
@@ -81,6 +168,18 @@ export default function FilterSidebar({ filters, onChange }: Props) {
             {/* Price range */}
             <div>
                 <label className="filter-label">Price (RON)</label>
+                {facets && facets.price_histogram.length > 1 && (
+                    <div className="flex items-end gap-px h-10 mb-2" aria-hidden>
+                        {facets.price_histogram.map(b => (
+                            <div
+                                key={b.min}
+                                title={`${b.min}–${b.max} RON: ${b.count}`}
+                                className="flex-1 bg-navy/30 rounded-t-sm"
+                                style={{ height: `${(100 * b.count) / tallest}%` }}
+                            />
+                        ))}
+                    </div>
+                )}
                 <div className="flex gap-2">
                     <input
                         className="field"
@@ -118,6 +217,9 @@ export default function FilterSidebar({ filters, onChange }: Props) {
                                  transition-colors line-clamp-1">
                                     {cat}
                                 </span>
+                                {categoryCounts.has(cat) && (
+                                    <span className="ml-auto text-xs font-sans text-mist">{categoryCounts.get(cat)}</span>
+                                )}
                             </label>
                         ))}
                     </div>
@@ -140,6 +242,9 @@ export default function FilterSidebar({ filters, onChange }: Props) {
                                 <span className="text-sm font-sans text-ink group-hover:text-navy transition-colors">
                                     {store}
                                 </span>
+                                {storeCounts.has(store) && (
+                                    <span className="ml-auto text-xs font-sans text-mist">{storeCounts.get(store)}</span>
+                                )}
                             </label>
                         ))}
                     </div>
@@ -17,6 +17,19 @@ export interface BooksResponse {
     page_size: number;
     total_pages: number;
     books: Book[];
+    next_cursor: string | null;
+}
+
+export interface Suggestion {
+    text: string;
+    kind: 'title' | 'author';
+    rating: number | null; // best weighted score among the matching books
+    offers: number;
+}
+
+export interface AutocompleteResponse {
+    query: string;
+    suggestions: Suggestion[];
 }
 
 export interface FiltersResponse {
@@ -25,6 +38,18 @@ export interface FiltersResponse {
     price_range: { min: number; max: number };
 }
 
+export interface FacetCount {
+    value: string;
+    count: number; // rows this option would select, given the other filters
+}
+
+export interface FacetsResponse {
+    total: number;
+    categories: FacetCount[];
+    stores: FacetCount[];
+    price_histogram: { min: number; max: number; count: number }[];
+}
+
 export interface InsightsResponse {
     total_volumes: number;
     avg_price: number;
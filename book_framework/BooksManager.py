@@ -1,12 +1,21 @@
 from __future__ import annotations
 
+import os
+import sqlite3
+import time
+
 import pandas as pd
 from scrape_kit import BufferedStorageManager, get_logger
 
+from .catalog.CatalogSnapshot import CatalogSnapshot
+from .catalog.ColumnStore import column_store_path, db_fingerprint
+from .catalog.SqlCatalog import RELEASE_LAYOUT_VERSION, SqlCatalog
 from .core.Book import Book
 
 logger = get_logger(__name__)
 
+RELEASE_PAGE_SIZE = 8192
+
 
 class BooksManager(BufferedStorageManager):
     """Buffered SQLite manager for books."""
@@ -66,20 +75,7 @@ class BooksManager(BufferedStorageManager):
     def fetch_all_as_dataframe(self) -> pd.DataFrame:
         """Retrieves books as a pandas DataFrame with synthetic rowid."""
         self.reopen_if_changed()
-        df = self.ensure_buffer().copy()
-
-        if df.empty:
-            # Keep expected shape for downstream callers.
-            df.insert(0, "rowid", pd.Series(dtype="int64"))
-            df["category"] = pd.Series(dtype="object")
-            return df
-
-        # Existing flows expect rowid; when using buffered storage, index maps 1:1
-        # with persisted order after reset/scrape cycles.
-        df.insert(0, "rowid", df.index + 1)
-        df["category"] = df["category"].fillna("").str.split(r"\s*,\s*")
-        df["category"] = df["category"].apply(lambda x: [i for i in x if i])
-        return df
+        return _with_rowid_and_categories(self.ensure_buffer().copy())
 
     def update_rating_callback(self, rowid: int, rating: float, goodreads_url: str) -> None:
         """Updates rating fields in buffer by rowid-like index."""
@@ -152,3 +148,86 @@ class BooksManager(BufferedStorageManager):
             report.processed_chunks,
             report.skipped_chunks,
         )
+
+    # ── Release layout ─────────────────────────────────────────────────────────
+
+    @staticmethod
+    def finalize_release(db_path: str, page_size: int = RELEASE_PAGE_SIZE, column_store: bool = True) -> None:
+        """Rewrite a finished DB into the read-optimized layout the backend serves.
+
+        Builds the indexes, category table and FTS table the SQL engine uses
+        (plus ANALYZE statistics), then VACUUMs into a copy with a larger
+        page size and a rollback journal (a single file, no -wal/-shm) that is
+        swapped in atomically. user_version marks the result as a finished
+        release, which readers then open with immutable=1.
+
+        With column_store, the catalog and its search/sort indexes are also
+        written next to the DB (final_books.columns) for the pandas engine to
+        memory-map instead of rebuilding them at startup.
+
+        Call it only once nothing else will write to the DB.
+        """
+        started = time.perf_counter()
+        SqlCatalog.prepare_db(db_path, rebuild=True)
+
+        compacted = f"{db_path}.finalize"
+        if os.path.exists(compacted):
+            os.remove(compacted)
+
+        conn = sqlite3.connect(db_path)
+        try:
+            conn.execute("PRAGMA journal_mode = DELETE")
+            conn.execute(f"PRAGMA user_version = {RELEASE_LAYOUT_VERSION}")
+            conn.execute(f"PRAGMA page_size = {int(page_size)}")
+            conn.execute("VACUUM INTO ?", (compacted,))
+        finally:
+            conn.close()
+        os.replace(compacted, db_path)
+
+        logger.info(
+            "Finalized %s: %d bytes, page size %d, in %.2fs",
+            db_path,
+            os.path.getsize(db_path),
+            page_size,
+            time.perf_counter() - started,
+        )
+        if column_store:
+            BooksManager.write_column_store(db_path)
+
+    @staticmethod
+    def write_column_store(db_path: str) -> None:
+        """Write the column store for db_path, tagged with the DB's fingerprint.
+
+        A failure only costs the backend its fast startup path, so it is logged
+        rather than raised.
+        """
+        started = time.perf_counter()
+        path = column_store_path(db_path)
+        try:
+            conn = sqlite3.connect(db_path)
+            try:
+                df = pd.read_sql_query(f"SELECT {', '.join(SqlCatalog.COLUMNS[1:])} FROM books ORDER BY rowid", conn)
+            finally:
+                conn.close()
+            snapshot = CatalogSnapshot(_with_rowid_and_categories(df), version=0)
+            snapshot.save_columns(path, {"db_fingerprint": db_fingerprint(db_path)})
+        except Exception as e:
+            logger.warning("Could not write column store %s: %s", path, e)
+            return
+        logger.info("Wrote %s: %d bytes in %.2fs", path, os.path.getsize(path), time.perf_counter() - started)
+
+
+def _with_rowid_and_categories(df: pd.DataFrame) -> pd.DataFrame:
+    """Add the synthetic 1-based rowid and split the comma-separated categories into lists."""
+    if df.empty:
+        # Keep expected shape for downstream callers.
+        df.insert(0, "rowid", pd.Series(dtype="int64"))
+        df["category"] = pd.Series(dtype="object")
+        return df
+
+    # Existing flows expect rowid; when using buffered storage, index maps 1:1
+    # with persisted order after reset/scrape cycles.
+    df.insert(0, "rowid", df.index + 1)
+    df["category"] = df["category"].fillna("").str.split(r"\s*,\s*")
+    df["category"] = df["category"].apply(lambda x: [i for i in x if i])
+    return df
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import numpy as np
+
+MAX_ITEMS = 10
+MAX_UNITS = 5_000  # finest budget resolution the DP works at
+MAX_CELLS = 1_000_000  # candidates x budget units; bounds DP memory per request
+MAX_CANDIDATES = 1_000  # rows the DP loops over; bounds its time however large the skyline gets
+
+_EMPTY = np.empty(0, dtype=np.int64)
+
+
+def solve_bundle(
+    prices: np.ndarray,
+    ratings: np.ndarray,
+    budget: float,
+    max_items: int = MAX_ITEMS,
+    by_price: np.ndarray | None = None,
+    by_rating: np.ndarray | None = None,
+) -> np.ndarray:
+    """Pick at most max_items rows maximizing total rating with total price <= budget.
+
+    Rated items are chosen by a cardinality-bounded 0/1 knapsack DP over
+    integer-scaled prices, rounded up so every DP solution is feasible at the
+    real prices. The greedy highest-rating-first bundle is computed too and
+    the better of the two is kept, so the result is never worse than greedy.
+    Leftover slots are filled with the cheapest unrated items still affordable.
+
+    Rows with a NaN price are ignored, which lets callers exclude rows without
+    reindexing. by_price (ascending) and by_rating (descending) are optional
+    precomputed orders of the rows, e.g. from a snapshot's indexes; without
+    them the rows are sorted here.
+
+    Returns row indices: chosen rated items by rating descending, then the
+    fill items by price ascending.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    ratings = np.asarray(ratings, dtype=np.float64)
+    if budget <= 0 or max_items <= 0:
+        return _EMPTY
+    if by_price is None:
+        by_price = np.argsort(prices, kind="stable")
+    if by_rating is None:
+        by_rating = np.argsort(-ratings, kind="stable")
+
+    affordable = (prices > 0) & (prices <= budget)
+    valued = affordable & (ratings > 0)
+
+    candidates = _skyline(by_price[valued[by_price]], prices, ratings, max_items)
+    chosen = candidates[_knapsack(prices[candidates], ratings[candidates], budget, max_items)]
+
+    greedy = _greedy(prices, by_rating[valued[by_rating]], budget, max_items)
+    if ratings[greedy].sum() > ratings[chosen].sum():
+        chosen = greedy
+    chosen = chosen[np.argsort(-ratings[chosen], kind="stable")]
+
+    # Fill remaining slots with unrated (or zero-rated) books, cheapest first.
+    slots = max_items - len(chosen)
+    remaining = budget - prices[chosen].sum()
+    if slots > 0 and remaining > 0:
+        unvalued = affordable & ~valued
+        cheapest = by_price[unvalued[by_price]][:slots]
+        fill = cheapest[np.cumsum(prices[cheapest]) <= remaining + 1e-9]
+        chosen = np.concatenate([chosen, fill])
+
+    return chosen
+
+
+def _skyline(by_price: np.ndarray, prices: np.ndarray, ratings: np.ndarray, max_items: int) -> np.ndarray:
+    """Rows not dominated by max_items others (priced no higher and rated at least as high).
+
+    Swapping a dominated item for an unused dominator never lowers the rating
+    or raises the cost, so an optimal bundle exists among the first max_items
+    dominance layers. Each layer is one vectorized running-max pass over the
+    rows in price order.
+
+    When price and rating rise together almost every row is on a layer, so
+    each layer keeps at most MAX_CANDIDATES / max_items rows: the best rated
+    and the best rated per unit of price. The DP is then exact over those
+    candidates only, and solve_bundle() still never returns less than greedy.
+    """
+    per_layer = max(2, MAX_CANDIDATES // max_items)
+    remaining = by_price
+    kept: list[np.ndarray] = []
+    for _ in range(max_items):
+        if len(remaining) == 0:
+            break
+        values = ratings[remaining]
+        best_before = np.maximum.accumulate(np.concatenate(([-np.inf], values[:-1])))
+        layer = values > best_before
+        rows = remaining[layer]
+        kept.append(rows if len(rows) <= per_layer else _top_of_layer(rows, prices, ratings, per_layer))
+        remaining = remaining[~layer]
+    return np.sort(np.concatenate(kept)) if kept else _EMPTY
+
+
+def _top_of_layer(rows: np.ndarray, prices: np.ndarray, ratings: np.ndarray, limit: int) -> np.ndarray:
+    """Up to limit rows of one layer: half by rating, the rest by rating per unit of price."""
+    by_rating = rows[np.argpartition(-ratings[rows], limit // 2 - 1)[: limit // 2]]
+    rest = np.setdiff1d(rows, by_rating, assume_unique=True)
+    take = min(limit - len(by_rating), len(rest))
+    by_value = rest[np.argpartition(-(ratings[rest] / prices[rest]), take - 1)[:take]] if take else _EMPTY
+    return np.concatenate([by_rating, by_value])
+
+
+def _knapsack(prices: np.ndarray, ratings: np.ndarray, budget: float, max_items: int) -> np.ndarray:
+    """Exact DP on prices rounded up to budget units; returns indices of the best bundle."""
+    n = len(prices)
+    if n == 0:
+        return _EMPTY
+
+    units = int(min(MAX_UNITS, max(1, MAX_CELLS // n), max(1, round(budget * 100))))
+    unit = budget / units
+    weights = np.ceil(prices / unit - 1e-9).astype(np.int64)
+    capacity = units
+
+    # best[k, w]: highest total rating using exactly k items and weight <= w.
+    best = np.full((max_items + 1, capacity + 1), -np.inf)
+    best[0, :] = 0.0
+    took = np.zeros((n, max_items + 1, capacity + 1), dtype=bool)
+
+    for i in range(n):
+        w = weights[i]
+        if w > capacity:
+            continue
+        candidate = best[:-1, : capacity + 1 - w] + ratings[i]
+        better = candidate > best[1:, w:]
+        best[1:, w:][better] = candidate[better]
+        took[i, 1:, w:] = better
+
+    k = int(np.argmax(best[:, capacity]))
+    w = capacity
+    picked: list[int] = []
+    for i in range(n - 1, -1, -1):
+        if k == 0:
+            break
+        if took[i, k, w]:
+            picked.append(i)
+            w -= weights[i]
+            k -= 1
+    return np.array(picked[::-1], dtype=np.int64)
+
+
+def _greedy(prices: np.ndarray, by_rating: np.ndarray, budget: float, max_items: int) -> np.ndarray:
+    """Highest-rated first, skipping what no longer fits (the previous recommendations logic)."""
+    ordered_prices = prices[by_rating]
+    picked: list[int] = []
+    remaining = budget
+    start = 0
+    while len(picked) < max_items and start < len(by_rating):
+        fits = np.flatnonzero(ordered_prices[start:] <= remaining + 1e-9)
+        if len(fits) == 0:
+            break
+        pos = start + int(fits[0])
+        picked.append(int(by_rating[pos]))
+        remaining -= ordered_prices[pos]
+        start = pos + 1
+    return np.array(picked, dtype=np.int64)
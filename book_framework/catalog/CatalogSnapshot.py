@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from .ColumnStore import ColumnStore, encode_strings, write_column_store
+from .CompactFrame import compact_frame
+from .FacetIndex import FacetIndex
+from .FilterIndex import FilterIndex
+from .QueryCache import QueryCache
+from .SearchIndex import SearchIndex
+from .SortIndex import SORT_COLUMNS, SortIndex
+from .SuggestIndex import SuggestIndex
+
+
+@dataclass(frozen=True)
+class DbSignature:
+    """Identity of a database file on disk; changes whenever the file is replaced or rewritten."""
+
+    inode: int
+    mtime_ns: int
+    size: int
+
+    @classmethod
+    def of(cls, path: str) -> DbSignature | None:
+        """Stat the file, or None if it does not exist (yet)."""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return cls(inode=st.st_ino, mtime_ns=st.st_mtime_ns, size=st.st_size)
+
+
+class CatalogSnapshot:
+    """Immutable view of one published catalog plus every structure derived from it.
+
+    A request grabs the current snapshot once and uses only that object, so a
+    reload swapping in a newer snapshot never changes data under its feet.
+
+    save_columns() writes the compact catalog and its search/sort/filter
+    indexes to a column store; from_columns() maps one back in, skipping the
+    expensive tokenizing and sorting. Columns come back as categoricals over
+    the mapped codes, so startup only decodes each distinct string once and
+    every worker shares the codes, bitsets and index arrays in the page cache.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        version: int,
+        signature: DbSignature | None = None,
+        search: SearchIndex | None = None,
+        sort: SortIndex | None = None,
+        filters: FilterIndex | None = None,
+    ) -> None:
+        started = time.perf_counter()
+        self.df = df.reset_index(drop=True)
+        self.version = version
+        self.signature = signature
+        self.loaded_at = time.time()
+        self._memo: dict[str, Any] = {}
+        self._memo_lock = threading.Lock()
+        self.column_store: str | None = None  # set when the indexes are mapped from a column store
+
+        self.search = search or SearchIndex.build(self.column("title"), self.column("author"))
+        self.filters = filters or FilterIndex.build(
+            self.column("category"),
+            self.column("store"),
+            self.column("price"),
+            self.column("rating"),
+        )
+        self.sort = sort or SortIndex.build({name: self.column(name) for name in SORT_COLUMNS})
+        self.queries = QueryCache()
+        # The indexes above read the plain columns; afterwards only the compact layout is kept.
+        self.df = compact_frame(self.df)
+
+        self.build_seconds = time.perf_counter() - started
+
+    @classmethod
+    def from_columns(cls, store: ColumnStore, version: int, signature: DbSignature | None = None) -> CatalogSnapshot:
+        """Snapshot over a column store written by save_columns(); every array stays memory-mapped."""
+        df = _frame_from_columns(store)
+        snapshot = cls(
+            df,
+            version,
+            signature,
+            search=SearchIndex.from_arrays(store, len(df)),
+            sort=SortIndex.from_arrays(store, decoded=_decoded_sort_values(store, df)),
+            # Stores written before the filter bitsets were saved get them rebuilt.
+            filters=FilterIndex.from_arrays(store, len(df)) if "filter.price.values" in store else None,
+        )
+        snapshot.column_store = store.path
+        return snapshot
+
+    def save_columns(self, path: str, meta: dict | None = None) -> None:
+        arrays, kinds = _frame_to_columns(self.df)
+        arrays.update(self.search.to_arrays())
+        arrays.update(self.sort.to_arrays())
+        arrays.update(self.filters.to_arrays())
+        write_column_store(path, arrays, {**(meta or {}), "n_rows": len(self.df), "columns": kinds})
+
+    def column(self, name: str) -> pd.Series:
+        """A column of the catalog, or an all-missing one if this DB predates it."""
+        if name in self.df.columns:
+            return self.df[name]
+        return pd.Series([None] * len(self.df), dtype=object)
+
+    def suggest_index(self) -> SuggestIndex:
+        """Typeahead index over the distinct titles and authors (memoize it; built on demand)."""
+        return SuggestIndex.build(self.column("title"), self.column("author"), pd.Series(self.filters.rating.values))
+
+    def facet_index(self) -> FacetIndex:
+        """Per-row category/store/price-bin codes for facet counts (memoize it; built on demand)."""
+        return FacetIndex.build(self.column("category"), self.column("store"), self.filters.price)
+
+    def memory_usage(self) -> dict:
+        """Bytes held per frame column and per index (mapped arrays count in full)."""
+        return {
+            "columns": {name: int(n) for name, n in self.df.memory_usage(index=False, deep=True).items()},
+            "search": self.search.nbytes,
+            "filters": self.filters.nbytes,
+            "sort": self.sort.nbytes,
+            "query_cache": self.queries.nbytes,
+        }
+
+    def memo(self, key: str, factory: Callable[[CatalogSnapshot], Any]) -> Any:
+        """Compute a derived value (e.g. a pre-serialized payload) at most once per snapshot."""
+        try:
+            return self._memo[key]
+        except KeyError:
+            pass
+        with self._memo_lock:
+            if key not in self._memo:
+                self._memo[key] = factory(self)
+            return self._memo[key]
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+
+# ── Column store encoding ─────────────────────────────────────────────────────
+#
+# numeric  col.<name>                                     the (compact) values as is
+# strings  col.<name>.codes + col.<name>.data/.offsets    categorical codes (-1 = missing) + the categories
+# combos   col.<name>.codes + .combos + .items + .data/.offsets
+#                                                         code of each row's category combination; CSR
+#                                                         (.combos bounds) of each combination's items
+# lists    col.<name>.rows + .codes + .data/.offsets      CSR of dictionary codes per row (older stores)
+
+
+def _frame_to_columns(df: pd.DataFrame) -> tuple[dict[str, np.ndarray], list[list[str]]]:
+    arrays: dict[str, np.ndarray] = {}
+    kinds: list[list[str]] = []
+    for name in df.columns:
+        series = df[name]
+        present = series.dropna()
+        if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+            kinds.append([name, "numeric"])
+            arrays[f"col.{name}"] = series.to_numpy()
+            continue
+        if not isinstance(series.dtype, pd.CategoricalDtype) and all(isinstance(v, str) for v in present):
+            series = series.astype("category")
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            categories = list(series.cat.categories)
+            arrays[f"col.{name}.codes"] = series.cat.codes.to_numpy()
+            if all(isinstance(c, str) for c in categories):
+                kind = "strings"
+                arrays[f"col.{name}.data"], arrays[f"col.{name}.offsets"] = encode_strings(categories)
+            elif all(isinstance(c, tuple) for c in categories):
+                kind = "combos"
+                items = sorted({item for combo in categories for item in combo})
+                ids = {item: i for i, item in enumerate(items)}
+                bounds = np.zeros(len(categories) + 1, dtype=np.int64)
+                np.cumsum([len(combo) for combo in categories], out=bounds[1:])
+                arrays[f"col.{name}.combos"] = bounds
+                arrays[f"col.{name}.items"] = np.fromiter(
+                    (ids[item] for combo in categories for item in combo), dtype=np.int32, count=int(bounds[-1])
+                )
+                arrays[f"col.{name}.data"], arrays[f"col.{name}.offsets"] = encode_strings(items)
+            else:
+                raise TypeError(f"Column {name!r} has categories the column store cannot encode")
+        elif all(isinstance(v, list) for v in present):
+            kind = "lists"
+            lengths = present.map(len).reindex(series.index, fill_value=0).to_numpy()
+            offsets = np.zeros(len(series) + 1, dtype=np.int64)
+            np.cumsum(lengths, out=offsets[1:])
+            codes, uniques = pd.factorize(present.explode().dropna().astype(str), sort=True)
+            arrays[f"col.{name}.rows"] = offsets
+            arrays[f"col.{name}.codes"] = codes.astype(np.int32)
+            arrays[f"col.{name}.data"], arrays[f"col.{name}.offsets"] = encode_strings(uniques)
+        else:
+            raise TypeError(f"Column {name!r} has values the column store cannot encode")
+        kinds.append([name, kind])
+    return arrays, kinds
+
+
+def _frame_from_columns(store: ColumnStore) -> pd.DataFrame:
+    n_rows = store.meta["n_rows"]
+    columns: dict[str, pd.Series] = {}
+    for name, kind in store.meta["columns"]:
+        if kind == "numeric":
+            columns[name] = pd.Series(store[f"col.{name}"], copy=False)
+        elif kind == "strings":
+            columns[name] = _categorical(store[f"col.{name}.codes"], store.strings(f"col.{name}"))
+        elif kind == "combos":
+            items = store.strings(f"col.{name}")
+            flat = [items[i] for i in store[f"col.{name}.items"].tolist()]
+            bounds = store[f"col.{name}.combos"].tolist()
+            combos = np.empty(len(bounds) - 1, dtype=object)
+            for i, (start, stop) in enumerate(zip(bounds[:-1], bounds[1:], strict=True)):
+                combos[i] = tuple(flat[start:stop])
+            columns[name] = _categorical(store[f"col.{name}.codes"], combos)
+        else:
+            values = np.array(store.strings(f"col.{name}"), dtype=object)
+            flat = values[store[f"col.{name}.codes"]].tolist()
+            bounds = store[f"col.{name}.rows"].tolist()
+            columns[name] = pd.Series([flat[a:b] for a, b in zip(bounds[:-1], bounds[1:], strict=True)], dtype=object)
+    return pd.DataFrame(columns, index=pd.RangeIndex(n_rows), copy=False)
+
+
+def _decoded_sort_values(store: ColumnStore, df: pd.DataFrame) -> dict[str, np.ndarray]:
+    """Categories of the string columns whose bytes match the sort index's distinct values, so both share one decode."""
+    decoded: dict[str, np.ndarray] = {}
+    for name in SORT_COLUMNS:
+        sort_key, column_key = f"sort.{name}.uniques", f"col.{name}"
+        if (
+            f"{sort_key}.data" in store
+            and f"{column_key}.data" in store
+            and name in df.columns
+            and isinstance(df[name].dtype, pd.CategoricalDtype)
+            and np.array_equal(store[f"{sort_key}.offsets"], store[f"{column_key}.offsets"])
+            and np.array_equal(store[f"{sort_key}.data"], store[f"{column_key}.data"])
+        ):
+            decoded[name] = df[name].cat.categories.to_numpy()
+    return decoded
+
+
+def _categorical(codes: np.ndarray, categories) -> pd.Series:
+    """Categorical column over mapped codes; the codes are used in place, not copied."""
+    dtype = pd.CategoricalDtype(pd.Index(categories, dtype=object, tupleize_cols=False))
+    return pd.Series(pd.Categorical.from_codes(codes, dtype=dtype), copy=False)
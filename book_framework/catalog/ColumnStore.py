@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import struct
+from collections.abc import Iterable
+
+import numpy as np
+
+MAGIC = b"BKCOLS01"
+_ALIGN = 64
+_HEADER_LEN = struct.Struct("<Q")
+
+
+def db_fingerprint(db_path: str) -> str:
+    """Cheap content identity of a SQLite file: its size plus a digest of the 100-byte header.
+
+    The header holds the change counter, page count and user_version, so any
+    committed write or a different release changes it, while copying or
+    downloading the same file does not.
+    """
+    with open(db_path, "rb") as f:
+        header = f.read(100)
+    return f"{os.path.getsize(db_path)}:{hashlib.blake2b(header, digest_size=12).hexdigest()}"
+
+
+def column_store_path(db_path: str) -> str:
+    """Where the column store of a release lives: next to the DB, e.g. final_books.columns."""
+    return os.path.splitext(db_path)[0] + ".columns"
+
+
+def open_column_store(db_path: str) -> ColumnStore | None:
+    """The column store written for exactly this DB file, or None if it is missing or stale."""
+    path = column_store_path(db_path)
+    try:
+        store = ColumnStore(path)
+    except (FileNotFoundError, ValueError):
+        return None
+    if store.meta.get("db_fingerprint") != db_fingerprint(db_path):
+        return None
+    return store
+
+
+def write_column_store(path: str, arrays: dict[str, np.ndarray], meta: dict) -> None:
+    """Write named arrays into one file, each 64-byte aligned so readers can map them in place.
+
+    The file is written next to its destination and renamed over it, so a
+    reader never sees a partial store.
+    """
+    arrays = dict(arrays)
+    layout: dict[str, dict] = {}
+    offset = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        if array.dtype == object:
+            raise TypeError(f"Column store array {name!r} has object dtype")
+        arrays[name] = array
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += _aligned(array.nbytes)
+
+    header = json.dumps({"meta": meta, "arrays": layout}, ensure_ascii=False).encode("utf-8")
+    data_start = _aligned(len(MAGIC) + _HEADER_LEN.size + len(header))
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(_HEADER_LEN.pack(len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name]["offset"])
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp, path)
+
+
+class ColumnStore:
+    """Read-only, memory-mapped view of a file written by write_column_store().
+
+    Arrays are zero-copy views into one shared mapping, so every process
+    opening the same file shares a single page-cache copy of the data.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a column store")
+            (header_len,) = _HEADER_LEN.unpack(f.read(_HEADER_LEN.size))
+            header = json.loads(f.read(header_len))
+        self.meta: dict = header["meta"]
+        self._layout: dict[str, dict] = header["arrays"]
+        self._data_start = _aligned(len(MAGIC) + _HEADER_LEN.size + header_len)
+        self._mmap = np.memmap(path, dtype=np.uint8, mode="r") if os.path.getsize(path) > self._data_start else None
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        spec = self._layout[name]
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        start = self._data_start + spec["offset"]
+        if count == 0:
+            return np.empty(spec["shape"], dtype=dtype)
+        raw = self._mmap[start : start + count * dtype.itemsize]
+        return np.ndarray(spec["shape"], dtype=dtype, buffer=raw)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._layout
+
+    def strings(self, name: str) -> list[str]:
+        """Decode a string array stored with encode_strings() under name."""
+        return decode_strings(self[f"{name}.data"], self[f"{name}.offsets"])
+
+
+def encode_strings(values: Iterable[str]) -> tuple[np.ndarray, np.ndarray]:
+    """UTF-8 blob plus n+1 byte offsets for a sequence of strings."""
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def decode_strings(data: np.ndarray, offsets: np.ndarray) -> list[str]:
+    blob = data.tobytes()
+    bounds = offsets.tolist()
+    return [blob[start:stop].decode("utf-8") for start, stop in zip(bounds[:-1], bounds[1:], strict=True)]
+
+
+def _aligned(n: int) -> int:
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+# Repeated strings kept as dictionary codes (pandas categoricals).
+DICTIONARY_COLUMNS = ("store", "author")
+# Per-row category lists, stored as one code per row into the distinct category combinations.
+LIST_COLUMNS = ("category",)
+# Decimal columns narrowed to float32 when every value survives the round trip at this many decimals.
+FLOAT32_DECIMALS = {"price": 2, "rating": 2}
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """The catalog in its compact in-memory layout; plain_values() reads it back.
+
+    store/author become categoricals, each category list becomes a code into
+    the few distinct combinations (held as tuples), price/rating become
+    float32 when they carry no more than two decimals, and integer columns
+    shrink to int32 when they fit. Anything else is kept as is, including
+    columns that already are categoricals (e.g. mapped from a column store).
+    """
+    columns: dict[str, pd.Series] = {}
+    for name in df.columns:
+        series = df[name]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            pass
+        elif name in DICTIONARY_COLUMNS and not pd.api.types.is_numeric_dtype(series.dtype):
+            series = series.astype(object).astype("category")
+        elif name in LIST_COLUMNS:
+            series = pd.Series(
+                pd.Categorical([tuple(v) if isinstance(v, (list, tuple)) else () for v in series]),
+                index=series.index,
+            )
+        elif name in FLOAT32_DECIMALS and series.dtype != np.float32 and _fits_float32(series, FLOAT32_DECIMALS[name]):
+            series = series.astype(np.float32)
+        elif pd.api.types.is_integer_dtype(series.dtype) and series.dtype.itemsize > 4 and _fits_int32(series):
+            series = series.astype(np.int32)
+        columns[name] = series
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+
+def plain_values(series: pd.Series) -> list:
+    """A (compact or plain) column as JSON-ready Python values: missing as None, combinations as lists."""
+    if isinstance(series.dtype, pd.CategoricalDtype) and series.name in LIST_COLUMNS:
+        combos = [list(combo) for combo in series.cat.categories]
+        return [combos[code] if code >= 0 else [] for code in series.cat.codes.tolist()]
+    if series.dtype == np.float32 and series.name in FLOAT32_DECIMALS:
+        series = series.astype(np.float64).round(FLOAT32_DECIMALS[series.name])
+    values = series.to_numpy(dtype=object, copy=True)
+    values[series.isna().to_numpy()] = None
+    return values.tolist()
+
+
+def expand_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """The plain layout back from compact_frame(): float64 decimals, object strings and list categories."""
+    columns: dict[str, pd.Series] = {}
+    for name in df.columns:
+        series = df[name]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            series = pd.Series(plain_values(series), index=series.index, dtype=object, name=name)
+        elif series.dtype == np.float32 and name in FLOAT32_DECIMALS:
+            series = series.astype(np.float64).round(FLOAT32_DECIMALS[name])
+        columns[name] = series
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+
+def category_counts(series: pd.Series) -> pd.Series:
+    """Rows per category, most common first (ties: the category seen first), from either layout."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        per_combo = np.bincount(codes[codes >= 0], minlength=len(series.cat.categories))
+        first_row = _first_rows(codes, len(series.cat.categories))
+        counts: dict[str, int] = {}
+        first: dict[str, tuple[int, int]] = {}
+        for code, combo in enumerate(series.cat.categories):
+            for position, category in enumerate(combo):
+                counts[category] = counts.get(category, 0) + int(per_combo[code])
+                first[category] = min(first.get(category, (first_row[code], position)), (first_row[code], position))
+        ordered = sorted((c for c in counts if counts[c] > 0), key=lambda c: (-counts[c], first[c]))
+        return pd.Series([counts[c] for c in ordered], index=pd.Index(ordered, dtype=object), dtype=np.int64)
+    exploded = series.explode().dropna()
+    return exploded.value_counts(sort=False).sort_values(ascending=False, kind="stable")
+
+
+def _first_rows(codes: np.ndarray, n_codes: int) -> np.ndarray:
+    first = np.full(n_codes, len(codes), dtype=np.int64)
+    present = codes >= 0
+    np.minimum.at(first, codes[present], np.flatnonzero(present))
+    return first
+
+
+def _fits_float32(series: pd.Series, decimals: int) -> bool:
+    if not pd.api.types.is_float_dtype(series.dtype):
+        return False
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    narrowed = values.astype(np.float32).astype(np.float64).round(decimals)
+    return bool(np.array_equal(narrowed, values, equal_nan=True))
+
+
+def _fits_int32(series: pd.Series) -> bool:
+    if series.hasnans:
+        return False
+    if series.empty:
+        return True
+    info = np.iinfo(np.int32)
+    return bool(info.min <= series.min() and series.max() <= info.max)
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from .FilterIndex import SortedColumn
+
+PRICE_BINS = 20
+PRICE_TOP_QUANTILE = 0.99  # equal-width bins up to here; the last bin also holds the few prices above it
+
+
+def top_price_position(n_prices: int) -> int:
+    """Position, in ascending price order, of the price where the equal-width bins end."""
+    return int(PRICE_TOP_QUANTILE * (n_prices - 1))
+
+
+def price_bins(low: float | None, high: float | None, bins: int = PRICE_BINS) -> tuple[float, float, int]:
+    """(low, width, count) of the catalog's price histogram, from its lowest and its top_price_position() price.
+
+    The bins depend on the whole catalog, not on the filters, so bars stay
+    comparable while the user filters. Both engines bin with
+    min(floor((price - low) / width), count - 1) and get the same bins.
+    """
+    if low is None or high is None:
+        return 0.0, 1.0, 0
+    if high <= low:
+        return low, 1.0, 1
+    return low, (high - low) / bins, bins
+
+
+def histogram_buckets(low: float, width: float, counts: np.ndarray, top: float) -> list[dict]:
+    """Histogram payload: one {min, max, count} per bin; the last bin reaches the highest price."""
+    edges = [round(low + i * width, 2) for i in range(len(counts) + 1)]
+    if len(counts):
+        edges[-1] = round(max(top, edges[-1]), 2)
+    return [{"min": edges[i], "max": edges[i + 1], "count": int(n)} for i, n in enumerate(counts.tolist())]
+
+
+class FacetIndex:
+    """Per-snapshot encodings of the faceted columns, so facet counts are bincounts over a mask.
+
+    Every row holds one category-combination code, one store code and one
+    price bin (-1 when missing). Counting a facet under a filter state is a
+    single bincount of the masked codes: per-combination counts are spread to
+    their categories through a small combination -> category table, instead
+    of evaluating the filters once per facet value.
+
+    Categories are counted case-insensitively, like the category filter, so
+    every spelling listed by /api/filters shows the rows it would select.
+    """
+
+    def __init__(
+        self,
+        category_names: list[str],
+        category_keys: np.ndarray,
+        combo_offsets: np.ndarray,
+        combo_keys: np.ndarray,
+        combo_codes: np.ndarray,
+        store_names: list[str],
+        store_codes: np.ndarray,
+        price: tuple[float, float, int],
+        price_top: float,
+        price_codes: np.ndarray,
+    ) -> None:
+        self.category_names = category_names
+        self.category_keys = category_keys
+        self.combo_offsets = combo_offsets
+        self.combo_keys = combo_keys
+        self.combo_codes = combo_codes
+        self.store_names = store_names
+        self.store_codes = store_codes
+        self.price = price
+        self.price_top = price_top
+        self.price_codes = price_codes
+
+    @classmethod
+    def build(cls, category: pd.Series, store: pd.Series, price: SortedColumn) -> FacetIndex:
+        combo_codes, combos = _codes(category if isinstance(category.dtype, pd.CategoricalDtype) else _combos(category))
+        used = np.bincount(combo_codes[combo_codes >= 0], minlength=len(combos)) > 0
+        names = sorted({name for combo, present in zip(combos, used, strict=True) if present for name in combo})
+        key_of, keys = pd.factorize(pd.Series([name.lower() for name in names], dtype=object))
+        key_ids = dict(zip(keys, range(len(keys)), strict=True))
+
+        per_combo = [sorted({key_ids[name.lower()] for name in combo if name.lower() in key_ids}) for combo in combos]
+        combo_offsets = np.zeros(len(combos) + 1, dtype=np.int64)
+        np.cumsum([len(k) for k in per_combo], out=combo_offsets[1:])
+        combo_keys = np.fromiter((k for ks in per_combo for k in ks), dtype=np.int32, count=int(combo_offsets[-1]))
+
+        # Stores are listed sorted, like /api/filters; codes are renumbered to match.
+        codes, stores = _codes(store)
+        order = sorted(range(len(stores)), key=stores.__getitem__)
+        rank = np.empty(len(stores), dtype=np.int32)
+        rank[order] = np.arange(len(stores), dtype=np.int32)
+        store_codes = np.full(len(codes), -1, dtype=np.int32)
+        store_codes[codes >= 0] = rank[codes[codes >= 0]]
+
+        prices = price.sorted_values
+        if len(prices):
+            low, width, bins = price_bins(float(prices[0]), float(prices[top_price_position(len(prices))]))
+        else:
+            low, width, bins = price_bins(None, None)
+        price_codes = np.full(price.n_rows, -1, dtype=np.int16)
+        present = ~np.isnan(price.values)
+        if bins:
+            price_codes[present] = np.minimum(np.floor((price.values[present] - low) / width), bins - 1)
+        top = float(price.sorted_values[-1]) if len(price.sorted_values) else 0.0
+
+        return cls(
+            names,
+            key_of.astype(np.int32),
+            combo_offsets,
+            combo_keys,
+            combo_codes.astype(np.int32),
+            [stores[i] for i in order],
+            store_codes,
+            (low, width, bins),
+            top,
+            price_codes,
+        )
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.category_keys, self.combo_offsets, self.combo_keys, self.combo_codes)
+        return sum(a.nbytes for a in arrays) + self.store_codes.nbytes + self.price_codes.nbytes
+
+    def counts(
+        self,
+        category_rows: np.ndarray | None = None,
+        store_rows: np.ndarray | None = None,
+        price_rows: np.ndarray | None = None,
+    ) -> dict:
+        """Facet counts, each under its own boolean row mask (None: every row).
+
+        Passing each facet the filters of the other facets (but not its own)
+        gives the usual multi-select sidebar: picking one store still shows
+        how many rows the other stores would add.
+        """
+        per_combo = _bincount(self.combo_codes, category_rows, len(self.combo_offsets) - 1)
+        weights = np.repeat(per_combo, np.diff(self.combo_offsets))
+        per_key = np.bincount(self.combo_keys, weights=weights, minlength=len(self.category_names))
+        per_store = _bincount(self.store_codes, store_rows, len(self.store_names))
+        low, width, bins = self.price
+        per_bin = _bincount(self.price_codes, price_rows, bins)
+        return {
+            "categories": [
+                {"value": name, "count": int(per_key[key])}
+                for name, key in zip(self.category_names, self.category_keys.tolist(), strict=True)
+            ],
+            "stores": [{"value": name, "count": int(n)} for name, n in zip(self.store_names, per_store.tolist(), strict=True)],
+            "price_histogram": histogram_buckets(low, width, per_bin, self.price_top),
+        }
+
+
+def _codes(series: pd.Series) -> tuple[np.ndarray, list]:
+    """Dictionary codes (-1 for missing) and the distinct values of a plain or categorical column."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(dtype=np.int64), list(series.cat.categories)
+    codes, uniques = pd.factorize(pd.Series(series.to_numpy(dtype=object), dtype=object))
+    return codes.astype(np.int64), list(uniques)
+
+
+def _combos(series: pd.Series) -> pd.Series:
+    """Plain category lists as tuples, the values compact_frame() keeps as categories."""
+    values = np.empty(len(series), dtype=object)
+    values[:] = [tuple(v) if isinstance(v, (list, tuple)) else () for v in series]
+    return pd.Series(values, dtype=object)
+
+
+def _bincount(codes: np.ndarray, rows: np.ndarray | None, n: int) -> np.ndarray:
+    selected = codes if rows is None else codes[rows]
+    return np.bincount(selected[selected >= 0], minlength=n)
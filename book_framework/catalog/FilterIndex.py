@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+import numpy as np
+import pandas as pd
+
+from .ColumnStore import ColumnStore, encode_strings
+
+
+class SortedColumn:
+    """Row positions of a numeric column sorted by value; range filters become two searchsorted calls."""
+
+    def __init__(self, values: pd.Series) -> None:
+        raw = pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+        present = np.flatnonzero(~np.isnan(raw))
+        order = np.argsort(raw[present], kind="stable")
+        self.n_rows = len(raw)
+        self.values = raw
+        self.positions = present[order]  # NaN rows are left out: no range ever matches them
+        self.sorted_values = raw[self.positions]
+
+    def to_arrays(self, prefix: str) -> dict[str, np.ndarray]:
+        return {f"{prefix}.values": self.values, f"{prefix}.positions": self.positions, f"{prefix}.sorted": self.sorted_values}
+
+    @classmethod
+    def from_arrays(cls, store: ColumnStore, prefix: str) -> SortedColumn:
+        column = cls.__new__(cls)
+        column.values = store[f"{prefix}.values"]
+        column.positions = store[f"{prefix}.positions"]
+        column.sorted_values = store[f"{prefix}.sorted"]
+        column.n_rows = len(column.values)
+        return column
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes + self.positions.nbytes + self.sorted_values.nbytes
+
+    def between(self, low: float | None = None, high: float | None = None) -> np.ndarray:
+        """Boolean mask of rows with low <= value <= high (either bound optional)."""
+        start = 0 if low is None else int(np.searchsorted(self.sorted_values, low, side="left"))
+        stop = len(self.sorted_values) if high is None else int(np.searchsorted(self.sorted_values, high, side="right"))
+        mask = np.zeros(self.n_rows, dtype=bool)
+        if start < stop:
+            mask[self.positions[start:stop]] = True
+        return mask
+
+
+class FilterIndex:
+    """Per-snapshot secondary indexes for the category, store, price and rating filters.
+
+    Categories (matched case-insensitively) and stores (matched exactly) are
+    kept as one boolean bitset per distinct value, so a multi-select filter is
+    a bitwise OR of a few precomputed arrays. Price and rating are answered by
+    SortedColumn. Callers AND the resulting masks together.
+    """
+
+    def __init__(
+        self,
+        n_rows: int,
+        category_sets: dict[str, np.ndarray],
+        store_sets: dict[str, np.ndarray],
+        price: SortedColumn,
+        rating: SortedColumn,
+    ) -> None:
+        self.n_rows = n_rows
+        self.category_sets = category_sets
+        self.store_sets = store_sets
+        self.price = price
+        self.rating = rating
+
+    @classmethod
+    def build(cls, category: pd.Series, store: pd.Series, price: pd.Series, rating: pd.Series) -> FilterIndex:
+        n_rows = len(category)
+
+        # (row, lowercased category) pairs from the per-row category lists.
+        exploded = category.reset_index(drop=True).explode().dropna().astype(str)
+        category_sets = _bitsets(exploded.index.to_numpy(), exploded.str.lower().to_numpy(), n_rows)
+
+        stores = store.reset_index(drop=True).dropna()
+        store_sets = _bitsets(stores.index.to_numpy(), stores.to_numpy(), n_rows)
+
+        return cls(n_rows, category_sets, store_sets, SortedColumn(price), SortedColumn(rating))
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        """Arrays for write_column_store(); each bitset family is one (keys x rows) matrix."""
+        arrays: dict[str, np.ndarray] = {}
+        for kind, sets in (("categories", self.category_sets), ("stores", self.store_sets)):
+            keys = list(sets)
+            arrays[f"filter.{kind}.keys.data"], arrays[f"filter.{kind}.keys.offsets"] = encode_strings(keys)
+            arrays[f"filter.{kind}.bits"] = np.stack([sets[key] for key in keys]) if keys else np.zeros((0, self.n_rows), bool)
+        arrays.update(self.price.to_arrays("filter.price"))
+        arrays.update(self.rating.to_arrays("filter.rating"))
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, store: ColumnStore, n_rows: int) -> FilterIndex:
+        """The bitsets are rows of the mapped matrices, so every process shares one copy."""
+        category_sets, store_sets = (
+            dict(zip(store.strings(f"filter.{kind}.keys"), store[f"filter.{kind}.bits"], strict=True))
+            for kind in ("categories", "stores")
+        )
+        price = SortedColumn.from_arrays(store, "filter.price")
+        rating = SortedColumn.from_arrays(store, "filter.rating")
+        return cls(n_rows, category_sets, store_sets, price, rating)
+
+    @property
+    def nbytes(self) -> int:
+        bitsets = sum(bits.nbytes for sets in (self.category_sets, self.store_sets) for bits in sets.values())
+        return bitsets + self.price.nbytes + self.rating.nbytes
+
+    def categories_mask(self, categories: Iterable[str]) -> np.ndarray:
+        """Rows tagged with any of the given categories (case-insensitive)."""
+        return self._union(self.category_sets, {c.lower() for c in categories})
+
+    def stores_mask(self, stores: Iterable[str]) -> np.ndarray:
+        """Rows offered by any of the given stores."""
+        return self._union(self.store_sets, set(stores))
+
+    def categories_containing(self, fragment: str) -> np.ndarray:
+        """Rows tagged with any category whose name contains fragment (case-insensitive)."""
+        fragment = fragment.lower()
+        return self._union(self.category_sets, {c for c in self.category_sets if fragment in c})
+
+    def stores_named(self, name: str) -> np.ndarray:
+        """Rows offered by the store with this name, ignoring case."""
+        name = name.lower()
+        return self._union(self.store_sets, {s for s in self.store_sets if s.lower() == name})
+
+    def _union(self, sets: dict[str, np.ndarray], keys: set[str]) -> np.ndarray:
+        mask = np.zeros(self.n_rows, dtype=bool)
+        for key in keys:
+            bits = sets.get(key)
+            if bits is not None:
+                mask |= bits
+        return mask
+
+
+def _bitsets(rows: np.ndarray, values: np.ndarray, n_rows: int) -> dict[str, np.ndarray]:
+    codes, uniques = pd.factorize(values)
+    sets: dict[str, np.ndarray] = {}
+    for code, value in enumerate(uniques):
+        bits = np.zeros(n_rows, dtype=bool)
+        bits[rows[codes == code]] = True
+        sets[value] = bits
+    return sets
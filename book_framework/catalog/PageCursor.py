@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class PageCursor:
+    """Opaque keyset position in an /api/books result: the last row a client has seen.
+
+    row is a position in the snapshot identified by version and is only
+    trusted while that snapshot is live; after a hot swap the next page
+    resumes from the sort value, using url to step past the row itself.
+    offset counts the result rows up to and including that row, so the next
+    page knows its number without counting them again; it is only used
+    together with row, and tokens without it are still accepted.
+    """
+
+    version: int
+    row: int
+    sort_by: str
+    ascending: bool
+    value: str | float | None
+    url: str | None = None
+    offset: int | None = None
+
+    def encode(self) -> str:
+        payload = [self.version, self.row, self.sort_by, self.ascending, self.value, self.url, self.offset]
+        raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+    @classmethod
+    def decode(cls, token: str) -> PageCursor:
+        """Parse a token produced by encode(); raises ValueError for anything else."""
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            version, row, sort_by, ascending, value, url, *rest = json.loads(raw)
+            (offset,) = rest or (None,)
+        except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, TypeError, ValueError) as exc:
+            raise ValueError("malformed cursor") from exc
+        if not (
+            isinstance(version, int)
+            and isinstance(row, int)
+            and isinstance(sort_by, str)
+            and isinstance(ascending, bool)
+            and (value is None or (isinstance(value, (str, int, float)) and not isinstance(value, bool)))
+            and (url is None or isinstance(url, str))
+            and (offset is None or (isinstance(offset, int) and not isinstance(offset, bool) and offset >= 0))
+        ):
+            raise ValueError("malformed cursor")
+        return cls(version, row, sort_by, ascending, value, url, offset)
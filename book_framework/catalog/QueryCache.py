@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+import numpy as np
+
+from .SearchIndex import tokenize
+from .SortIndex import SORT_COLUMNS
+
+
+@dataclass(frozen=True)
+class CatalogQuery:
+    """Normalized /api/books filter + sort state; equal queries share one cache entry."""
+
+    search: str = ""
+    categories: tuple[str, ...] = ()
+    stores: tuple[str, ...] = ()
+    min_rating: float | None = None
+    min_price: float | None = None
+    max_price: float | None = None
+    sort_by: str = "title"
+    ascending: bool = True
+    fuzzy: bool = False
+    matches_nothing: bool = False  # the search had text but no word tokens (e.g. "!!!"), so no row matches it
+
+    @classmethod
+    def normalize(
+        cls,
+        search: str | None = None,
+        categories: Iterable[str] | None = (),
+        stores: Iterable[str] | None = (),
+        min_rating: float | None = None,
+        min_price: float | None = None,
+        max_price: float | None = None,
+        sort_by: str = "title",
+        sort_dir: str = "asc",
+        fuzzy: bool = False,
+    ) -> CatalogQuery:
+        tokens = tokenize(search)
+        matches_nothing = bool(search and search.strip()) and not tokens
+        search = " ".join(tokens)
+        return cls(
+            search=search,
+            categories=tuple(sorted({c.lower() for c in categories or ()})),
+            stores=tuple(sorted(set(stores or ()))),
+            min_rating=min_rating if min_rating is not None and min_rating > 0 else None,
+            min_price=min_price,
+            max_price=max_price,
+            sort_by=sort_by if sort_by in SORT_COLUMNS else "title",
+            ascending=sort_dir != "desc",
+            fuzzy=fuzzy and bool(search),
+            matches_nothing=matches_nothing,
+        )
+
+
+class QueryCache:
+    """Thread-safe LRU of ordered result rows per CatalogQuery, bounded by entries and bytes.
+
+    One cache belongs to one CatalogSnapshot, so swapping in a new snapshot
+    drops every entry at once. Arrays are stored read-only because they are
+    shared by all requests paging through the same result.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[CatalogQuery, np.ndarray] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, query: CatalogQuery) -> np.ndarray | None:
+        with self._lock:
+            rows = self._entries.get(query)
+            if rows is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(query)
+            self.hits += 1
+            return rows
+
+    def put(self, query: CatalogQuery, rows: np.ndarray) -> np.ndarray:
+        """Store rows (made read-only) and return them; oversized results are returned uncached."""
+        rows.flags.writeable = False
+        size = rows.nbytes
+        if size > self.max_bytes:
+            return rows
+
+        with self._lock:
+            previous = self._entries.pop(query, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+            self._entries[query] = rows
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+        return rows
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
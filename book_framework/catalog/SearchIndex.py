@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import bisect
+import re
+import sys
+import unicodedata
+from collections.abc import Iterable
+
+import numpy as np
+import pandas as pd
+
+from .ColumnStore import ColumnStore, encode_strings
+from .TrigramIndex import TrigramIndex
+
+# Romanian letters (both the comma-below and the legacy cedilla forms) plus
+# the usual Latin accents all fold to their bare ASCII letter.
+_FOLD = str.maketrans(
+    {
+        "ș": "s",
+        "ş": "s",
+        "ț": "t",
+        "ţ": "t",
+        "ă": "a",
+        "â": "a",
+        "î": "i",
+    }
+)
+_TOKEN_RE = re.compile(r"\w+")
+_EMPTY = np.empty(0, dtype=np.int32)
+
+
+def normalize_text(value) -> str:
+    """Lowercase and strip diacritics so 'Ștefan' and 'stefan' compare equal."""
+    if not isinstance(value, str):
+        return ""
+    text = value.casefold()
+    if text.isascii():
+        return text
+    text = text.translate(_FOLD)
+    if text.isascii():
+        return text
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(value) -> list[str]:
+    """Normalized word tokens of a title, author or query string."""
+    return _TOKEN_RE.findall(normalize_text(value))
+
+
+class SearchIndex:
+    """Inverted token index over title + author, stored as one CSR posting matrix.
+
+    The vocabulary is sorted, so every query token is matched as a prefix with
+    two bisects ("dostoi" finds "dostoievski"), and multi-word queries
+    intersect the posting lists of each token, smallest first. The cost is
+    proportional to the postings touched, not to the catalog size.
+
+    A trigram index over the same vocabulary backs fuzzy_lookup(), which also
+    accepts tokens spelled a little differently ("dostoevsky" finds
+    "dostoievski").
+    """
+
+    def __init__(
+        self,
+        vocab: list[str],
+        offsets: np.ndarray,
+        postings: np.ndarray,
+        n_rows: int,
+        trigrams: TrigramIndex | None = None,
+    ) -> None:
+        self.vocab = vocab
+        self.offsets = offsets
+        self.postings = postings
+        self.n_rows = n_rows
+        self.trigrams = trigrams if trigrams is not None else TrigramIndex.build(vocab)
+
+    @classmethod
+    def build(cls, *columns: pd.Series) -> SearchIndex:
+        """Index every token of the given text columns by row position."""
+        n_rows = len(columns[0]) if columns else 0
+        token_rows: list[np.ndarray] = []
+        token_values: list[np.ndarray] = []
+
+        for col in columns:
+            # Normalize each distinct string once; titles/authors repeat a lot across offers.
+            inverse, uniques = pd.factorize(pd.Series(col.to_numpy(), dtype=object))
+            tokens_of = np.empty(len(uniques) + 1, dtype=object)
+            tokens_of[:] = [tokenize(u) for u in uniques] + [[]]  # the -1 sentinel (missing) maps to []
+            exploded = pd.Series(tokens_of[inverse]).explode().dropna()
+            token_rows.append(exploded.index.to_numpy(dtype=np.int64))
+            token_values.append(exploded.to_numpy(dtype=object))
+
+        if not token_rows:
+            return cls([], np.zeros(1, dtype=np.int64), _EMPTY, n_rows)
+
+        rows = np.concatenate(token_rows)
+        codes, vocab = pd.factorize(np.concatenate(token_values), sort=True)
+
+        # Sort by (token, row) and drop repeats of a token within the same row.
+        order = np.lexsort((rows, codes))
+        codes, rows = codes[order], rows[order]
+        keep = np.ones(len(codes), dtype=bool)
+        keep[1:] = (codes[1:] != codes[:-1]) | (rows[1:] != rows[:-1])
+        codes, rows = codes[keep], rows[keep]
+
+        offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes, minlength=len(vocab)), out=offsets[1:])
+        return cls(list(vocab), offsets, rows.astype(np.int32), n_rows)
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        """Arrays for write_column_store(); from_arrays() maps them back without rebuilding."""
+        data, offsets = encode_strings(self.vocab)
+        return {
+            "search.vocab.data": data,
+            "search.vocab.offsets": offsets,
+            "search.offsets": self.offsets,
+            "search.postings": self.postings,
+            **self.trigrams.to_arrays("search.trigrams"),
+        }
+
+    @classmethod
+    def from_arrays(cls, store: ColumnStore, n_rows: int) -> SearchIndex:
+        # Stores written before the trigram index existed get it rebuilt from the vocabulary.
+        trigrams = TrigramIndex.from_arrays(store, "search.trigrams") if "search.trigrams.offsets" in store else None
+        return cls(store.strings("search.vocab"), store["search.offsets"], store["search.postings"], n_rows, trigrams)
+
+    def __len__(self) -> int:
+        return len(self.vocab)
+
+    @property
+    def nbytes(self) -> int:
+        vocab = sys.getsizeof(self.vocab) + sum(sys.getsizeof(token) for token in self.vocab)
+        return vocab + self.offsets.nbytes + self.postings.nbytes + self.trigrams.nbytes
+
+    def _prefix_ids(self, prefix: str) -> range:
+        """Vocabulary ids of the tokens that start with prefix (one contiguous run)."""
+        lo = bisect.bisect_left(self.vocab, prefix)
+        return range(lo, bisect.bisect_left(self.vocab, prefix + "\uffff", lo))
+
+    def _rows_of(self, ids: Iterable[int]) -> np.ndarray:
+        """Sorted, unique row positions holding any of the token ids."""
+        spans = [self.postings[self.offsets[i] : self.offsets[i + 1]] for i in ids]
+        if not spans:
+            return _EMPTY
+        if len(spans) == 1:
+            return spans[0]
+        total = sum(len(span) for span in spans)
+        if total * 16 < self.n_rows:
+            return np.unique(np.concatenate(spans))
+        # Large unions: marking a row mask is linear, where sorting the concatenation is not.
+        mask = np.zeros(self.n_rows, dtype=bool)
+        for span in spans:
+            mask[span] = True
+        return np.flatnonzero(mask).astype(np.int32)
+
+    def _prefix_rows(self, prefix: str) -> np.ndarray:
+        """Sorted row positions holding any token that starts with prefix."""
+        return self._rows_of(self._prefix_ids(prefix))
+
+    def _fuzzy_rows(self, token: str) -> np.ndarray:
+        """Sorted row positions holding a token starting with token, or one of its similar_tokens()."""
+        ids, _ = self.trigrams.similar(token)
+        return self._rows_of(sorted({*self._prefix_ids(token), *ids.tolist()}))
+
+    def lookup(self, query: str | None) -> np.ndarray | None:
+        """Sorted row positions matching every query token.
+
+        None if the query is blank (no search); a query with text but no word
+        tokens, such as "!!!", matches no row.
+        """
+        tokens = _dedupe(tokenize(query))
+        if not tokens:
+            return _no_tokens(query)
+        return _intersect([self._prefix_rows(t) for t in tokens])
+
+    def fuzzy_lookup(self, query: str | None) -> np.ndarray | None:
+        """Like lookup(), but each query token also matches the rows of its similar_tokens()."""
+        tokens = _dedupe(tokenize(query))
+        if not tokens:
+            return _no_tokens(query)
+        return _intersect([self._fuzzy_rows(t) for t in tokens])
+
+    def similar_tokens(self, token: str) -> list[str]:
+        """Vocabulary tokens spelled like token (trigram similarity), most similar first."""
+        ids, _ = self.trigrams.similar(token)
+        return [self.vocab[i] for i in ids.tolist()]
+
+
+def _no_tokens(query: str | None) -> np.ndarray | None:
+    return _EMPTY if query and query.strip() else None
+
+
+def _dedupe(tokens: Iterable[str]) -> list[str]:
+    return list(dict.fromkeys(tokens))
+
+
+def _intersect(lists: list[np.ndarray]) -> np.ndarray:
+    """Intersection of sorted, unique row arrays, smallest first."""
+    lists = sorted(lists, key=len)
+    result = lists[0]
+    for other in lists[1:]:
+        if len(result) == 0:
+            break
+        result = np.intersect1d(result, other, assume_unique=True)
+    return result
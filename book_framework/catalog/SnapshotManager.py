@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+import pandas as pd
+from scrape_kit import get_logger
+
+from .CatalogSnapshot import CatalogSnapshot, DbSignature
+
+logger = get_logger(__name__)
+
+
+class SnapshotManager:
+    """Watches a database file and hot-swaps CatalogSnapshots built in a background thread.
+
+    Readers call current(), which only ever returns an already built snapshot.
+    The sole exception is the very first load, since there is nothing to serve
+    before it. A changed file must keep the same signature for two consecutive
+    polls before it is loaded, so a release that is still being copied in is
+    never picked up half-written. An optional prepare callback runs on the new
+    snapshot before the swap, so expensive derived payloads are warm by the
+    time the first request sees it.
+
+    By default the loader returns a DataFrame wrapped in a CatalogSnapshot; a
+    different factory(loaded, version, signature) lets other engines (e.g.
+    SqlCatalog) reuse the same settle-and-swap logic.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        loader: Callable[[str], pd.DataFrame],
+        poll_interval: float = 30.0,
+        prepare: Callable[[CatalogSnapshot], None] | None = None,
+        factory: Callable[[Any, int, DbSignature], Any] = CatalogSnapshot,
+    ) -> None:
+        self.db_path = db_path
+        self.loader = loader
+        self.poll_interval = poll_interval
+        self.prepare = prepare
+        self.factory = factory
+
+        self._snapshot: CatalogSnapshot | None = None
+        self._version = 0
+        self._pending: DbSignature | None = None
+        self._error: Exception | None = None
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._swap_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+        # Reported by the metrics endpoint.
+        self.load_seconds: float | None = None  # load + build + prepare of the live snapshot
+        self.failures = 0
+
+    # ── Lifecycle ──────────────────────────────────────────────────────────────
+
+    def start(self) -> None:
+        """Start the watcher thread (idempotent); the initial load begins immediately."""
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, name="snapshot-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    # ── Public API ─────────────────────────────────────────────────────────────
+
+    def current(self, timeout: float | None = None) -> CatalogSnapshot:
+        """Return the live snapshot, waiting only if none has been built yet."""
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+
+        if DbSignature.of(self.db_path) is None:
+            raise FileNotFoundError(f"Database not found at '{self.db_path}'. Set the BOOKS_DB_PATH environment variable.")
+
+        self.start()
+        self._ready.wait(timeout)
+        snapshot = self._snapshot
+        if snapshot is None:
+            raise self._error or TimeoutError(f"Timed out waiting for the first snapshot of '{self.db_path}'")
+        return snapshot
+
+    @property
+    def live(self) -> CatalogSnapshot | None:
+        """The live snapshot, or None before the first load; never waits."""
+        return self._snapshot
+
+    def refresh(self) -> bool:
+        """Check the file once and reload if it changed; returns True if a new snapshot was swapped in."""
+        signature = DbSignature.of(self.db_path)
+        if signature is None:
+            return False
+
+        current = self._snapshot
+        if current is not None:
+            if signature == current.signature:
+                self._pending = None
+                return False
+            # Wait for the file to settle before reading a new release.
+            if signature != self._pending:
+                self._pending = signature
+                return False
+
+        return self._reload(signature)
+
+    # ── Internals ──────────────────────────────────────────────────────────────
+
+    def _watch(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error("Snapshot watcher error for %s: %s", self.db_path, e)
+            self._stop.wait(self.poll_interval)
+
+    def _reload(self, signature: DbSignature) -> bool:
+        started = time.perf_counter()
+        try:
+            loaded = self.loader(self.db_path)
+            snapshot = self.factory(loaded, self._version + 1, signature)
+        except Exception as e:
+            logger.error("Failed to load snapshot from %s: %s", self.db_path, e)
+            self._error = e
+            self.failures += 1
+            if self._snapshot is None:
+                # Unblock first-load waiters; the next poll retries.
+                self._ready.set()
+                self._ready = threading.Event()
+            return False
+
+        if self.prepare is not None:
+            try:
+                self.prepare(snapshot)
+            except Exception as e:
+                # Not fatal: whatever failed to warm is computed on first use instead.
+                logger.warning("Snapshot v%d prepare step failed: %s", snapshot.version, e)
+
+        load_seconds = time.perf_counter() - started
+        with self._swap_lock:
+            self.load_seconds = load_seconds
+            self._version = snapshot.version
+            self._snapshot = snapshot
+            self._pending = None
+            self._error = None
+        self._ready.set()
+
+        logger.info(
+            "Loaded catalog snapshot v%d: %d rows in %.2fs",
+            snapshot.version,
+            len(snapshot),
+            load_seconds,
+        )
+        return True
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import sys
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+import pandas as pd
+
+from .ColumnStore import ColumnStore, encode_strings
+
+SORT_COLUMNS = ("title", "author", "price", "rating")
+
+
+class SortIndex:
+    """Presorted row permutations for every sortable column, in both directions.
+
+    Each permutation is stable (ties keep catalog order) and puts missing
+    values last regardless of direction, matching sort_values(na_position="last").
+    A filtered, sorted result is then one permutation with the rows that
+    do not match dropped.
+
+    The dense sort codes are kept as well, so a position inside any ordered
+    subsequence of a permutation can be found by binary search on
+    (sort key, row), which is what keyset pagination resumes from.
+    """
+
+    def __init__(
+        self,
+        permutations: dict[tuple[str, bool], np.ndarray],
+        codes: dict[str, np.ndarray] | None = None,
+        uniques: dict[str, np.ndarray] | None = None,
+    ) -> None:
+        self.permutations = permutations
+        self.codes = codes or {}
+        self.uniques = uniques or {}
+
+    @classmethod
+    def build(cls, columns: dict[str, pd.Series]) -> SortIndex:
+        permutations: dict[tuple[str, bool], np.ndarray] = {}
+        all_codes: dict[str, np.ndarray] = {}
+        all_uniques: dict[str, np.ndarray] = {}
+        for name, values in columns.items():
+            codes, uniques = pd.factorize(values.reset_index(drop=True), sort=True)
+            all_codes[name] = codes.astype(np.int32)
+            all_uniques[name] = np.asarray(uniques, dtype=object)
+            n_keys = len(uniques)
+            missing = codes < 0
+            ascending = np.where(missing, n_keys, codes)
+            descending = np.where(missing, n_keys, n_keys - 1 - codes)
+            permutations[(name, True)] = np.argsort(ascending, kind="stable").astype(np.int32)
+            permutations[(name, False)] = np.argsort(descending, kind="stable").astype(np.int32)
+        return cls(permutations, all_codes, all_uniques)
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        """Arrays for write_column_store(); from_arrays() maps them back without re-sorting."""
+        arrays: dict[str, np.ndarray] = {}
+        for (name, ascending), perm in self.permutations.items():
+            arrays[f"sort.{name}.{'asc' if ascending else 'desc'}"] = perm
+        for name, codes in self.codes.items():
+            arrays[f"sort.{name}.codes"] = codes
+            uniques = self.uniques[name]
+            if len(uniques) and all(isinstance(u, str) for u in uniques):
+                data, offsets = encode_strings(uniques)
+                arrays[f"sort.{name}.uniques.data"] = data
+                arrays[f"sort.{name}.uniques.offsets"] = offsets
+            else:
+                arrays[f"sort.{name}.uniques"] = np.asarray(uniques.tolist(), dtype=np.float64)
+        return arrays
+
+    @classmethod
+    def from_arrays(
+        cls,
+        store: ColumnStore,
+        columns: tuple[str, ...] = SORT_COLUMNS,
+        decoded: dict[str, np.ndarray] | None = None,
+    ) -> SortIndex:
+        """decoded: distinct values the caller already holds for a column (e.g. its categories), used instead of decoding."""
+        decoded = decoded or {}
+        permutations: dict[tuple[str, bool], np.ndarray] = {}
+        codes: dict[str, np.ndarray] = {}
+        uniques: dict[str, np.ndarray] = {}
+        for name in columns:
+            permutations[(name, True)] = store[f"sort.{name}.asc"]
+            permutations[(name, False)] = store[f"sort.{name}.desc"]
+            codes[name] = store[f"sort.{name}.codes"]
+            if name in decoded:
+                values = decoded[name]
+            elif f"sort.{name}.uniques.data" in store:
+                values = store.strings(f"sort.{name}.uniques")
+            else:
+                values = store[f"sort.{name}.uniques"].tolist()
+            uniques[name] = np.asarray(values, dtype=object) if len(values) else np.empty(0, dtype=object)
+        return cls(permutations, codes, uniques)
+
+    @property
+    def nbytes(self) -> int:
+        arrays = [*self.permutations.values(), *self.codes.values(), *self.uniques.values()]
+        boxed = sum(sys.getsizeof(v) for u in self.uniques.values() if u.dtype == object for v in u)
+        return sum(a.nbytes for a in arrays) + boxed
+
+    def permutation(self, column: str, ascending: bool = True) -> np.ndarray:
+        return self.permutations[(column, ascending)]
+
+    def value(self, column: str, row: int):
+        """The sort value of row as a plain Python object, None when missing."""
+        code = int(self.codes[column][row])
+        if code < 0:
+            return None
+        value = self.uniques[column][code]
+        return value.item() if isinstance(value, np.generic) else value
+
+    def seek_row(self, rows: np.ndarray, column: str, ascending: bool, row: int) -> int:
+        """Index just past row in rows, an ordered subsequence of permutation(column, ascending).
+
+        O(log n): rows are strictly increasing in (rank, row), even when row
+        itself was filtered out of them.
+        """
+        rank = self._ranker(column, ascending)
+        return bisect_right(rows, (rank(row), row), key=lambda r: (rank(r), r))
+
+    def seek_value(self, rows: np.ndarray, column: str, ascending: bool, value, after: bool = False) -> int:
+        """Index of the first entry in rows whose sort value equals value or comes after it.
+
+        With after=True entries equal to value are skipped too. Used when the
+        row a cursor points at belongs to an older snapshot and only its sort
+        value is still meaningful.
+        """
+        uniques = self.uniques[column]
+        n_keys = len(uniques)
+        if value is None:
+            target = n_keys + int(after)
+        else:
+            pos = int(np.searchsorted(uniques, value, side="left"))
+            exact = int(pos < n_keys and uniques[pos] == value)
+            target = pos if ascending else n_keys - pos - exact
+            target += int(after and exact)
+        rank = self._ranker(column, ascending)
+        return bisect_left(rows, target, key=rank)
+
+    def _ranker(self, column: str, ascending: bool):
+        codes = self.codes[column]
+        n_keys = len(self.uniques[column])
+
+        def rank(row) -> int:
+            code = int(codes[row])
+            if code < 0:
+                return n_keys
+            return code if ascending else n_keys - 1 - code
+
+        return rank
+
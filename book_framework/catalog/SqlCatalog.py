@@ -0,0 +1,500 @@
+from __future__ import annotations
+
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import replace
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from scrape_kit import get_logger
+
+from .CatalogSnapshot import DbSignature
+from .FacetIndex import histogram_buckets, price_bins, top_price_position
+from .PageCursor import PageCursor
+from .QueryCache import CatalogQuery
+from .SortIndex import SORT_COLUMNS
+from .SuggestIndex import SuggestIndex
+from .TrigramIndex import TrigramIndex
+
+logger = get_logger(__name__)
+
+# PRAGMA user_version of a release written by BooksManager.finalize_release(): read-only from then on.
+RELEASE_LAYOUT_VERSION = 0x626B01
+MMAP_SIZE = 256 * 1024 * 1024
+
+COLUMNS = ("rowid", "isbn", "title", "author", "category", "rating", "goodreads_url", "store", "url", "price")
+
+_SELECT = ", ".join(f"b.{name}" for name in COLUMNS)
+_CATEGORIES_SQL = "SELECT DISTINCT category FROM book_categories ORDER BY category"
+_CATEGORY_SPLIT = re.compile(r"\s*,\s*")
+
+# Secondary structures the engine needs on top of the books table; created once per release.
+# price/rating carry the other column so the recommendations pool and rating-sorted
+# price filters are answered from the index alone (rowid is part of every index).
+_SCHEMA = (
+    "CREATE INDEX IF NOT EXISTS idx_title ON books(title)",  # BooksManager creates it; DBs built elsewhere may not have it
+    "CREATE INDEX IF NOT EXISTS idx_books_store ON books(store, price)",
+    "CREATE INDEX IF NOT EXISTS idx_books_price ON books(price, rating)",
+    "CREATE INDEX IF NOT EXISTS idx_books_rating ON books(rating, price)",
+    "CREATE INDEX IF NOT EXISTS idx_books_author ON books(author)",
+    "CREATE INDEX IF NOT EXISTS idx_books_url ON books(url)",
+    """
+    CREATE TABLE IF NOT EXISTS book_categories (
+        book_rowid INTEGER NOT NULL,
+        category TEXT NOT NULL,
+        category_key TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_book_categories_key ON book_categories(category_key, book_rowid)",
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5(
+        title, author,
+        content='books', content_rowid='rowid',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+)
+_SCHEMA_OBJECTS = {
+    "idx_title",
+    "idx_books_store",
+    "idx_books_price",
+    "idx_books_rating",
+    "idx_books_author",
+    "idx_books_url",
+    "book_categories",
+    "idx_book_categories_key",
+    "books_fts",
+}
+
+
+class SqlCatalog:
+    """Catalog queries pushed down to SQLite instead of an in-memory DataFrame.
+
+    Same contract as CatalogSnapshot for one published release: filters,
+    sort order (missing values last, ties in catalog order) and payloads
+    match the pandas path, but only the rows a request returns are ever read
+    into Python. Title/author search uses an FTS5 table with diacritics
+    removed and every query token matched as a prefix; categories live in a
+    book_categories side table so multi-select filters use an index.
+
+    prepare_db() creates those structures in the release file once, out of
+    band (the crawler does so when it finalizes a release); the server only
+    checks for them with check_db() and never writes the file. Each instance
+    reads it through per-thread read-only connections. Finalized releases are
+    opened with immutable=1, which skips file locking and change detection
+    entirely, and every connection memory-maps the file.
+    """
+
+    COLUMNS = COLUMNS
+
+    def __init__(self, db_path: str, version: int, signature: DbSignature | None = None) -> None:
+        self.db_path = db_path
+        self.version = version
+        self.signature = signature
+        self.loaded_at = time.time()
+        self._memo: dict[str, Any] = {}
+        self._memo_lock = threading.RLock()  # stores() is memoized from inside other memoized payloads
+        self.immutable = _user_version(db_path) == RELEASE_LAYOUT_VERSION
+        self._local = threading.local()
+        self._rows = self._conn().execute("SELECT COUNT(*) FROM books").fetchone()[0]
+
+    # ── Release preparation ────────────────────────────────────────────────────
+
+    @staticmethod
+    def prepare_db(db_path: str, rebuild: bool = False) -> str:
+        """Create the indexes, category table and FTS table if this release lacks them.
+
+        rebuild=True repopulates the category and FTS tables even if they
+        exist, for a DB whose books table was rewritten since.
+        """
+        conn = sqlite3.connect(db_path)
+        try:
+            existing = {name for (name,) in conn.execute("SELECT name FROM sqlite_master")}
+            if existing >= _SCHEMA_OBJECTS and not rebuild:
+                return db_path
+
+            started = time.perf_counter()
+            with conn:
+                for statement in _SCHEMA:
+                    conn.execute(statement)
+                conn.execute("DELETE FROM book_categories")
+                conn.executemany(
+                    "INSERT INTO book_categories (book_rowid, category, category_key) VALUES (?, ?, ?)",
+                    _category_rows(conn.execute("SELECT rowid, category FROM books WHERE category IS NOT NULL")),
+                )
+                conn.execute("INSERT INTO books_fts(books_fts) VALUES ('rebuild')")
+            conn.execute("ANALYZE")
+            logger.info("Prepared SQL catalog schema in %s in %.2fs", db_path, time.perf_counter() - started)
+        finally:
+            conn.close()
+        return db_path
+
+    @staticmethod
+    def check_db(db_path: str) -> str:
+        """The serving loader: make sure db_path was prepared, without writing to it.
+
+        Preparing here would change the file every worker is watching (and
+        reading with immutable=1), so an unprepared DB is an error instead.
+        """
+        conn = sqlite3.connect(Path(db_path).resolve().as_uri() + "?mode=ro", uri=True)
+        try:
+            existing = {name for (name,) in conn.execute("SELECT name FROM sqlite_master")}
+        finally:
+            conn.close()
+        missing = _SCHEMA_OBJECTS - existing
+        if missing:
+            raise RuntimeError(
+                f"{db_path} lacks the SQL catalog schema ({', '.join(sorted(missing))}); "
+                "run BooksManager.finalize_release() or SqlCatalog.prepare_db() on it before serving"
+            )
+        return db_path
+
+    # ── Queries ────────────────────────────────────────────────────────────────
+
+    def count(self, query: CatalogQuery, after: PageCursor | None = None) -> int:
+        """Rows matching query (only those sorting after the cursor, if one is given)."""
+        where, params = self._where(query)
+        if after is None:
+            return self._conn().execute(f"SELECT COUNT(*) FROM books b WHERE {where}", params).fetchone()[0]
+        return sum(
+            self._conn().execute(f"SELECT COUNT(*) FROM books b WHERE {where} AND {clause}", (*params, *values)).fetchone()[0]
+            for clause, values, _ in _runs(query, after)
+        )
+
+    def rows(self, query: CatalogQuery, limit: int, offset: int = 0, after: PageCursor | None = None) -> list[dict]:
+        """One page of matching rows in sort order, as JSON-ready dicts.
+
+        The first page and pages after a cursor are read run by run (see
+        _runs()), each run an index range with its own LIMIT, so a page costs
+        the rows it returns; only page numbers past the first use OFFSET.
+        """
+        conn = self._conn()
+        where, params = self._where(query)
+        if offset:
+            sql = f"SELECT {_SELECT} FROM books b WHERE {where} ORDER BY {_order_by(query)} LIMIT ? OFFSET ?"
+            return [_record(row) for row in conn.execute(sql, (*params, limit, offset))]
+
+        found: list[dict] = []
+        for clause, values, order_by in _runs(query, after):
+            if len(found) >= limit:
+                break
+            sql = f"SELECT {_SELECT} FROM books b WHERE {where} AND {clause} ORDER BY {order_by} LIMIT ?"
+            found += [_record(row) for row in conn.execute(sql, (*params, *values, limit - len(found)))]
+        return found
+
+    def iter_columns(self, query: CatalogQuery, chunk_rows: int) -> Iterator[list[list]]:
+        """Every matching row in sort order, chunk_rows at a time as column lists (COLUMNS order).
+
+        Uses a dedicated connection, since a streaming response may resume
+        the generator on a different worker thread.
+        """
+        where, params = self._where(query)
+        conn = self._connect()
+        try:
+            cursor = conn.execute(f"SELECT {_SELECT} FROM books b WHERE {where} ORDER BY {_order_by(query)}", params)
+            category = COLUMNS.index("category")
+            while chunk := cursor.fetchmany(chunk_rows):
+                columns = [list(values) for values in zip(*chunk, strict=True)]
+                columns[category] = [_split_categories(value) for value in columns[category]]
+                yield columns
+        finally:
+            conn.close()
+
+    def rows_by_id(self, rowids: np.ndarray) -> list[dict]:
+        """Rows with the given rowids, in the order given."""
+        ids = [int(r) for r in rowids]
+        if not ids:
+            return []
+        sql = f"SELECT {_SELECT} FROM books b WHERE b.rowid IN ({', '.join('?' * len(ids))})"
+        found = {row[0]: _record(row) for row in self._conn().execute(sql, ids)}
+        return [found[r] for r in ids if r in found]
+
+    def bundle_pool(self, budget: float, subject: str | None, store: str | None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(rowids, prices, ratings) of priced books within budget, optionally by category substring and store."""
+        clauses = ["b.price > 0", "b.price <= ?"]
+        params: list[Any] = [budget]
+        if subject:
+            clauses.append("b.rowid IN (SELECT book_rowid FROM book_categories WHERE instr(category_key, ?) > 0)")
+            params.append(subject.lower())
+        if store:
+            names = [s for s in self.stores() if s.lower() == store.lower()]
+            clauses.append(f"b.store IN ({', '.join('?' * len(names)) or 'NULL'})")
+            params.extend(names)
+        rows = self._conn().execute(
+            f"SELECT b.rowid, b.price, b.rating FROM books b WHERE {' AND '.join(clauses)}", params
+        ).fetchall()
+        table = np.array(rows, dtype=np.float64).reshape(-1, 3)
+        return table[:, 0].astype(np.int64), table[:, 1], table[:, 2]
+
+    def suggest_index(self) -> SuggestIndex:
+        """Typeahead index over the distinct titles and authors of this release (memoize it)."""
+        rows = self._conn().execute("SELECT title, author, rating FROM books ORDER BY rowid").fetchall()
+        titles, authors, ratings = zip(*rows, strict=True) if rows else ((), (), ())
+        return SuggestIndex.build(
+            pd.Series(titles, dtype=object),
+            pd.Series(authors, dtype=object),
+            pd.Series(ratings, dtype=np.float64),
+        )
+
+    def similar_terms(self, token: str) -> list[str]:
+        """FTS terms spelled like token (trigram similarity), most similar first; the index is built once."""
+        terms, trigrams = self.memo("trigrams", _fts_trigrams)
+        ids, _ = trigrams.similar(token)
+        return [terms[i] for i in ids.tolist()]
+
+    def locate(self, cursor: PageCursor) -> PageCursor:
+        """Translate a cursor issued against another release into this one.
+
+        Same-release cursors are returned as is once the url at their rowid
+        confirms it: versions are per-process counters, so another worker's
+        release can carry the same number. Otherwise the book is looked up by
+        url: if it still has the cursor's sort value, paging resumes right
+        after it; if not, it resumes at the first row with that value.
+        """
+        if cursor.sort_by not in SORT_COLUMNS:
+            raise ValueError(f"Unknown sort column {cursor.sort_by!r}")
+        if cursor.version == self.version and cursor.url is not None:
+            at_row = self._conn().execute("SELECT url FROM books WHERE rowid = ?", (cursor.row,)).fetchone()
+            if at_row is not None and at_row[0] == cursor.url:
+                return cursor
+        row = None
+        if cursor.url is not None:
+            found = self._conn().execute(
+                f"SELECT b.rowid, b.{cursor.sort_by} FROM books b WHERE b.url = ? ORDER BY b.rowid LIMIT 1",
+                (cursor.url,),
+            ).fetchone()
+            if found is not None and found[1] == cursor.value:
+                row = found[0]
+        return PageCursor(self.version, -1 if row is None else row, cursor.sort_by, cursor.ascending, cursor.value, cursor.url)
+
+    # ── Payloads ───────────────────────────────────────────────────────────────
+
+    def stores(self) -> list[str]:
+        sql = "SELECT DISTINCT store FROM books WHERE store IS NOT NULL ORDER BY store"
+        return self.memo("stores", lambda c: [store for (store,) in c._conn().execute(sql)])
+
+    def filters(self) -> dict:
+        conn = self._conn()
+        categories = [c for (c,) in conn.execute(_CATEGORIES_SQL)]
+        price_min, price_max = conn.execute("SELECT MIN(price), MAX(price) FROM books").fetchone()
+        return {
+            "categories": categories,
+            "stores": self.stores(),
+            "price_range": {
+                "min": round(price_min, 2) if price_min is not None else 0.0,
+                "max": round(price_max, 2) if price_max is not None else 1000.0,
+            },
+        }
+
+    def facets(self, query: CatalogQuery) -> dict:
+        """Same payload as FacetIndex.counts() plus the total: one GROUP BY per facet, each without its own filter."""
+        conn = self._conn()
+        where, params = self._where(query)
+        total = conn.execute(f"SELECT COUNT(*) FROM books b WHERE {where}", params).fetchone()[0]
+
+        where, params = self._where(replace(query, categories=()))
+        per_key = dict(
+            conn.execute(
+                "SELECT category_key, COUNT(DISTINCT book_rowid) FROM book_categories"
+                f" WHERE book_rowid IN (SELECT b.rowid FROM books b WHERE {where}) GROUP BY category_key",
+                params,
+            ).fetchall()
+        )
+        names = self.memo("categories", lambda c: [name for (name,) in c._conn().execute(_CATEGORIES_SQL)])
+
+        where, params = self._where(replace(query, stores=()))
+        sql = f"SELECT b.store, COUNT(*) FROM books b WHERE {where} GROUP BY b.store"
+        per_store = dict(conn.execute(sql, params).fetchall())
+
+        low, width, bins, top = self.memo("price_bins", _price_bins)
+        where, params = self._where(replace(query, min_price=None, max_price=None))
+        counts = np.zeros(bins, dtype=np.int64)
+        if bins:
+            for code, n in conn.execute(
+                f"SELECT MIN(CAST((b.price - ?) / ? AS INTEGER), ?), COUNT(*) FROM books b"
+                f" WHERE b.price IS NOT NULL AND {where} GROUP BY 1",
+                [low, width, bins - 1, *params],
+            ):
+                counts[code] = n
+
+        return {
+            "total": total,
+            "categories": [{"value": name, "count": per_key.get(name.lower(), 0)} for name in names],
+            "stores": [{"value": store, "count": per_store.get(store, 0)} for store in self.stores()],
+            "price_histogram": histogram_buckets(low, width, counts, top),
+        }
+
+    def insights(self) -> dict:
+        conn = self._conn()
+        avg_price = conn.execute("SELECT AVG(price) FROM books").fetchone()[0]
+        num_categories = conn.execute("SELECT COUNT(DISTINCT category) FROM book_categories").fetchone()[0]
+        bpc = [
+            {"category": category, "count": count}
+            for category, count in conn.execute(
+                "SELECT category, COUNT(*) AS n FROM book_categories"
+                " GROUP BY category ORDER BY n DESC, MIN(book_rowid) LIMIT 10"
+            )
+        ]
+        top_rated = [
+            {"title": title, "author": author, "rating": rating, "goodreads_url": url}
+            for title, author, rating, url in conn.execute(
+                "SELECT title, author, rating, goodreads_url FROM books WHERE rating > 0 ORDER BY rating DESC, rowid LIMIT 10"
+            )
+        ]
+        return {
+            "total_volumes": self._rows,
+            "avg_price": round(avg_price, 2) if avg_price is not None else 0.0,
+            "num_categories": num_categories,
+            "books_per_category": bpc,
+            "top_rated": top_rated,
+        }
+
+    def memo(self, key: str, factory: Callable[[SqlCatalog], Any]) -> Any:
+        """Compute a derived value (e.g. a pre-serialized payload) at most once per release."""
+        try:
+            return self._memo[key]
+        except KeyError:
+            pass
+        with self._memo_lock:
+            if key not in self._memo:
+                self._memo[key] = factory(self)
+            return self._memo[key]
+
+    def __len__(self) -> int:
+        return self._rows
+
+    # ── Internals ──────────────────────────────────────────────────────────────
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def _connect(self) -> sqlite3.Connection:
+        uri = Path(self.db_path).resolve().as_uri() + ("?mode=ro&immutable=1" if self.immutable else "?mode=ro")
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+        return conn
+
+    def _where(self, query: CatalogQuery) -> tuple[str, list[Any]]:
+        clauses: list[str] = []
+        params: list[Any] = []
+
+        if query.matches_nothing:
+            clauses.append("0")
+        elif query.search:
+            # Every query token must prefix-match a title/author token (or, fuzzy, match a similar one).
+            clauses.append("b.rowid IN (SELECT rowid FROM books_fts WHERE books_fts MATCH ?)")
+            params.append(self._match(query))
+
+        if query.categories:
+            placeholders = ", ".join("?" * len(query.categories))
+            clauses.append(f"b.rowid IN (SELECT book_rowid FROM book_categories WHERE category_key IN ({placeholders}))")
+            params.extend(query.categories)
+
+        if query.stores:
+            clauses.append(f"b.store IN ({', '.join('?' * len(query.stores))})")
+            params.extend(query.stores)
+
+        if query.min_rating is not None:
+            clauses.append("b.rating >= ?")
+            params.append(query.min_rating)
+
+        if query.min_price is not None:
+            clauses.append("b.price >= ?")
+            params.append(query.min_price)
+
+        if query.max_price is not None:
+            clauses.append("b.price <= ?")
+            params.append(query.max_price)
+
+        return " AND ".join(clauses) or "1", params
+
+    def _match(self, query: CatalogQuery) -> str:
+        tokens = query.search.split()
+        if not query.fuzzy:
+            return " AND ".join(f'"{token}"*' for token in tokens)
+        groups = (" OR ".join([f'"{token}"*', *(f'"{term}"' for term in self.similar_terms(token))]) for token in tokens)
+        return " AND ".join(f"({group})" for group in groups)
+
+
+def _price_bins(catalog: SqlCatalog) -> tuple[float, float, int, float]:
+    """price_bins() of the release plus its highest price; idx_books_price answers all three lookups."""
+    conn = catalog._conn()
+    n, low, top = conn.execute("SELECT COUNT(price), MIN(price), MAX(price) FROM books").fetchone()
+    high = None
+    if n:
+        sql = "SELECT price FROM books WHERE price IS NOT NULL ORDER BY price LIMIT 1 OFFSET ?"
+        (high,) = conn.execute(sql, (top_price_position(n),)).fetchone()
+    return (*price_bins(low, high), top or 0.0)
+
+
+def _fts_trigrams(catalog: SqlCatalog) -> tuple[list[str], TrigramIndex]:
+    """The FTS vocabulary (read through a connection-local fts5vocab table) and its trigram index."""
+    conn = catalog._conn()
+    conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS temp.books_fts_terms USING fts5vocab(main, books_fts, row)")
+    terms = [term for (term,) in conn.execute("SELECT term FROM temp.books_fts_terms")]
+    return terms, TrigramIndex.build(terms)
+
+
+def _user_version(db_path: str) -> int:
+    conn = sqlite3.connect(Path(db_path).resolve().as_uri() + "?mode=ro", uri=True)
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _order_by(query: CatalogQuery) -> str:
+    # sort_by is validated against SORT_COLUMNS by CatalogQuery, so it is safe to inline.
+    direction = "ASC" if query.ascending else "DESC"
+    return f"b.{query.sort_by} {direction} NULLS LAST, b.rowid"
+
+
+def _runs(query: CatalogQuery, cursor: PageCursor | None) -> list[tuple[str, list[Any], str]]:
+    """(predicate, params, ORDER BY) of the runs that follow the cursor, in sort order.
+
+    Ties of the cursor's value come first (in rowid order), then the values
+    beyond it, then the rows without a value; without a cursor, every value
+    and then the missing ones. Each run is one index range. A single OR of
+    them, or NULLS LAST over the whole column, makes SQLite sort every match
+    in a temp B-tree before it returns the first row. row -1 means 'from the
+    first row with this value'.
+    """
+    column = f"b.{query.sort_by}"
+    direction = "ASC" if query.ascending else "DESC"
+    missing = (f"{column} IS NULL", [], "b.rowid")
+    if cursor is None:
+        return [(f"{column} IS NOT NULL", [], f"{column} {direction}, b.rowid"), missing]
+    if cursor.value is None:
+        return [missing] if cursor.row < 0 else [(f"{column} IS NULL AND b.rowid > ?", [cursor.row], "b.rowid")]
+    if cursor.row < 0:
+        ties = (f"{column} = ?", [cursor.value], "b.rowid")
+    else:
+        ties = (f"{column} = ? AND b.rowid > ?", [cursor.value, cursor.row], "b.rowid")
+    beyond = (f"{column} {'>' if query.ascending else '<'} ?", [cursor.value], f"{column} {direction}, b.rowid")
+    return [ties, beyond, missing]
+
+
+def _record(row: tuple) -> dict:
+    record = dict(zip(COLUMNS, row, strict=True))
+    record["category"] = _split_categories(record["category"])
+    return record
+
+
+def _split_categories(value: str | None) -> list[str]:
+    # Same split as BooksManager.fetch_all_as_dataframe, so both engines return identical lists.
+    return [part for part in _CATEGORY_SPLIT.split(value) if part] if value else []
+
+
+def _category_rows(rows) -> Iterator[tuple[int, str, str]]:
+    for rowid, value in rows:
+        for category in _split_categories(value):
+            yield rowid, category, category.lower()
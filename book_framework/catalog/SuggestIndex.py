@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+
+import numpy as np
+import pandas as pd
+
+from .SearchIndex import normalize_text
+
+SUGGEST_LIMIT = 8
+_KINDS = ("title", "author")
+_MAX_CHAR = chr(0x10FFFF)
+
+
+class SuggestIndex:
+    """Typeahead over distinct titles and authors: sorted normalized keys, bisected by prefix.
+
+    Every distinct title and author (compared normalized, so offers of the
+    same book from several stores collapse) is one entry, scored by the best
+    rating among its rows. A prefix selects one contiguous run of the sorted
+    keys with two bisects; the best `limit` entries of the run are then
+    picked with argpartition, so the cost is the run length, not a scan.
+
+    Authors are also keyed from each later word, so "rebr" finds
+    "Liviu Rebreanu"; titles only from their start.
+    """
+
+    def __init__(
+        self,
+        keys: list[str],
+        key_entries: np.ndarray,
+        texts: list[str],
+        kinds: np.ndarray,
+        scores: np.ndarray,
+        offers: np.ndarray,
+    ) -> None:
+        self.keys = keys
+        self.key_entries = key_entries
+        self.texts = texts
+        self.kinds = kinds
+        self.scores = scores
+        self.offers = offers
+
+    @classmethod
+    def build(cls, titles: pd.Series, authors: pd.Series, ratings: pd.Series) -> SuggestIndex:
+        rating = pd.to_numeric(ratings, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+        rating = np.nan_to_num(rating, nan=0.0)
+
+        texts: list[str] = []
+        kinds: list[np.ndarray] = []
+        scores: list[np.ndarray] = []
+        offers: list[np.ndarray] = []
+        keys: list[str] = []
+        key_entries: list[int] = []
+        for kind, column in enumerate((titles, authors)):
+            entry_keys, entry_texts, entry_scores, entry_offers = _entries(column, rating)
+            first = len(texts)
+            for i, key in enumerate(entry_keys):
+                keys.append(key)
+                key_entries.append(first + i)
+                if _KINDS[kind] == "author":
+                    for start in _word_starts(key):
+                        keys.append(key[start:])
+                        key_entries.append(first + i)
+            texts.extend(entry_texts)
+            kinds.append(np.full(len(entry_texts), kind, dtype=np.int8))
+            scores.append(entry_scores)
+            offers.append(entry_offers)
+
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        return cls(
+            [keys[i] for i in order],
+            np.array(key_entries, dtype=np.int32)[order] if keys else np.empty(0, dtype=np.int32),
+            texts,
+            np.concatenate(kinds),
+            np.concatenate(scores),
+            np.concatenate(offers),
+        )
+
+    def suggest(self, prefix: str | None, limit: int = SUGGEST_LIMIT) -> list[dict]:
+        """Best-rated entries whose title, or any word of whose author, starts with prefix."""
+        key = " ".join(normalize_text(prefix).split())
+        if not key or limit <= 0:
+            return []
+        lo = bisect_left(self.keys, key)
+        hi = bisect_left(self.keys, key + _MAX_CHAR, lo)
+        entries = self.key_entries[lo:hi]
+
+        # Pick a few spare candidates: an author can match through two of its keys.
+        wanted = min(len(entries), 2 * limit)
+        if wanted < len(entries):
+            entries = entries[np.argpartition(-self.scores[entries], wanted - 1)[:wanted]]
+        picked = _ranked(np.unique(entries), self.scores, self.offers)[:limit]
+        if len(picked) < limit and wanted < hi - lo:
+            picked = _ranked(np.unique(self.key_entries[lo:hi]), self.scores, self.offers)[:limit]
+
+        return [
+            {
+                "text": self.texts[entry],
+                "kind": _KINDS[self.kinds[entry]],
+                "rating": float(self.scores[entry]) or None,
+                "offers": int(self.offers[entry]),
+            }
+            for entry in picked.tolist()
+        ]
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+
+def _entries(column: pd.Series, rating: np.ndarray) -> tuple[list[str], list[str], np.ndarray, np.ndarray]:
+    """Distinct normalized values of column: key, display text (from the best-rated row), best rating, rows."""
+    raw_codes, raw_uniques = pd.factorize(pd.Series(column.to_numpy(dtype=object), dtype=object))
+    raw_keys = [" ".join(normalize_text(value).split()) for value in raw_uniques]
+    key_of_raw, keys = pd.factorize(pd.Series(raw_keys, dtype=object))
+
+    rows = np.flatnonzero(raw_codes >= 0)
+    row_keys = key_of_raw[raw_codes[rows]]
+    present = np.asarray([bool(k) for k in keys], dtype=bool)[row_keys] if len(keys) else np.zeros(0, dtype=bool)
+    rows, row_keys = rows[present], row_keys[present]
+
+    # Best-rated row first within each key; its spelling is the one shown.
+    order = np.lexsort((rows, -rating[rows], row_keys))
+    rows, row_keys = rows[order], row_keys[order]
+    first = np.ones(len(row_keys), dtype=bool)
+    first[1:] = row_keys[1:] != row_keys[:-1]
+
+    best_rows = rows[first]
+    entry_keys = row_keys[first]
+    texts = [raw_uniques[code] for code in raw_codes[best_rows].tolist()]
+    counts = np.bincount(row_keys, minlength=len(keys))[entry_keys]
+    return [keys[k] for k in entry_keys.tolist()], texts, rating[best_rows], counts.astype(np.int32)
+
+
+def _word_starts(key: str) -> list[int]:
+    return [i + 1 for i, ch in enumerate(key) if ch == " " and i + 1 < len(key)]
+
+
+def _ranked(entries: np.ndarray, scores: np.ndarray, offers: np.ndarray) -> np.ndarray:
+    """Entries by score, then number of offers, both descending; ties keep entry order."""
+    return entries[np.lexsort((entries, -offers[entries], -scores[entries]))]
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+from .ColumnStore import ColumnStore, encode_strings
+
+SIMILARITY_THRESHOLD = 0.3  # pg_trgm's default; "dostoevsky" vs "dostoievski" scores 0.44
+MAX_SIMILAR = 32  # expansions kept per query token, best first
+MIN_FUZZY_LENGTH = 3  # shorter tokens share too few trigrams to tell a typo from another word
+
+_EMPTY = np.empty(0, dtype=np.int32)
+
+
+def trigrams(token: str) -> set[str]:
+    """pg_trgm-style trigrams: the word padded with two spaces in front and one behind."""
+    padded = f"  {token} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """Trigram -> vocabulary token index for typo-tolerant token matching.
+
+    It indexes the search vocabulary (distinct tokens), not the rows, so it
+    stays small however many offers share a word. A query token's trigrams
+    select candidate tokens through the CSR lists; their shared-trigram
+    counts give the Jaccard similarity |A & B| / |A | B| in one bincount.
+    """
+
+    def __init__(self, grams: list[str], offsets: np.ndarray, tokens: np.ndarray, sizes: np.ndarray) -> None:
+        self.grams = grams
+        self.offsets = offsets
+        self.tokens = tokens
+        self.sizes = sizes
+        self._gram_ids = {gram: i for i, gram in enumerate(grams)}
+
+    @classmethod
+    def build(cls, vocab: list[str]) -> TrigramIndex:
+        gram_lists = [trigrams(token) for token in vocab]
+        sizes = np.fromiter((len(g) for g in gram_lists), dtype=np.int32, count=len(vocab))
+        if not vocab:
+            return cls([], np.zeros(1, dtype=np.int64), _EMPTY, sizes)
+
+        token_ids = np.repeat(np.arange(len(vocab), dtype=np.int32), sizes)
+        codes, grams = pd.factorize(np.fromiter((g for gs in gram_lists for g in gs), dtype=object), sort=True)
+        order = np.argsort(codes, kind="stable")  # token ids stay ascending within each gram
+        offsets = np.zeros(len(grams) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes, minlength=len(grams)), out=offsets[1:])
+        return cls(list(grams), offsets, token_ids[order], sizes)
+
+    def to_arrays(self, prefix: str) -> dict[str, np.ndarray]:
+        data, offsets = encode_strings(self.grams)
+        return {
+            f"{prefix}.grams.data": data,
+            f"{prefix}.grams.offsets": offsets,
+            f"{prefix}.offsets": self.offsets,
+            f"{prefix}.tokens": self.tokens,
+            f"{prefix}.sizes": self.sizes,
+        }
+
+    @classmethod
+    def from_arrays(cls, store: ColumnStore, prefix: str) -> TrigramIndex:
+        grams = store.strings(f"{prefix}.grams")
+        return cls(grams, store[f"{prefix}.offsets"], store[f"{prefix}.tokens"], store[f"{prefix}.sizes"])
+
+    def similar(
+        self,
+        token: str,
+        threshold: float = SIMILARITY_THRESHOLD,
+        limit: int = MAX_SIMILAR,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """(token ids, similarities) of the vocabulary tokens most similar to token, best first."""
+        grams = trigrams(token)
+        ids = [self._gram_ids[g] for g in grams if g in self._gram_ids]
+        if len(token) < MIN_FUZZY_LENGTH or not ids:
+            return _EMPTY, np.empty(0)
+
+        candidates = np.concatenate([self.tokens[self.offsets[i] : self.offsets[i + 1]] for i in ids])
+        shared = np.bincount(candidates, minlength=len(self.sizes))
+        found = np.flatnonzero(shared)
+        shared = shared[found]
+        scores = shared / (len(grams) + self.sizes[found] - shared)
+        keep = scores >= threshold
+        found, scores = found[keep], scores[keep]
+        if len(found) > limit:
+            best = np.argpartition(-scores, limit - 1)[:limit]
+            found, scores = found[best], scores[best]
+        order = np.lexsort((found, -scores))
+        return found[order].astype(np.int32), scores[order]
+
+    @property
+    def nbytes(self) -> int:
+        grams = sum(sys.getsizeof(g) for g in self.grams)
+        return grams + self.offsets.nbytes + self.tokens.nbytes + self.sizes.nbytes
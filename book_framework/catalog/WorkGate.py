@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+
+class Overloaded(RuntimeError):
+    """Raised when a WorkGate has no slot and no room left in its queue."""
+
+
+class WorkGate:
+    """Bounds how many CPU-heavy requests run at once, and how many may wait for a slot.
+
+    Sync handlers already run on the server's thread pool; the gate keeps at
+    most `limit` of them computing (more threads only fight over the GIL) and
+    lets `backlog` more queue. Anything beyond that, or a request that waits
+    longer than `timeout`, fails fast with Overloaded so the server can answer
+    503 instead of letting latency grow without bound.
+    """
+
+    def __init__(self, limit: int, backlog: int = 0, timeout: float | None = None) -> None:
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        self.limit = limit
+        self.backlog = max(0, backlog)
+        self.timeout = timeout
+        self._slots = threading.Semaphore(limit)
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self.rejected = 0
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        with self._lock:
+            if self._admitted >= self.limit + self.backlog:
+                self.rejected += 1
+                raise Overloaded(f"{self._admitted} requests in flight")
+            self._admitted += 1
+        try:
+            if not self._slots.acquire(timeout=self.timeout):
+                with self._lock:
+                    self.rejected += 1
+                raise Overloaded(f"no slot within {self.timeout}s")
+            try:
+                yield
+            finally:
+                self._slots.release()
+        finally:
+            with self._lock:
+                self._admitted -= 1
+
+    @property
+    def in_flight(self) -> int:
+        """Requests running or waiting for a slot."""
+        return self._admitted
@@ -0,0 +1,46 @@
+from .BundleSolver import solve_bundle
+from .CatalogSnapshot import CatalogSnapshot, DbSignature
+from .ColumnStore import ColumnStore, column_store_path, db_fingerprint, open_column_store
+from .CompactFrame import category_counts, compact_frame, expand_frame, plain_values
+from .FacetIndex import FacetIndex
+from .FilterIndex import FilterIndex, SortedColumn
+from .PageCursor import PageCursor
+from .QueryCache import CatalogQuery, QueryCache
+from .SearchIndex import SearchIndex, normalize_text, tokenize
+from .SnapshotManager import SnapshotManager
+from .SqlCatalog import SqlCatalog
+from .SortIndex import SORT_COLUMNS, SortIndex
+from .SuggestIndex import SuggestIndex
+from .TrigramIndex import TrigramIndex
+from .WorkGate import Overloaded, WorkGate
+
+__all__ = [
+    "SORT_COLUMNS",
+    "CatalogQuery",
+    "CatalogSnapshot",
+    "ColumnStore",
+    "DbSignature",
+    "FacetIndex",
+    "FilterIndex",
+    "Overloaded",
+    "PageCursor",
+    "QueryCache",
+    "SearchIndex",
+    "SnapshotManager",
+    "SortIndex",
+    "SortedColumn",
+    "SqlCatalog",
+    "SuggestIndex",
+    "TrigramIndex",
+    "WorkGate",
+    "category_counts",
+    "column_store_path",
+    "compact_frame",
+    "db_fingerprint",
+    "expand_frame",
+    "normalize_text",
+    "open_column_store",
+    "plain_values",
+    "solve_bundle",
+    "tokenize",
+]
@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, fields, replace
+from urllib.parse import urlparse
+
+from scrape_kit import ScrapeMode, get_logger, scrape
+
+from book_framework.core.Metrics import Metrics
+
+logger = get_logger(__name__)
+
+# Page outcomes, as counted in scrape_pages_total.
+OK, RETRY, BLOCKED, MISSING = "ok", "retry", "blocked", "missing"
+
+metrics = Metrics(buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0))
+metrics.describe("scrape_wave_seconds", "Wall time of one scrape wave by domain and the concurrency it ran at")
+
+
+@dataclass(frozen=True)
+class ConcurrencySettings:
+    """AIMD limits for one domain; concurrency_config.yaml overrides any of them, per domain or by default."""
+
+    initial: int = 3
+    min: int = 1
+    max: int = 16
+    increase: int = 1  # added after a healthy wave
+    decrease_factor: float = 0.5  # multiplied in on retry signals, failed pages or slow pages
+    block_factor: float = 0.25  # multiplied in on block signals
+    block_cooldown: float = 30.0  # seconds to wait before the next wave after a block
+    max_error_rate: float = 0.1  # retry signals plus missing pages, as a share of the wave
+    latency_target: float = 10.0  # seconds per page per slot; slower waves count as congested
+    latency_slack: float = 1.5  # no increase while per-page latency exceeds the best seen by this factor
+    pages_per_slot: int = 4  # wave size = limit * pages_per_slot
+    max_attempts: int = 2  # a page hit by a retry/block signal or missing is fetched again up to this many times
+
+    @classmethod
+    def from_dict(cls, values: dict | None, base: ConcurrencySettings | None = None) -> ConcurrencySettings:
+        known = {f.name for f in fields(cls)}
+        base = base or cls()
+        overrides = {}
+        for key, value in (values or {}).items():
+            if key not in known:
+                logger.warning("Ignoring unknown concurrency setting: %s", key)
+                continue
+            try:
+                overrides[key] = type(getattr(base, key))(value)
+            except (TypeError, ValueError):
+                logger.warning("Ignoring invalid concurrency setting %s: %r", key, value)
+        return replace(base, **overrides)
+
+
+class AimdController:
+    """Additive-increase / multiplicative-decrease concurrency limit for one domain.
+
+    scrape_kit's scrape() runs a whole batch at one concurrency, so pages are
+    fetched in waves of limit * pages_per_slot and the limit is revised
+    between waves from what the wave saw:
+
+    - a block indicator on any page cuts the limit by block_factor and waits
+      block_cooldown seconds;
+    - retry indicators and missing pages above max_error_rate, or a per-page
+      latency above latency_target, cut it by decrease_factor;
+    - otherwise it grows by increase, unless latency has drifted more than
+      latency_slack above the best wave so far (then it holds).
+
+    Every decision is logged and counted for metrics_text().
+    """
+
+    def __init__(self, domain: str, settings: ConcurrencySettings) -> None:
+        self.domain = domain
+        self.settings = settings
+        self.limit = min(max(settings.initial, settings.min), settings.max)
+        self.best_latency = math.inf
+        self.decisions: dict[str, int] = {}
+        self.pages: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def wave_size(self) -> int:
+        return self.limit * self.settings.pages_per_slot
+
+    def record(self, outcomes: dict[str, int], seconds: float) -> str:
+        """Revise the limit from one wave's page outcomes and wall time; returns the decision."""
+        s = self.settings
+        with self._lock:
+            total = sum(outcomes.values())
+            for outcome, n in outcomes.items():
+                self.pages[outcome] = self.pages.get(outcome, 0) + n
+            if not total:
+                return "hold"
+            metrics.observe("scrape_wave_seconds", seconds, domain=self.domain, concurrency=str(self.limit))
+
+            # Pages ran limit at a time, so each slot spent seconds / (total / limit) per page.
+            latency = seconds * min(self.limit, total) / total
+            errors = outcomes.get(RETRY, 0) + outcomes.get(MISSING, 0)
+            before = self.limit
+            if outcomes.get(BLOCKED, 0):
+                decision, self.limit = "block", max(s.min, math.floor(self.limit * s.block_factor))
+            elif errors > s.max_error_rate * total or latency > s.latency_target:
+                decision, self.limit = "decrease", max(s.min, math.floor(self.limit * s.decrease_factor))
+            elif latency > s.latency_slack * self.best_latency:
+                decision = "hold"
+            else:
+                decision, self.limit = "increase", min(s.max, self.limit + s.increase)
+            if decision != "block":
+                self.best_latency = min(self.best_latency, latency)
+            self.decisions[decision] = self.decisions.get(decision, 0) + 1
+
+        logger.info(
+            "%s concurrency %d -> %d (%s: %d pages, %d retry, %d blocked, %d missing, %.2fs/page)",
+            self.domain,
+            before,
+            self.limit,
+            decision,
+            total,
+            outcomes.get(RETRY, 0),
+            outcomes.get(BLOCKED, 0),
+            outcomes.get(MISSING, 0),
+            latency,
+        )
+        return decision
+
+
+class _Registry:
+    """Controllers by domain, with the settings and indicators from the config directory."""
+
+    def __init__(self) -> None:
+        self.default = ConcurrencySettings()
+        self.domains: dict[str, dict] = {}
+        self.retry_indicators: list[str] = []
+        self.block_indicators: list[str] = []
+        self.controllers: dict[str, AimdController] = {}
+        self.lock = threading.Lock()
+
+
+_registry = _Registry()
+
+
+def configure_concurrency(concurrency_config: dict | None, scraper_config: dict | None = None) -> None:
+    """Load concurrency_config.yaml ({default: {...}, domains: {host: {...}}}) and the indicators of scraper_config.yaml.
+
+    Controllers already handed out keep their settings; call this before scraping.
+    """
+    concurrency_config = concurrency_config or {}
+    scraper_config = scraper_config or {}
+    scraper_config = scraper_config.get("scraper_config", scraper_config)
+    with _registry.lock:
+        _registry.default = ConcurrencySettings.from_dict(concurrency_config.get("default"))
+        _registry.domains = dict(concurrency_config.get("domains") or {})
+        _registry.retry_indicators = [i for i in scraper_config.get("retry_indicators") or [] if i]
+        _registry.block_indicators = [i for i in scraper_config.get("block_indicators") or [] if i]
+        _registry.controllers.clear()
+
+
+def controller_for(url_or_domain: str, initial: int | None = None) -> AimdController:
+    """The controller of a domain; initial is the caller's starting limit unless the YAML sets one."""
+    domain = urlparse(url_or_domain).netloc or url_or_domain
+    with _registry.lock:
+        controller = _registry.controllers.get(domain)
+        if controller is None:
+            base = _registry.default if initial is None else replace(_registry.default, initial=initial)
+            settings = ConcurrencySettings.from_dict(_registry.domains.get(domain), base)
+            controller = _registry.controllers[domain] = AimdController(domain, settings)
+        return controller
+
+
+def classify(html) -> str:
+    """Outcome of one fetched page: block and retry indicators are matched as substrings."""
+    if not html:
+        return MISSING
+    if any(indicator in html for indicator in _registry.block_indicators):
+        return BLOCKED
+    if any(indicator in html for indicator in _registry.retry_indicators):
+        return RETRY
+    return OK
+
+
+def scrape_adaptive(
+    urls: list[str],
+    callback: Callable,
+    mode=ScrapeMode.FAST,
+    controller: AimdController | None = None,
+    sleep: Callable[[float], None] = time.sleep,
+    stop: threading.Event | None = None,
+) -> None:
+    """scrape() in waves sized by the domain's AIMD controller, calling callback(url, html) at most once per URL.
+
+    Pages hit by a retry or block signal, or never delivered, go back in the
+    queue until they reach max_attempts; their last response is passed on
+    either way, so callers see exactly what a plain scrape() would give them.
+    Once stop is set, no further wave starts.
+    """
+    if not urls:
+        return
+    controller = controller or controller_for(urls[0])
+    attempts = dict.fromkeys(urls, 0)
+    queue = list(attempts)
+    while queue and not (stop is not None and stop.is_set()):
+        wave, queue = queue[: controller.wave_size()], queue[controller.wave_size() :]
+        outcomes = dict.fromkeys((OK, RETRY, BLOCKED, MISSING), 0)
+        delivered: set[str] = set()
+        held: dict[str, object] = {}  # pages with a signal, passed on or fetched again after the wave
+        lock = threading.Lock()
+
+        def _on_html(url, html, outcomes=outcomes, delivered=delivered, held=held, lock=lock) -> None:
+            outcome = classify(html)
+            with lock:
+                delivered.add(url)
+                attempts[url] += 1
+                outcomes[outcome] += 1
+                if outcome != OK:
+                    held[url] = html
+            if outcome == OK:
+                callback(url, html)
+
+        started = time.perf_counter()
+        try:
+            scrape(wave, _on_html, mode=mode, max_concurrency=controller.limit)
+        except Exception as e:
+            logger.warning("Scrape wave for %s had errors: %s", controller.domain, e)
+        seconds = time.perf_counter() - started
+
+        queue += _settle_wave(wave, delivered, held, attempts, outcomes, controller.settings.max_attempts, callback)
+        decision = controller.record({k: n for k, n in outcomes.items() if n}, seconds)
+        if decision == "block" and queue and controller.settings.block_cooldown > 0:
+            sleep(controller.settings.block_cooldown)
+
+
+def _settle_wave(
+    wave: list[str],
+    delivered: set[str],
+    held: dict[str, object],
+    attempts: dict[str, int],
+    outcomes: dict[str, int],
+    max_attempts: int,
+    callback: Callable,
+) -> list[str]:
+    """Count the pages a wave never delivered and pass on held pages out of attempts; returns the URLs to fetch again."""
+    retry = []
+    for url in wave:
+        if url not in delivered:
+            attempts[url] += 1
+            outcomes[MISSING] += 1
+        elif url not in held:
+            continue
+        if attempts[url] < max_attempts:
+            retry.append(url)
+        elif held.get(url):
+            callback(url, held[url])
+    return retry
+
+
+def metrics_text() -> str:
+    """Prometheus text for the controllers: wave timings, current limits, decisions and page outcomes."""
+    with _registry.lock:
+        controllers = sorted(_registry.controllers.values(), key=lambda c: c.domain)
+    samples = [
+        (
+            "scrape_concurrency_limit",
+            "gauge",
+            "Current concurrency limit by domain",
+            [({"domain": c.domain}, c.limit) for c in controllers],
+        ),
+        (
+            "scrape_concurrency_decisions_total",
+            "counter",
+            "AIMD decisions by domain: increase, hold, decrease or block",
+            [({"domain": c.domain, "decision": d}, n) for c in controllers for d, n in sorted(c.decisions.items())],
+        ),
+        (
+            "scrape_pages_total",
+            "counter",
+            "Fetched pages by domain and outcome: ok, retry, blocked or missing",
+            [({"domain": c.domain, "outcome": o}, n) for c in controllers for o, n in sorted(c.pages.items())],
+        ),
+    ]
+    return metrics.render(samples)
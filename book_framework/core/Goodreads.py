@@ -3,8 +3,10 @@ import re
 from collections.abc import Callable
 from urllib.parse import quote_plus
 
-from bs4 import BeautifulSoup
-from scrape_kit import ScrapeMode, SimilarityEngine, get_logger, scrape
+from scrape_kit import ScrapeMode, SimilarityEngine, get_logger
+
+from book_framework.core import HtmlParser
+from book_framework.core.AdaptiveConcurrency import controller_for, scrape_adaptive
 
 logger = get_logger(__name__)
 
@@ -13,6 +15,7 @@ GOODREADS_URL = "https://www.goodreads.com/"
 GOODREADS_SEARCH = GOODREADS_URL + "search?q=%s"
 NOT_FOUND_INDICATOR = "looking for a book?"
 REJECTED_GOODREADS_TITLES = ["summary", "review", "preview"]
+INITIAL_CONCURRENCY = 8  # starting limit; the domain's AIMD controller adapts it while scraping
 
 
 def _clean_text(value) -> str | None:
@@ -27,13 +30,13 @@ def _clean_text(value) -> str | None:
     return cleaned or None
 
 
-def _parse_isbn_page(html_text: str, search_url: str) -> tuple[float | None, str | None]:
+def _parse_isbn_page(html_text: str, search_url: str, backend: str | None = None) -> tuple[float | None, str | None]:
     try:
         if not html_text or NOT_FOUND_INDICATOR in html_text.lower():
             return None, None
-        html = BeautifulSoup(html_text, "html.parser")
-        rating_val = html.find("div", class_="RatingStatistics__rating").text.strip()
-        ratings_count_text = html.find("span", {"data-testid": "ratingsCount"}).text.strip()
+        html = HtmlParser.parse(html_text, backend)
+        rating_val = html.css_first("div.RatingStatistics__rating").text(strip=True)
+        ratings_count_text = html.css_first('span[data-testid="ratingsCount"]').text(strip=True)
         match = re.search(r"\d{1,3}(?:,\d{3})*", ratings_count_text)
         if not match:
             return None, None
@@ -48,20 +51,21 @@ def _parse_search_page(
     title: str,
     author: str | None,
     similarity_engine: SimilarityEngine,
+    backend: str | None = None,
 ) -> tuple[float | None, str | None]:
     if not html_text or NOT_FOUND_INDICATOR in html_text.lower():
         return None, None
 
     try:
-        html = BeautifulSoup(html_text, "html.parser")
-        book_elements = html.find_all("tr", itemtype="http://schema.org/Book")
+        # Only the result rows are parsed, not the rest of the search page.
+        book_elements = HtmlParser.select(html_text, 'tr[itemtype="http://schema.org/Book"]', backend)
     except Exception:
         return None, None
 
     for book_elem in book_elements:
         try:
-            gr_title = book_elem.find("a", class_="bookTitle").find("span", itemprop="name").get_text()
-            gr_author = book_elem.find("a", class_="authorName").find("span", itemprop="name").get_text()
+            gr_title = book_elem.css_first('a.bookTitle span[itemprop="name"]').text()
+            gr_author = book_elem.css_first('a.authorName span[itemprop="name"]').text()
         except Exception:
             continue
 
@@ -75,14 +79,14 @@ def _parse_search_page(
             continue
 
         try:
-            minirating_text = book_elem.find("span", class_="minirating").text.strip()
+            minirating_text = book_elem.css_first("span.minirating").text(strip=True)
             rating_match = re.search(r"(\d+\.\d+)", minirating_text)
             count_match = re.search(r"(\d{1,3}(?:,\d{3})*) ratings?$", minirating_text)
             if not (rating_match and count_match):
                 continue
             rating_val = rating_match.group(1)
             ratings_count = count_match.group(1).replace(",", "")
-            book_path = book_elem.find("a")["href"]
+            book_path = book_elem.css_first("a").attr("href")
             return float(rating_val) * float(ratings_count), GOODREADS_URL + book_path
         except Exception:
             continue
@@ -148,7 +152,8 @@ def rateBooks(
 
     if all_urls:
         try:
-            scrape(all_urls, callback=_on_html, mode=ScrapeMode.STEALTH, max_concurrency=8)
+            controller = controller_for(GOODREADS_URL, initial=INITIAL_CONCURRENCY)
+            scrape_adaptive(all_urls, _on_html, mode=ScrapeMode.STEALTH, controller=controller)
         except Exception as e:
             logger.warning("STEALTH scrape had errors: %s", e)
 
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import re
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as _SelectolaxParser
+except ImportError:  # pragma: no cover - depends on the environment
+    _SelectolaxParser = None
+
+try:
+    import lxml.html as _lxml_html
+    from cssselect import GenericTranslator as _CssTranslator
+except ImportError:  # pragma: no cover - depends on the environment
+    _lxml_html = None
+    _CssTranslator = None
+
+# Fastest first: selectolax (Lexbor engine), lxml.html with cssselect, then bs4's html.parser, always installed.
+BACKENDS = ("selectolax", "lxml", "bs4")
+
+# tag, .class, tag.class or tag[attr=value]: the selectors a SoupStrainer can express.
+_SIMPLE_SELECTOR = re.compile(r'^([a-zA-Z][\w-]*)?(?:\.([\w-]+))?(?:\[([\w-]+)="?([^"\]]*)"?\])?$')
+
+
+def available_backends() -> list[str]:
+    """Installed backends, fastest first; bs4 is always last."""
+    installed = {"selectolax": _SelectolaxParser is not None, "lxml": _lxml_html is not None, "bs4": True}
+    return [name for name in BACKENDS if installed[name]]
+
+
+def default_backend() -> str:
+    return available_backends()[0]
+
+
+class Node(ABC):
+    """One element (or the document): CSS lookups, text and attributes, whatever the backend.
+
+    The page parsers only need these three things, so they run unchanged on
+    any backend instead of walking a bs4 tree.
+    """
+
+    __slots__ = ("_el",)
+
+    def __init__(self, el) -> None:
+        self._el = el
+
+    @abstractmethod
+    def css(self, selector: str) -> list[Node]:
+        raise NotImplementedError()
+
+    def css_first(self, selector: str) -> Node | None:
+        found = self.css(selector)
+        return found[0] if found else None
+
+    @abstractmethod
+    def text(self, strip: bool = False) -> str:
+        """Text of the element and its descendants; strip trims the result (not every piece, unlike bs4)."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def attr(self, name: str) -> str | None:
+        raise NotImplementedError()
+
+
+class _Bs4Node(Node):
+    __slots__ = ()
+
+    def css(self, selector: str) -> list[Node]:
+        return [_Bs4Node(el) for el in self._el.select(selector)]
+
+    def css_first(self, selector: str) -> Node | None:
+        el = self._el.select_one(selector)
+        return _Bs4Node(el) if el is not None else None
+
+    def text(self, strip: bool = False) -> str:
+        text = self._el.get_text()
+        return text.strip() if strip else text
+
+    def attr(self, name: str) -> str | None:
+        value = self._el.get(name)
+        return " ".join(value) if isinstance(value, list) else value
+
+
+class _LxmlNode(Node):
+    __slots__ = ()
+
+    def css(self, selector: str) -> list[Node]:
+        return [_LxmlNode(el) for el in self._el.xpath(_xpath(selector))]
+
+    def text(self, strip: bool = False) -> str:
+        text = self._el.text_content()
+        return text.strip() if strip else text
+
+    def attr(self, name: str) -> str | None:
+        return self._el.get(name)
+
+
+class _SelectolaxNode(Node):
+    __slots__ = ()
+
+    def css(self, selector: str) -> list[Node]:
+        return [_SelectolaxNode(el) for el in self._el.css(selector)]
+
+    def css_first(self, selector: str) -> Node | None:
+        el = self._el.css_first(selector)
+        return _SelectolaxNode(el) if el is not None else None
+
+    def text(self, strip: bool = False) -> str:
+        text = self._el.text(deep=True)
+        return text.strip() if strip else text
+
+    def attr(self, name: str) -> str | None:
+        return self._el.attributes.get(name)
+
+
+@lru_cache(maxsize=256)
+def _xpath(selector: str) -> str:
+    # Descendants of the context element, like bs4's select() and selectolax's css().
+    return _CssTranslator().css_to_xpath(selector, prefix="descendant::")
+
+
+def strainer(selector: str) -> SoupStrainer | None:
+    """bs4 SoupStrainer keeping the elements matching a simple selector, or None if it is not simple."""
+    match = _SIMPLE_SELECTOR.match(selector.strip())
+    if not match or not any(match.groups()):
+        return None
+    name, cls, attr, value = match.groups()
+    attrs = {}
+    if cls:
+        attrs["class"] = cls
+    if attr:
+        attrs[attr] = value
+    return SoupStrainer(name, attrs)
+
+
+def parse(html: str, backend: str | None = None) -> Node:
+    """The whole document."""
+    backend = backend or default_backend()
+    if backend == "selectolax":
+        return _SelectolaxNode(_SelectolaxParser(html).root)
+    if backend == "lxml":
+        return _LxmlNode(_lxml_html.document_fromstring(html))
+    if backend == "bs4":
+        return _Bs4Node(BeautifulSoup(html, "html.parser"))
+    raise ValueError(f"Unknown HTML parser backend: {backend}")
+
+
+def select(html: str, selector: str, backend: str | None = None) -> list[Node]:
+    """Elements of the page matching selector, in document order.
+
+    With bs4 only the matching elements (and their contents) are built when
+    the selector is simple enough for a SoupStrainer, which saves most of its
+    cost. The C parsers build the whole tree anyway, faster than bs4 skips it.
+    """
+    backend = backend or default_backend()
+    if backend == "bs4":
+        only = strainer(selector)
+        if only is not None:
+            return _Bs4Node(BeautifulSoup(html, "html.parser", parse_only=only)).css(selector)
+    if not html:
+        return []
+    return parse(html, backend).css(selector)
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Iterable
+
+# Upper bounds in seconds: sub-millisecond index lookups up to multi-second exports.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# (name, type, help, [(labels, value), ...]) for gauges and counters read at scrape time.
+Sample = tuple[str, str, str, list[tuple[dict[str, str], float]]]
+
+
+class Histogram:
+    """Latency histogram for one label set; buckets are stored per bucket and summed on render."""
+
+    __slots__ = ("bounds", "counts", "count", "total")
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # the last slot is +Inf
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+
+class Metrics:
+    """Process-local histograms rendered in the Prometheus text exposition format.
+
+    Recording is a dict lookup, a bisect and three additions under one lock,
+    so it stays cheap enough to leave on for every request. Gauges and
+    counters owned elsewhere (snapshot, caches, gate) are not stored here;
+    they are passed to render() when scraped, together with the labels
+    (pid, engine) that every histogram series of this process carries.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self._help: dict[str, str] = {}
+        self._histograms: dict[tuple[str, tuple[tuple[str, str], ...]], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, help_text: str) -> None:
+        self._help[name] = help_text
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def timer(self, name: str, **labels: str) -> _Timer:
+        """Context manager observing the seconds spent inside it."""
+        return _Timer(self, name, labels)
+
+    def render(self, samples: Iterable[Sample] = (), labels: dict[str, str] | None = None) -> str:
+        """Exposition text; labels (e.g. pid) are added to every histogram series."""
+        extra = labels or {}
+        with self._lock:
+            histograms = sorted(
+                (name, tuple(sorted({**dict(pairs), **extra}.items())), list(h.counts), h.count, h.total)
+                for (name, pairs), h in self._histograms.items()
+            )
+
+        lines: list[str] = []
+        described: set[str] = set()
+        for name, labels, counts, count, total in histograms:
+            if name not in described:
+                described.add(name)
+                lines.append(f"# HELP {name} {self._help.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+            cumulative = 0
+            for bound, n in zip([*map(_number, self.buckets), "+Inf"], counts, strict=True):
+                cumulative += n
+                lines.append(f"{name}_bucket{_labels((*labels, ('le', bound)))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+
+        for name, kind, help_text, values in samples:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in values:
+                lines.append(f"{name}{_labels(tuple(sorted(labels.items())))} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class _Timer:
+    __slots__ = ("metrics", "name", "labels", "started")
+
+    def __init__(self, metrics: Metrics, name: str, labels: dict[str, str]) -> None:
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self) -> _Timer:
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.metrics.observe(self.name, time.perf_counter() - self.started, **self.labels)
+
+
+def _labels(pairs: tuple[tuple[str, str], ...]) -> str:
+    if not pairs:
+        return ""
+    escaped = (f'{key}="{_escape(str(value))}"' for key, value in pairs)
+    return "{" + ",".join(escaped) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if value.is_integer() else repr(value)
@@ -0,0 +1,148 @@
+"""Unit tests for the per-domain AIMD scrape concurrency controller."""
+
+import pytest
+
+from book_framework.core import AdaptiveConcurrency as adaptive
+from book_framework.core.AdaptiveConcurrency import (
+    AimdController,
+    ConcurrencySettings,
+    configure_concurrency,
+    controller_for,
+    metrics_text,
+    scrape_adaptive,
+)
+
+SCRAPER_CONFIG = {"scraper_config": {"retry_indicators": ["403 Forbidden"], "block_indicators": ["Just a moment..."]}}
+
+
+@pytest.fixture(autouse=True)
+def _fresh_registry():
+    configure_concurrency(None, SCRAPER_CONFIG)
+    yield
+    configure_concurrency(None)
+
+
+def _controller(**settings) -> AimdController:
+    return AimdController("example.com", ConcurrencySettings(**settings))
+
+
+class TestAimdController:
+    """Tests for the limit revisions after each wave."""
+
+    def test_healthy_waves_increase_up_to_max(self):
+        """Test that clean, fast waves add one slot each, never past max."""
+        controller = _controller(initial=3, max=5)
+        decisions = [controller.record({adaptive.OK: controller.wave_size()}, 1.0) for _ in range(4)]
+        assert decisions == ["increase", "increase", "increase", "increase"]
+        assert controller.limit == 5
+
+    def test_block_cuts_sharply(self):
+        """Test that one blocked page cuts the limit by block_factor."""
+        controller = _controller(initial=16, block_factor=0.25)
+        assert controller.record({adaptive.OK: 60, adaptive.BLOCKED: 1}, 1.0) == "block"
+        assert controller.limit == 4
+
+    def test_retries_above_the_error_rate_halve(self):
+        """Test that retry signals and missing pages above max_error_rate halve the limit, but not below min."""
+        controller = _controller(initial=8, min=3)
+        assert controller.record({adaptive.OK: 8, adaptive.RETRY: 1, adaptive.MISSING: 1}, 1.0) == "decrease"
+        assert controller.limit == 4
+        controller.record({adaptive.RETRY: 10}, 1.0)
+        assert controller.limit == 3
+
+    def test_few_errors_are_tolerated(self):
+        """Test that an error rate at the threshold still counts as healthy."""
+        controller = _controller(initial=4)
+        assert controller.record({adaptive.OK: 9, adaptive.MISSING: 1}, 1.0) == "increase"
+
+    def test_slow_waves_decrease_and_drifting_latency_holds(self):
+        """Test that latency over the target decreases and latency over the best seen holds."""
+        controller = _controller(initial=4, latency_target=5.0, latency_slack=1.5)
+        controller.record({adaptive.OK: 16}, 8.0)  # 2s per page per slot: the best so far
+        assert controller.record({adaptive.OK: 20}, 20.0) == "hold"  # 5s: under target, over 1.5x best
+        assert controller.record({adaptive.OK: 20}, 40.0) == "decrease"  # 10s: over target
+
+
+class TestSettings:
+    """Tests for the YAML configuration."""
+
+    def test_from_dict_casts_and_ignores_unknown_keys(self):
+        """Test that values are cast to the field types and unknown keys are skipped."""
+        settings = ConcurrencySettings.from_dict({"max": "9", "block_factor": "0.5", "typo": 1})
+        assert (settings.max, settings.block_factor) == (9, 0.5)
+
+    def test_from_dict_ignores_values_that_do_not_cast(self):
+        """Test that a value of the wrong kind keeps the base setting instead of raising."""
+        settings = ConcurrencySettings.from_dict({"max": "12.5", "initial": None, "block_factor": "half", "min": 2})
+        assert (settings.max, settings.initial, settings.block_factor, settings.min) == (16, 3, 0.25, 2)
+
+    def test_domain_settings_override_the_callers_initial(self):
+        """Test that the YAML's domain initial wins over the store's, which wins over the default."""
+        configure_concurrency({"default": {"initial": 2, "max": 10}, "domains": {"a.ro": {"initial": 6}}})
+        assert controller_for("https://a.ro/x", initial=3).limit == 6
+        assert controller_for("https://b.ro/x", initial=3).limit == 3
+        assert controller_for("https://c.ro/x").limit == 2
+        assert controller_for("a.ro") is controller_for("https://a.ro/y")
+
+
+def _fake_scrape(pages, waves):
+    """scrape() stand-in serving pages[url] as a list of successive responses (None: not delivered)."""
+
+    def scrape(urls, callback, mode=None, max_concurrency=1):
+        waves.append((list(urls), max_concurrency))
+        for url in urls:
+            html = pages[url].pop(0) if len(pages[url]) > 1 else pages[url][0]
+            if html is not None:
+                callback(url, html)
+
+    return scrape
+
+
+class TestScrapeAdaptive:
+    """Tests for scraping in controller-sized waves."""
+
+    def test_waves_grow_with_the_limit(self, monkeypatch):
+        """Test that every page is delivered once and waves follow the limit."""
+        pages = {f"https://a.ro/{i}": [f"page {i}"] for i in range(30)}
+        waves = []
+        monkeypatch.setattr(adaptive, "scrape", _fake_scrape(pages, waves))
+        seen = []
+        # Waves of a fake scrape take microseconds, so jitter alone can exceed the latency slack.
+        controller = _controller(initial=2, pages_per_slot=2, latency_slack=float("inf"))
+        scrape_adaptive(list(pages), lambda url, html: seen.append(url), controller=controller)
+        assert sorted(seen) == sorted(pages)
+        assert [(len(urls), limit) for urls, limit in waves] == [(4, 2), (6, 3), (8, 4), (10, 5), (2, 6)]
+
+    def test_blocked_pages_are_fetched_again_after_a_cooldown(self, monkeypatch):
+        """Test that a blocked page is requeued, the limit drops and the next wave waits."""
+        pages = {f"https://a.ro/{i}": ["ok"] for i in range(4)}
+        pages["https://a.ro/1"] = ["Just a moment...", "ok again"]
+        waves, sleeps, seen = [], [], {}
+        monkeypatch.setattr(adaptive, "scrape", _fake_scrape(pages, waves))
+        controller = _controller(initial=4, pages_per_slot=1, block_cooldown=7)
+        scrape_adaptive(list(pages), seen.__setitem__, controller=controller, sleep=sleeps.append)
+        assert seen["https://a.ro/1"] == "ok again"
+        assert waves[1] == (["https://a.ro/1"], 1)
+        assert sleeps == [7]
+        assert controller.decisions == {"block": 1, "increase": 1}
+
+    def test_last_attempt_is_passed_on(self, monkeypatch):
+        """Test that a page still signalling after max_attempts reaches the callback, and a missing one does not."""
+        pages = {"https://a.ro/retry": ["403 Forbidden"], "https://a.ro/gone": [None]}
+        seen = {}
+        monkeypatch.setattr(adaptive, "scrape", _fake_scrape(pages, []))
+        controller = _controller(initial=2, max_attempts=3)
+        scrape_adaptive(list(pages), seen.__setitem__, controller=controller)
+        assert seen == {"https://a.ro/retry": "403 Forbidden"}
+        assert controller.pages == {"retry": 3, "missing": 3}
+
+    def test_metrics_report_limits_and_decisions(self, monkeypatch):
+        """Test that the metrics text carries the limit gauge, decision counters and wave histogram."""
+        pages = {"https://a.ro/1": ["ok"]}
+        monkeypatch.setattr(adaptive, "scrape", _fake_scrape(pages, []))
+        scrape_adaptive(list(pages), lambda url, html: None, controller=controller_for("https://a.ro/", initial=2))
+        text = metrics_text()
+        assert 'scrape_concurrency_limit{domain="a.ro"} 3' in text
+        assert 'scrape_concurrency_decisions_total{decision="increase",domain="a.ro"} 1' in text
+        assert 'scrape_pages_total{domain="a.ro",outcome="ok"} 1' in text
+        assert 'scrape_wave_seconds_count{concurrency="2",domain="a.ro"}' in text
@@ -0,0 +1,66 @@
+"""Unit tests for Anticariat Unu's seeded page-boundary search."""
+
+from pathlib import Path
+
+import pytest
+
+from book_crawler.bookstores import AnticariatUnuBookstore as module
+
+
+def _counting(boundary: int):
+    probes: list[int] = []
+
+    def predicate(page: int) -> bool:
+        probes.append(page)
+        return page <= boundary
+
+    return predicate, probes
+
+
+class TestLastTruePage:
+    """Tests for the binary and galloping boundary search."""
+
+    @pytest.mark.parametrize("boundary", [0, 1, 7, 63, 99, 100])
+    @pytest.mark.parametrize("guess", [None, 0, 5, 60, 100, 500])
+    def test_finds_the_boundary_from_any_guess(self, boundary: int, guess: int | None):
+        """Test that every guess, right or wrong, converges to the same answer."""
+        predicate, _ = _counting(boundary)
+        assert module.last_true_page(predicate, 100, guess=guess) == boundary
+
+    def test_no_true_page_returns_zero(self):
+        """Test that a category with no unsold page still yields its first page."""
+        assert module.last_true_page(lambda page: False, 50, guess=10) == 0
+
+    def test_unchanged_boundary_costs_two_probes(self):
+        """Test that a correct guess is confirmed by checking it and the page after it."""
+        predicate, probes = _counting(412)
+        assert module.last_true_page(predicate, 1000, guess=412) == 412
+        assert probes == [412, 413]
+
+    def test_small_moves_cost_few_probes(self):
+        """Test that a boundary that moved a little needs far fewer probes than a full bisection."""
+        for boundary in (409, 415):
+            seeded, seeded_probes = _counting(boundary)
+            full, full_probes = _counting(boundary)
+            module.last_true_page(seeded, 1000, guess=412)
+            module.last_true_page(full, 1000)
+            assert len(seeded_probes) <= 6 < len(full_probes)
+
+
+class TestDiscoveryState:
+    """Tests for the per-category state file."""
+
+    def test_round_trip(self, tmp_path: Path):
+        """Test that saved boundaries load back and junk entries are dropped."""
+        path = str(tmp_path / "state.json")
+        module._save_state(path, {"https://x/c2": 4, "https://x/c1": 17})
+        assert module._load_state(path) == {"https://x/c1": 17, "https://x/c2": 4}
+
+        Path(path).write_text('{"https://x/c1": "seven", "https://x/c2": 3}')
+        assert module._load_state(path) == {"https://x/c2": 3}
+
+    def test_missing_or_corrupt_file_means_no_state(self, tmp_path: Path):
+        """Test that discovery falls back to a full search when the file is unusable."""
+        assert module._load_state(str(tmp_path / "missing.json")) == {}
+        (tmp_path / "bad.json").write_text("{not json")
+        assert module._load_state(str(tmp_path / "bad.json")) == {}
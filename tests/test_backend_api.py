@@ -0,0 +1,248 @@
+"""Endpoint tests for the dashboard API, run against a finalized release on both catalog engines."""
+
+import json
+import sqlite3
+from contextlib import ExitStack
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from book_dashboard.backend import main
+from book_framework.BooksManager import BooksManager
+from book_framework.catalog import PageCursor, SnapshotManager, SqlCatalog
+
+CATEGORIES = ("Literature", "History,Arts", None, "history")
+STORES = ("Targul Cartii", "Anticariat Unu")
+# isbn, title, author, category, rating, goodreads_url, store, url, price: ties and missing values in every sort column.
+ROWS = [
+    (
+        None,
+        f"Carte {i % 13:02d}",
+        None if i % 7 == 0 else f"Autor {i % 5}",
+        CATEGORIES[i % 4],
+        None if i % 6 == 0 else 3.0 + (i % 4) * 0.5,
+        None,
+        STORES[i % 2],
+        f"https://example.ro/{i}",
+        None if i % 9 == 0 else 10.0 + (i % 8) * 5,
+    )
+    for i in range(40)
+]
+
+
+@pytest.fixture(scope="module")
+def release(tmp_path_factory: pytest.TempPathFactory) -> str:
+    path = str(tmp_path_factory.mktemp("release") / "final_books.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE books (isbn TEXT, title TEXT NOT NULL, author TEXT, category TEXT, rating REAL,"
+        " goodreads_url TEXT, store TEXT, url TEXT, price REAL)"
+    )
+    conn.executemany("INSERT INTO books VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", ROWS)
+    conn.commit()
+    conn.close()
+    BooksManager.finalize_release(path)
+    assert Path(path).with_suffix(".columns").exists()
+    return path
+
+
+def _serve(monkeypatch: pytest.MonkeyPatch, engine: str, db_path: str) -> TestClient:
+    """A client of the app serving db_path with the given engine, as BOOKS_ENGINE would configure it."""
+    if engine == "sql":
+        snapshots = SnapshotManager(db_path, SqlCatalog.check_db, prepare=main._prepare_snapshot, factory=SqlCatalog)
+    else:
+        snapshots = SnapshotManager(db_path, main._load_books, prepare=main._prepare_snapshot, factory=main._snapshot_factory)
+    monkeypatch.setattr(main, "_snapshots", snapshots)
+    monkeypatch.setattr(main, "ENGINE", engine)
+    return TestClient(main.app)
+
+
+@pytest.fixture(params=["pandas", "sql"])
+def client(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch, release: str):
+    with _serve(monkeypatch, request.param, release) as client:
+        yield client
+
+
+def _walk(client: TestClient, params: dict) -> list[dict]:
+    """Every page of /api/books reached by following next_cursor from the first one."""
+    pages = [client.get("/api/books", params=params).json()]
+    while pages[-1]["next_cursor"]:
+        response = client.get("/api/books", params={**params, "cursor": pages[-1]["next_cursor"]})
+        assert response.status_code == 200
+        pages.append(response.json())
+    return pages
+
+
+class TestBooksApi:
+    """Tests for /api/books paging and cursor validation."""
+
+    @pytest.mark.parametrize("sort_by", ["title", "author", "price", "rating"])
+    @pytest.mark.parametrize("sort_dir", ["asc", "desc"])
+    def test_cursor_pages_match_offset_pages(self, client: TestClient, sort_by: str, sort_dir: str):
+        """Test that cursor page N holds the same books, page number and total as page=N."""
+        params = {"sort_by": sort_by, "sort_dir": sort_dir, "page_size": 6}
+        pages = _walk(client, params)
+
+        assert len(pages) == pages[0]["total_pages"] == 7
+        for number, page in enumerate(pages, start=1):
+            by_offset = client.get("/api/books", params={**params, "page": number}).json()
+            assert page["page"] == number
+            assert page["total"] == by_offset["total"] == len(ROWS)
+            assert page["books"] == by_offset["books"]
+        assert len({book["url"] for page in pages for book in page["books"]}) == len(ROWS)
+
+    def test_cursor_pages_follow_filters(self, client: TestClient):
+        """Test that a filtered walk stops after the last match."""
+        params = {"stores": STORES[0], "min_price": 20, "sort_by": "price", "page_size": 4}
+        pages = _walk(client, params)
+
+        books = [book for page in pages for book in page["books"]]
+        assert len(books) == pages[0]["total"]
+        assert all(book["store"] == STORES[0] and book["price"] >= 20 for book in books)
+        assert [book["price"] for book in books] == sorted(book["price"] for book in books)
+
+    def test_bad_cursor_is_rejected(self, client: TestClient):
+        """Test that a token that is not a cursor gets a 400, not a 500."""
+        response = client.get("/api/books", params={"cursor": "not-a-cursor"})
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid cursor"
+
+    def test_cursor_of_another_sort_is_rejected(self, client: TestClient):
+        """Test that a cursor issued for one sort order cannot page another."""
+        token = client.get("/api/books", params={"sort_by": "price", "page_size": 5}).json()["next_cursor"]
+
+        assert client.get("/api/books", params={"sort_by": "title", "cursor": token}).status_code == 400
+        assert client.get("/api/books", params={"sort_by": "price", "sort_dir": "desc", "cursor": token}).status_code == 400
+
+    def test_cursor_value_of_the_wrong_type_is_rejected(self, client: TestClient):
+        """Test that a well-formed cursor carrying a title for a price sort gets a 400."""
+        token = PageCursor(1, 3, "price", True, "Carte 01", "https://example.ro/3").encode()
+
+        response = client.get("/api/books", params={"sort_by": "price", "cursor": token})
+
+        assert response.status_code == 400
+
+    def test_foreign_cursor_resumes_after_the_same_book(self, client: TestClient):
+        """Test that a cursor from another release (unknown version and row) resumes after its book by url."""
+        params = {"sort_by": "title", "page_size": 5}
+        last = client.get("/api/books", params=params).json()["books"][-1]
+        token = PageCursor(987654, 123456, "title", True, last["title"], last["url"]).encode()
+
+        page = client.get("/api/books", params={**params, "cursor": token}).json()
+
+        assert page["page"] == 2
+        assert page["books"] == client.get("/api/books", params={**params, "page": 2}).json()["books"]
+
+
+class TestEnginesAgree:
+    """Tests that the pandas and SQL engines serve the same release identically."""
+
+    @pytest.mark.parametrize(
+        "params",
+        [
+            {"sort_by": "title"},
+            {"sort_by": "price", "sort_dir": "desc", "page": 2},
+            {"sort_by": "rating", "categories": ["History"], "page_size": 50},
+            {"search": "carte 0", "stores": [STORES[1]], "min_rating": 3.5},
+            {"min_price": 15, "max_price": 30, "sort_by": "author"},
+            {"search": "!!!"},
+        ],
+    )
+    def test_books_parity(self, monkeypatch: pytest.MonkeyPatch, release: str, params: dict):
+        """Test that /api/books returns the same payload on both engines, next_cursor aside."""
+        payloads = []
+        for engine in ("pandas", "sql"):
+            with _serve(monkeypatch, engine, release) as client:
+                payload = client.get("/api/books", params={"page_size": 10, **params}).json()
+            payloads.append({**payload, "next_cursor": payload["next_cursor"] is not None})
+
+        pandas_payload, sql_payload = payloads
+        assert pandas_payload == sql_payload
+
+
+class TestExport:
+    """Tests for the streamed export."""
+
+    @pytest.mark.parametrize("fmt", ["ndjson", "csv"])
+    def test_row_count_matches_total(self, client: TestClient, monkeypatch: pytest.MonkeyPatch, fmt: str):
+        """Test that the export streams every matching row, in several chunks, and X-Total-Count agrees with /api/books."""
+        monkeypatch.setattr(main, "EXPORT_CHUNK_ROWS", 4)
+        params = {"stores": STORES[1], "sort_by": "price"}
+        total = client.get("/api/books", params=params).json()["total"]
+
+        response = client.get("/api/books/export", params={**params, "format": fmt})
+
+        assert response.status_code == 200
+        lines = response.text.splitlines()
+        rows = lines if fmt == "ndjson" else lines[1:]
+        assert int(response.headers["X-Total-Count"]) == total == len(rows) > 4
+        if fmt == "ndjson":
+            assert {json.loads(line)["store"] for line in lines} == {STORES[1]}
+
+    def test_stream_holds_the_cpu_slot(self, client: TestClient, monkeypatch: pytest.MonkeyPatch):
+        """Test that every chunk is encoded while the export holds a CPU slot, which is freed after the last one."""
+        monkeypatch.setattr(main, "EXPORT_CHUNK_ROWS", 8)
+        encode = main._export_chunks
+        in_flight = []
+
+        def _spy(*args):
+            for chunk in encode(*args):
+                in_flight.append(main._cpu.in_flight)
+                yield chunk
+
+        monkeypatch.setattr(main, "_export_chunks", _spy)
+        response = client.get("/api/books/export", params={"format": "csv"})
+
+        assert response.status_code == 200
+        assert len(in_flight) == 1 + len(ROWS) // 8  # the header, then one chunk per 8 rows
+        assert set(in_flight) == {1}
+        assert main._cpu.in_flight == 0
+
+    def test_dropped_stream_frees_the_slot(self):
+        """Test that closing an unfinished stream (a client disconnect) releases its slot."""
+        slot = ExitStack()
+        slot.enter_context(main._cpu.slot())
+        stream = main._GatedStream(slot, iter([b"a", b"b"]))
+
+        assert next(stream) == b"a"
+        assert main._cpu.in_flight == 1
+        stream.close()
+        assert main._cpu.in_flight == 0
+        stream.close()
+        assert main._cpu.in_flight == 0
+
+
+class TestPayloadCaching:
+    """Tests for ETag revalidation of the precomputed payloads."""
+
+    @pytest.mark.parametrize("path", ["/api/filters", "/api/insights"])
+    def test_if_none_match_returns_304(self, client: TestClient, path: str):
+        """Test that a matching If-None-Match (plain, weak or in a list) gets an empty 304 with the same ETag."""
+        first = client.get(path)
+        etag = first.headers["ETag"]
+
+        assert first.status_code == 200
+        assert first.headers["Cache-Control"] == "no-cache"
+        for header in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+            revalidated = client.get(path, headers={"If-None-Match": header})
+            assert revalidated.status_code == 304
+            assert revalidated.headers["ETag"] == etag
+            assert revalidated.content == b""
+
+    def test_stale_etag_returns_the_payload(self, client: TestClient):
+        """Test that an ETag of another payload gets the full body."""
+        response = client.get("/api/filters", headers={"If-None-Match": '"stale"'})
+
+        assert response.status_code == 200
+        assert response.json()["stores"] == sorted(STORES)
+
+    def test_etag_is_the_same_on_both_engines(self, monkeypatch: pytest.MonkeyPatch, release: str):
+        """Test that the content-derived ETag does not depend on the engine that built the payload."""
+        etags = set()
+        for engine in ("pandas", "sql"):
+            with _serve(monkeypatch, engine, release) as client:
+                etags.add(client.get("/api/filters").headers["ETag"])
+
+        assert len(etags) == 1
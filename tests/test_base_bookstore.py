@@ -0,0 +1,126 @@
+"""Unit tests for the shared bookstore helpers."""
+
+import threading
+import time
+
+import pytest
+
+from book_crawler.bookstores import BaseBookstore, TargulCartii
+from book_crawler.bookstores.TargulCartiiBookstore import parse_rows
+from book_framework.core import AdaptiveConcurrency as adaptive
+from book_framework.core.Book import BookCategory
+
+
+
+class _Store(BaseBookstore):
+    def get_urls(self):
+        return []
+
+    def get_books(self, urls):
+        pass
+
+    def _parse_page(self, url, html):
+        pass
+
+
+class TestDiscover:
+    """Tests for concurrent category discovery."""
+
+    def test_results_keep_item_order(self):
+        """Test that results line up with the items even when probes finish out of order."""
+        def probe(n):
+            time.sleep(0.01 * (5 - n))
+            return [f"page-{n}"]
+
+        assert _Store(None).discover(probe, range(5), max_concurrency=4) == [[f"page-{n}"] for n in range(5)]
+
+    def test_concurrency_is_limited(self):
+        """Test that no more than max_concurrency probes run at once."""
+        running, peak = 0, 0
+        lock = threading.Lock()
+
+        def probe(n):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+            return n
+
+        assert _Store(None).discover(probe, range(8), max_concurrency=3) == list(range(8))
+        assert 1 < peak <= 3
+
+
+def _targul_page(page: int, books: int = 3) -> str:
+    rows = "".join(
+        f'<div class="product-list-row"><div class="name">'
+        f'<a href="/carte-{page}-{i}" title="Carte {page}-{i}">x</a><span class="author_name">Autor {i}</span></div>'
+        f'<span class="price_value">{page + i}.50 LEI</span></div>'
+        for i in range(books)
+    )
+    return f'<html><body><div class="product-grid">{rows}</div></body></html>'
+
+
+def _fake_scrape(pages):
+    def scrape(urls, callback, mode=None, max_concurrency=1):
+        for url in urls:
+            callback(url, pages[url])
+
+    return scrape
+
+
+class TestScrapePipeline:
+    """Tests for parsing fetched pages in a process pool."""
+
+    def _scrape(self, monkeypatch, parse_workers):
+        base = TargulCartii(None).cats[BookCategory.HISTORY][0]
+        pages = {f"{base}?p={n}": _targul_page(n) for n in range(12)}
+        pages["https://www.targulcartii.ro/missing"] = "Pagina cautata nu exista pe acest site!"
+        monkeypatch.setattr(adaptive, "scrape", _fake_scrape(pages))
+        books = []
+        store = TargulCartii(books.append)
+        store.parse_workers = parse_workers
+        store.get_books(list(pages))
+        return books
+
+    def test_pipeline_matches_inline_parsing(self, monkeypatch):
+        """Test that pooled parsing adds the same books, in fetch order, as parsing in the callback."""
+        inline = self._scrape(monkeypatch, 0)
+        pooled = self._scrape(monkeypatch, 2)
+        assert len(inline) == 36
+        assert pooled == inline
+        assert {book.category for book in pooled} == {BookCategory.HISTORY}
+        assert pooled[0].offers[0].store == "Targul Cartii"
+
+    def test_failed_write_stops_the_fetcher(self, monkeypatch):
+        """Test that a failure in the writer raises instead of leaving the fetcher blocked on a full queue."""
+        base = TargulCartii(None).cats[BookCategory.HISTORY][0]
+        pages = {f"{base}?p={n}": _targul_page(n) for n in range(100)}  # more than the queue holds
+        fetched = []
+
+        def scrape(urls, callback, mode=None, max_concurrency=1):
+            for url in urls:
+                fetched.append(url)
+                callback(url, pages[url])
+
+        def write_rows(url, future):
+            raise RuntimeError("pool broke")
+
+        monkeypatch.setattr(adaptive, "scrape", scrape)
+        store = TargulCartii([].append)
+        store.parse_workers = 1
+        monkeypatch.setattr(store, "_write_rows", write_rows)
+
+        with pytest.raises(RuntimeError, match="pool broke"):
+            store.get_books(list(pages))
+
+        assert not [t for t in threading.enumerate() if t.name.endswith("-fetch")]
+        assert len(fetched) < len(pages)  # no wave started after the failure
+
+    def test_parse_rows_is_pure(self):
+        """Test that the page parser returns plain rows without touching a store."""
+        assert parse_rows("https://www.targulcartii.ro/x", _targul_page(1, books=1)) == [
+            ("Carte 1-0", "Autor 0", "https://www.targulcartii.ro/carte-1-0", 1.5)
+        ]
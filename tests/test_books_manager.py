@@ -4,8 +4,11 @@ import sqlite3
 from unittest.mock import MagicMock, patch
 
 import pandas as pd
+import pytest
 
 from book_framework.BooksManager import BooksManager
+from book_framework.catalog import CatalogQuery, CatalogSnapshot, SqlCatalog, open_column_store, plain_values
+from book_framework.catalog.SqlCatalog import RELEASE_LAYOUT_VERSION
 from book_framework.core.Book import Book, BookCategory, Offer
 import contextlib
 
@@ -706,3 +709,81 @@ class TestMergeDatabases:
 
         # Check if log message appears
         # This would need more careful mocking to test properly
+
+
+# ==================== 8. finalize_release Tests ====================
+
+
+class TestFinalizeRelease:
+    """Tests for the read-optimized release layout."""
+
+    @pytest.fixture
+    def release_db(self, temp_db_path: str) -> str:
+        conn = sqlite3.connect(temp_db_path)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute(
+            "CREATE TABLE books (isbn TEXT, title TEXT NOT NULL, author TEXT, category TEXT, rating REAL,"
+            " goodreads_url TEXT, store TEXT, url TEXT, price REAL)"
+        )
+        conn.executemany(
+            "INSERT INTO books (title, author, category, store, url, price) VALUES (?, ?, ?, ?, ?, ?)",
+            [(f"Carte {i}", "Autor", "Literature", "Store1", f"http://store1.com/{i}", 10.0 + i) for i in range(50)],
+        )
+        conn.commit()
+        conn.close()
+        return temp_db_path
+
+    def test_finalize_sets_layout(self, release_db: str):
+        """Test page size, journal mode and the release marker."""
+        BooksManager.finalize_release(release_db, page_size=16384)
+
+        conn = sqlite3.connect(release_db)
+        try:
+            assert conn.execute("PRAGMA page_size").fetchone()[0] == 16384
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+            assert conn.execute("PRAGMA user_version").fetchone()[0] == RELEASE_LAYOUT_VERSION
+            names = {name for (name,) in conn.execute("SELECT name FROM sqlite_master")}
+            assert {"idx_books_store", "idx_books_price", "idx_books_rating", "books_fts", "sqlite_stat1"} <= names
+            assert conn.execute("SELECT COUNT(*) FROM books").fetchone()[0] == 50
+        finally:
+            conn.close()
+
+    def test_finalize_keeps_rowids(self, release_db: str):
+        """Test that rowids survive the VACUUM, since rating chunks are keyed by them."""
+        conn = sqlite3.connect(release_db)
+        conn.execute("DELETE FROM books WHERE rowid IN (3, 7)")
+        conn.commit()
+        before = conn.execute("SELECT rowid, url FROM books ORDER BY rowid").fetchall()
+        conn.close()
+
+        BooksManager.finalize_release(release_db)
+
+        conn = sqlite3.connect(release_db)
+        try:
+            assert conn.execute("SELECT rowid, url FROM books ORDER BY rowid").fetchall() == before
+        finally:
+            conn.close()
+
+    def test_finalized_release_opens_immutable(self, release_db: str):
+        """Test that the SQL engine reads a finalized release without locking it."""
+        BooksManager.finalize_release(release_db)
+
+        catalog = SqlCatalog(release_db, version=1)
+        assert catalog.immutable is True
+        assert catalog.count(CatalogQuery.normalize("carte 4")) == 11
+
+    def test_finalize_writes_column_store(self, release_db: str):
+        """Test that the release gets a column store matching the finalized DB."""
+        BooksManager.finalize_release(release_db)
+
+        store = open_column_store(release_db)
+        assert store is not None
+        snapshot = CatalogSnapshot.from_columns(store, version=1)
+        assert len(snapshot.df) == 50
+        assert plain_values(snapshot.df["category"])[0] == ["Literature"]
+
+    def test_finalize_can_skip_column_store(self, release_db: str):
+        """Test that intermediate DBs (before ratings) skip the column store."""
+        BooksManager.finalize_release(release_db, column_store=False)
+
+        assert open_column_store(release_db) is None
@@ -0,0 +1,98 @@
+"""Unit tests for the budget-constrained recommendation bundle solver."""
+
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from book_framework.catalog import BundleSolver, solve_bundle
+
+
+def _best_total(prices: np.ndarray, ratings: np.ndarray, budget: float, max_items: int) -> float:
+    best = 0.0
+    for k in range(1, max_items + 1):
+        for combo in combinations(range(len(prices)), k):
+            idx = list(combo)
+            if prices[idx].sum() <= budget:
+                best = max(best, ratings[idx].sum())
+    return best
+
+
+class TestSolveBundle:
+    """Tests for the knapsack bundle and its unrated fill."""
+
+    def test_beats_highest_rated_first(self):
+        """Test that two cheaper books win over the single best-rated one."""
+        prices = np.array([60.0, 50.0, 50.0])
+        ratings = np.array([10.0, 9.0, 9.0])
+
+        picked = solve_bundle(prices, ratings, budget=100)
+        assert sorted(picked.tolist()) == [1, 2]
+
+    def test_respects_budget_and_item_limit(self):
+        """Test that the bundle never exceeds the budget or max_items."""
+        rng = np.random.default_rng(1)
+        prices = np.round(rng.uniform(1, 50, 500), 2)
+        ratings = rng.uniform(1, 100, 500)
+
+        picked = solve_bundle(prices, ratings, budget=120, max_items=4)
+        assert len(picked) <= 4
+        assert prices[picked].sum() <= 120
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_matches_brute_force(self, seed: int):
+        """Test optimality against exhaustive search on small catalogs."""
+        rng = np.random.default_rng(seed)
+        prices = rng.integers(1, 40, 12).astype(float)
+        ratings = rng.integers(1, 100, 12).astype(float)
+
+        picked = solve_bundle(prices, ratings, budget=60, max_items=3)
+        assert ratings[picked].sum() == _best_total(prices, ratings, 60, 3)
+
+    def test_unrated_books_fill_leftover_slots(self):
+        """Test that cheap unrated books are appended after the rated picks."""
+        prices = np.array([30.0, 5.0, 8.0, 100.0])
+        ratings = np.array([4.0, np.nan, 0.0, np.nan])
+
+        picked = solve_bundle(prices, ratings, budget=40)
+        assert picked.tolist() == [0, 1]
+
+    def test_nan_prices_are_excluded(self):
+        """Test that rows masked out with a NaN price are never picked."""
+        prices = np.array([np.nan, 10.0])
+        ratings = np.array([99.0, 1.0])
+
+        assert solve_bundle(prices, ratings, budget=50).tolist() == [1]
+
+    def test_presorted_orders_give_same_result(self):
+        """Test that passing precomputed orders does not change the bundle."""
+        rng = np.random.default_rng(7)
+        prices = np.round(rng.uniform(1, 80, 300), 2)
+        ratings = rng.uniform(0, 50, 300)
+
+        by_price = np.argsort(prices, kind="stable")
+        by_rating = np.argsort(-ratings, kind="stable")
+        assert (
+            solve_bundle(prices, ratings, 150, by_price=by_price, by_rating=by_rating).tolist()
+            == solve_bundle(prices, ratings, 150).tolist()
+        )
+
+    def test_correlated_price_and_rating_caps_the_dp(self, monkeypatch):
+        """Test that when nearly every row is on the skyline the DP still sees at most MAX_CANDIDATES rows."""
+        rng = np.random.default_rng(3)
+        ratings = rng.uniform(1, 5_000, 50_000)
+        prices = np.round(ratings / 50 + rng.uniform(0, 1, 50_000), 2)
+        sizes = []
+        knapsack = BundleSolver._knapsack
+        monkeypatch.setattr(BundleSolver, "_knapsack", lambda p, *args: sizes.append(len(p)) or knapsack(p, *args))
+
+        picked = solve_bundle(prices, ratings, budget=300)
+        greedy = BundleSolver._greedy(prices, np.argsort(-ratings, kind="stable"), 300, BundleSolver.MAX_ITEMS)
+        assert sizes and sizes[0] <= BundleSolver.MAX_CANDIDATES
+        assert prices[picked].sum() <= 300
+        assert ratings[picked].sum() >= ratings[greedy].sum()
+
+    @pytest.mark.parametrize("budget", [0, -5])
+    def test_no_budget_returns_nothing(self, budget: float):
+        """Test that a non-positive budget yields an empty bundle."""
+        assert len(solve_bundle(np.array([1.0]), np.array([5.0]), budget)) == 0
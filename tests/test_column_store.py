@@ -0,0 +1,120 @@
+"""Unit tests for the memory-mapped column store and snapshot round trip."""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from book_framework.catalog import CatalogSnapshot, ColumnStore, column_store_path, db_fingerprint, open_column_store
+from book_framework.catalog.ColumnStore import write_column_store
+
+
+@pytest.fixture
+def books() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "rowid": [1, 2, 3, 4],
+            "isbn": [None, None, None, None],
+            "title": ["Ion", "Enigma Otiliei", "Moara cu noroc", "Ion"],
+            "author": ["Liviu Rebreanu", "George Călinescu", None, "Liviu Rebreanu"],
+            "category": [["Literature"], [], ["Literature", "Classics"], ["Literature"]],
+            "rating": [4.1, np.nan, 3.9, 4.1],
+            "goodreads_url": [None, None, None, None],
+            "store": ["Carturesti", "Libris", "Libris", "Elefant"],
+            "url": ["http://a/1", "http://b/2", "http://b/3", "http://c/4"],
+            "price": [30.0, 45.5, np.nan, 28.0],
+        }
+    )
+
+
+def _values(series: pd.Series) -> list:
+    """Column values with every missing marker (None, NaN) as None."""
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+class TestColumnStore:
+    """Tests for the raw array file."""
+
+    def test_round_trip_is_read_only_mapping(self, tmp_path: Path):
+        """Test that arrays come back equal, as read-only views of the file."""
+        path = str(tmp_path / "a.columns")
+        arrays = {"ints": np.arange(5, dtype=np.int32), "floats": np.array([1.5, np.nan]), "empty": np.empty(0)}
+        write_column_store(path, arrays, {"kind": "test"})
+
+        store = ColumnStore(path)
+        assert store.meta == {"kind": "test"}
+        assert store["ints"].tolist() == [0, 1, 2, 3, 4]
+        assert np.isnan(store["floats"][1])
+        assert len(store["empty"]) == 0
+        assert store["ints"].flags.writeable is False
+        assert "missing" not in store
+
+    def test_rejects_other_files(self, tmp_path: Path):
+        """Test that a file without the magic header is refused."""
+        path = tmp_path / "b.columns"
+        path.write_bytes(b"SQLite format 3\x00")
+
+        with pytest.raises(ValueError):
+            ColumnStore(str(path))
+
+    def test_open_requires_matching_db(self, tmp_path: Path):
+        """Test that a store written for another DB file is ignored."""
+        db = tmp_path / "final_books.db"
+        db.write_bytes(b"release 1")
+        write_column_store(column_store_path(str(db)), {"x": np.zeros(1)}, {"db_fingerprint": db_fingerprint(str(db))})
+
+        assert column_store_path(str(db)) == str(tmp_path / "final_books.columns")
+        assert open_column_store(str(db)) is not None
+
+        db.write_bytes(b"release 2 with more rows")
+        assert open_column_store(str(db)) is None
+        assert open_column_store(str(tmp_path / "other.db")) is None
+
+
+class TestSnapshotColumns:
+    """Tests for saving a snapshot and mapping it back in."""
+
+    def test_snapshot_round_trip(self, books: pd.DataFrame, tmp_path: Path):
+        """Test that the frame and the prebuilt indexes survive save_columns/from_columns."""
+        path = str(tmp_path / "c.columns")
+        original = CatalogSnapshot(books, version=1)
+        original.save_columns(path)
+
+        restored = CatalogSnapshot.from_columns(ColumnStore(path), version=2)
+
+        assert list(restored.df.columns) == list(original.df.columns)
+        for column in original.df.columns:
+            assert _values(restored.df[column]) == _values(original.df[column])
+        assert restored.search.lookup("rebr").tolist() == original.search.lookup("rebr").tolist()
+        assert restored.search.fuzzy_lookup("rebrenu").tolist() == original.search.fuzzy_lookup("rebrenu").tolist() != []
+        for column in ("title", "author", "price", "rating"):
+            for ascending in (True, False):
+                expected = original.sort.permutation(column, ascending)
+                assert restored.sort.permutation(column, ascending).tolist() == expected.tolist()
+        assert restored.sort.value("title", 1) == "Enigma Otiliei"
+        assert restored.filters.categories_mask(["classics"]).tolist() == [False, False, True, False]
+        assert restored.filters.stores_mask(["Libris"]).tolist() == original.filters.stores_mask(["Libris"]).tolist()
+        assert restored.filters.price.between(29, 46).tolist() == [True, True, False, False]
+
+    def test_mapped_snapshot_shares_the_store(self, books: pd.DataFrame, tmp_path: Path):
+        """Test that codes, bitsets and sorted filter columns are read-only views of the file, not per-process copies."""
+        path = str(tmp_path / "e.columns")
+        CatalogSnapshot(books, version=1).save_columns(path)
+
+        restored = CatalogSnapshot.from_columns(ColumnStore(path), version=2)
+
+        for column in ("title", "author", "store", "url", "category"):
+            assert isinstance(restored.df[column].dtype, pd.CategoricalDtype)
+            assert restored.df[column].array.codes.flags.writeable is False
+        assert restored.df["category"].tolist()[2] == ("Literature", "Classics")
+        assert all(bits.flags.writeable is False for bits in restored.filters.category_sets.values())
+        assert restored.filters.price.positions.flags.writeable is False
+        assert np.shares_memory(restored.sort.uniques["title"], restored.df["title"].cat.categories.to_numpy())
+
+    def test_unsupported_column_raises(self, books: pd.DataFrame, tmp_path: Path):
+        """Test that columns with mixed object values are refused rather than pickled."""
+        books["isbn"] = [1, "x", None, 2.5]
+
+        with pytest.raises(TypeError):
+            CatalogSnapshot(books, version=1).save_columns(str(tmp_path / "d.columns"))
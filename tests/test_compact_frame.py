@@ -0,0 +1,74 @@
+"""Unit tests for the compact in-memory catalog layout."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from book_framework.catalog import category_counts, compact_frame, expand_frame, plain_values
+
+
+@pytest.fixture
+def books() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "rowid": [1, 2, 3, 4],
+            "title": ["Ion", "Baltagul", "Ion", "Maitreyi"],
+            "author": ["Liviu Rebreanu", "Mihail Sadoveanu", "Liviu Rebreanu", None],
+            "category": [["Literature"], ["Literature", "History"], ["Literature"], []],
+            "rating": [4.12, np.nan, 3.9, 4.0],
+            "store": ["Libris", "Carturesti", "Libris", "Libris"],
+            "price": [29.99, 45.5, np.nan, 0.1],
+        }
+    )
+
+
+class TestCompactFrame:
+    """Tests for the compact dtypes and reading values back."""
+
+    def test_dtypes(self, books: pd.DataFrame):
+        """Test that repeated strings, category lists and decimals get compact dtypes."""
+        compact = compact_frame(books)
+
+        assert isinstance(compact["store"].dtype, pd.CategoricalDtype)
+        assert isinstance(compact["author"].dtype, pd.CategoricalDtype)
+        assert len(compact["category"].cat.categories) == 3
+        assert compact["price"].dtype == np.float32
+        assert compact["rating"].dtype == np.float32
+        assert compact["rowid"].dtype == np.int32
+        assert compact["title"].dtype == books["title"].dtype
+
+    def test_plain_values_round_trip(self, books: pd.DataFrame):
+        """Test that every column reads back exactly, with missing values as None."""
+        compact = compact_frame(books)
+
+        assert plain_values(compact["price"]) == [29.99, 45.5, None, 0.1]
+        assert plain_values(compact["rating"]) == [4.12, None, 3.9, 4.0]
+        assert plain_values(compact["author"]) == ["Liviu Rebreanu", "Mihail Sadoveanu", "Liviu Rebreanu", None]
+        assert plain_values(compact["category"]) == [["Literature"], ["Literature", "History"], ["Literature"], []]
+        assert plain_values(compact.take([3, 1])["category"]) == [[], ["Literature", "History"]]
+
+    def test_imprecise_floats_stay_float64(self, books: pd.DataFrame):
+        """Test that values float32 cannot carry (more decimals, large scores) are left alone."""
+        books["rating"] = [4.123, 1.5, 2.0, 510234.71]
+        books["price"] = [300_000.01, 1.0, 2.0, 3.0]
+
+        compact = compact_frame(books)
+
+        assert compact["rating"].dtype == np.float64
+        assert compact["price"].dtype == np.float64
+
+    def test_expand_frame(self, books: pd.DataFrame):
+        """Test that expanding restores the plain layout."""
+        expanded = expand_frame(compact_frame(books))
+
+        assert expanded["category"].tolist() == books["category"].tolist()
+        assert expanded["price"].dtype == np.float64
+        assert expanded["price"].tolist()[:2] == [29.99, 45.5]
+
+    def test_category_counts_match_plain_layout(self, books: pd.DataFrame):
+        """Test counts per category, most common first, for both layouts."""
+        expected = {"Literature": 3, "History": 1}
+
+        assert category_counts(compact_frame(books)["category"]).to_dict() == expected
+        assert category_counts(books["category"]).to_dict() == expected
+        assert category_counts(compact_frame(books)["category"]).index.tolist() == ["Literature", "History"]
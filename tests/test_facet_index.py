@@ -0,0 +1,67 @@
+"""Unit tests for facet counts over the compact catalog layout."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from book_framework.catalog import CatalogSnapshot, FacetIndex, SortedColumn
+from book_framework.catalog.FacetIndex import price_bins
+
+
+@pytest.fixture
+def books() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "title": ["A", "B", "C", "D", "E"],
+            "category": [["History", "Arts"], ["history"], [], ["Arts"], ["History", "history"]],
+            "store": ["Targul Cartii", "Anticariat Unu", None, "Anticariat Unu", "Anticariat Unu"],
+            "price": [10.0, 20.0, np.nan, 30.0, 110.0],
+        }
+    )
+
+
+def _counts(facets: list[dict]) -> dict[str, int]:
+    return {facet["value"]: facet["count"] for facet in facets}
+
+
+class TestFacetIndex:
+    """Tests for bincount-based facet counting."""
+
+    def test_counts_every_row_without_masks(self, books: pd.DataFrame):
+        """Test category, store and price counts over the whole catalog."""
+        counts = CatalogSnapshot(books, version=1).facet_index().counts()
+
+        assert _counts(counts["categories"]) == {"Arts": 2, "History": 3, "history": 3}
+        assert _counts(counts["stores"]) == {"Anticariat Unu": 3, "Targul Cartii": 1}
+        assert sum(bucket["count"] for bucket in counts["price_histogram"]) == 4
+
+    def test_each_facet_uses_its_own_mask(self, books: pd.DataFrame):
+        """Test that masks select the rows counted per facet."""
+        facets = CatalogSnapshot(books, version=1).facet_index()
+        only_anticariat = np.array([False, True, False, True, True])
+
+        counts = facets.counts(category_rows=only_anticariat)
+
+        assert _counts(counts["categories"]) == {"Arts": 1, "History": 2, "history": 2}
+        assert _counts(counts["stores"]) == {"Anticariat Unu": 3, "Targul Cartii": 1}
+
+    def test_plain_and_compact_layouts_agree(self, books: pd.DataFrame):
+        """Test that building from plain lists gives the same counts as from the snapshot's categoricals."""
+        plain = FacetIndex.build(books["category"], books["store"], SortedColumn(books["price"]))
+        compact = CatalogSnapshot(books, version=1).facet_index()
+
+        assert plain.counts() == compact.counts()
+
+    def test_price_histogram_bins(self, books: pd.DataFrame):
+        """Test that bins end at the top-quantile price and the last one also holds the prices above it."""
+        histogram = CatalogSnapshot(books, version=1).facet_index().counts()["price_histogram"]
+
+        assert len(histogram) == 20
+        assert (histogram[0]["min"], histogram[0]["max"], histogram[0]["count"]) == (10.0, 11.0, 1)
+        assert histogram[-1]["max"] == 110.0
+        assert histogram[-1]["count"] == 2  # 30.0 closes the last bin; 110.0 is beyond the 99th percentile
+
+    def test_price_bins_edge_cases(self):
+        """Test that no prices give no bins and a single price gives one."""
+        assert price_bins(None, None)[2] == 0
+        assert price_bins(5.0, 5.0) == (5.0, 1.0, 1)
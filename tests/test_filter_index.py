@@ -0,0 +1,77 @@
+"""Unit tests for the category/store bitsets and sorted price/rating columns."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from book_framework.catalog import FilterIndex, SortedColumn
+
+
+@pytest.fixture
+def index() -> FilterIndex:
+    return FilterIndex.build(
+        category=pd.Series([["Literature"], ["History", "Arts"], [], ["literature"], None]),
+        store=pd.Series(["Targul Cartii", "Anticariat Unu", "Targul Cartii", None, "Anticariat Unu"]),
+        price=pd.Series([10.0, 25.5, None, 40.0, 25.5]),
+        rating=pd.Series([4.5, None, 3.0, 0.0, 1200.0]),
+    )
+
+
+class TestSortedColumn:
+    """Tests for searchsorted range masks."""
+
+    def test_inclusive_bounds(self):
+        """Test that both bounds are inclusive like the old >= / <= comparisons."""
+        col = SortedColumn(pd.Series([5.0, 10.0, 15.0, 10.0]))
+        assert col.between(10.0, 10.0).tolist() == [False, True, False, True]
+
+    def test_open_bounds(self):
+        """Test that a missing bound leaves that side unrestricted."""
+        col = SortedColumn(pd.Series([5.0, 10.0, 15.0]))
+        assert col.between(low=10.0).tolist() == [False, True, True]
+        assert col.between(high=10.0).tolist() == [True, True, False]
+
+    def test_nan_never_matches(self):
+        """Test that rows without a value are excluded from every range."""
+        col = SortedColumn(pd.Series([None, 1.0, np.nan]))
+        assert col.between().tolist() == [False, True, False]
+
+    def test_empty_range(self):
+        """Test that an inverted range matches nothing."""
+        col = SortedColumn(pd.Series([1.0, 2.0]))
+        assert not col.between(5.0, 1.0).any()
+
+
+class TestFilterIndex:
+    """Tests for the category and store bitsets."""
+
+    def test_categories_are_case_insensitive(self, index: FilterIndex):
+        """Test that 'LITERATURE' matches both spellings stored in the DB."""
+        assert index.categories_mask(["LITERATURE"]).tolist() == [True, False, False, True, False]
+
+    def test_categories_are_ored(self, index: FilterIndex):
+        """Test that selecting several categories matches any of them."""
+        assert index.categories_mask(["arts", "literature"]).tolist() == [True, True, False, True, False]
+
+    def test_unknown_category_matches_nothing(self, index: FilterIndex):
+        """Test that a category missing from the snapshot yields an empty mask."""
+        assert not index.categories_mask(["Cooking"]).any()
+
+    def test_stores_are_exact(self, index: FilterIndex):
+        """Test that store names must match exactly, like Series.isin."""
+        assert index.stores_mask(["Anticariat Unu"]).tolist() == [False, True, False, False, True]
+        assert not index.stores_mask(["anticariat unu"]).any()
+
+    def test_categories_containing_matches_substrings(self, index: FilterIndex):
+        """Test the recommendations subject filter, a case-insensitive substring match."""
+        assert index.categories_containing("HIST").tolist() == [False, True, False, False, False]
+        assert index.categories_containing("r").tolist() == [True, True, False, True, False]
+
+    def test_stores_named_ignores_case(self, index: FilterIndex):
+        """Test the recommendations source filter, an exact but case-insensitive match."""
+        assert index.stores_named("targul cartii").tolist() == [True, False, True, False, False]
+
+    def test_price_and_rating_ranges(self, index: FilterIndex):
+        """Test that price and rating use their own sorted columns."""
+        assert index.price.between(20.0, 30.0).tolist() == [False, True, False, False, True]
+        assert index.rating.between(low=3.0).tolist() == [True, False, True, False, True]
@@ -0,0 +1,102 @@
+"""Unit tests for the pluggable HTML parser and the page parsers built on it."""
+
+import pytest
+
+from book_crawler.bookstores.AnticariatUnuBookstore import parse_rows as anticariat_rows
+from book_framework.core import HtmlParser
+from book_framework.core.Goodreads import _parse_isbn_page, _parse_search_page
+
+BACKENDS = HtmlParser.available_backends()
+
+ANTICARIAT_PAGE = """
+<html><body><div class="header"><span class="text-danger">VANDUT</span></div>
+<div class="book"><h3><a href="/carte-1">Amintiri din copilarie de Ion Creanga, Ed. Minerva</a></h3>
+  <span class="price">12,50 Lei</span></div>
+<div class="book"><h3><a href="/carte-2">Carte vanduta</a></h3>
+  <span class="price">9 Lei</span><span class="text-danger">VANDUT</span></div>
+<div class="book"><h3><a href="https://www.anticariat-unu.ro/carte-3">Fara autor</a></h3>
+  <span class="price">30 Lei</span></div>
+<div class="book"><h3>fara link</h3><span class="price">1 Lei</span></div>
+</body></html>
+"""
+
+GOODREADS_SEARCH_PAGE = """
+<html><body><table>
+<tr itemtype="http://schema.org/Book"><td><a href="book/show/1">cover</a>
+  <a class="bookTitle"><span itemprop="name">Summary</span></a>
+  <a class="authorName"><span itemprop="name">Someone</span></a>
+  <span class="minirating">4.90 avg rating — 10 ratings</span></td></tr>
+<tr itemtype="http://schema.org/Book"><td><a href="book/show/2">cover</a>
+  <a class="bookTitle"><span itemprop="name">Dune</span></a>
+  <a class="authorName"><span itemprop="name">Frank Herbert</span></a>
+  <span class="minirating">4.27 avg rating — 1,234,567 ratings</span></td></tr>
+</table></body></html>
+"""
+
+GOODREADS_BOOK_PAGE = """
+<html><body><div class="RatingStatistics__rating"> 4.50 </div>
+<span data-testid="ratingsCount">2,000 ratings</span></body></html>
+"""
+
+
+class _AlwaysSimilar:
+    def is_similar(self, a, b):
+        return True, 1.0
+
+
+class TestStrainer:
+    """Tests for turning container selectors into bs4 strainers."""
+
+    @pytest.mark.parametrize(
+        "selector", [".book", "div.product-grid", 'tr[itemtype="http://schema.org/Book"]', "li", "span[data-testid=x]"]
+    )
+    def test_simple_selectors_get_a_strainer(self, selector):
+        """Test that tag, class and attribute selectors are expressed as strainers."""
+        assert HtmlParser.strainer(selector) is not None
+
+    @pytest.mark.parametrize("selector", ["h3 a", "div > p", "a:first-child", ""])
+    def test_other_selectors_parse_everything(self, selector):
+        """Test that selectors a strainer cannot express fall back to a full parse."""
+        assert HtmlParser.strainer(selector) is None
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+class TestBackends:
+    """Tests that every installed backend gives the same answers."""
+
+    def test_select_matches_a_full_parse(self, backend):
+        """Test that the strained parse finds the same containers, with their contents."""
+        strained = HtmlParser.select(ANTICARIAT_PAGE, ".book", backend)
+        full = HtmlParser.parse(ANTICARIAT_PAGE, backend).css(".book")
+        assert [n.text(strip=True) for n in strained] == [n.text(strip=True) for n in full]
+        assert len(strained) == 4
+        assert strained[0].css_first("h3 a").attr("href") == "/carte-1"
+        assert strained[3].css_first("h3 a") is None
+
+    def test_nodes_implement_the_interface(self, backend):
+        """Test that the backend's nodes are Node instances; Node itself is abstract."""
+        assert isinstance(HtmlParser.parse(ANTICARIAT_PAGE, backend), HtmlParser.Node)
+        with pytest.raises(TypeError):
+            HtmlParser.Node(None)
+
+    def test_empty_page(self, backend):
+        """Test that an empty page has no containers."""
+        assert HtmlParser.select("", ".book", backend) == []
+
+    def test_anticariat_rows(self, backend):
+        """Test that sold books and rows without a link are skipped and authors are split off."""
+        assert anticariat_rows("https://www.anticariat-unu.ro/x", ANTICARIAT_PAGE, backend) == [
+            ("Amintiri din copilarie", "Ion Creanga", "https://www.anticariat-unu.ro/carte-1", 12.5),
+            ("Fara autor", None, "https://www.anticariat-unu.ro/carte-3", 30.0),
+        ]
+
+    def test_goodreads_search_page(self, backend):
+        """Test that rejected titles are skipped and the first match is scored."""
+        score, url = _parse_search_page(GOODREADS_SEARCH_PAGE, "Dune", "Frank Herbert", _AlwaysSimilar(), backend)
+        assert score == pytest.approx(4.27 * 1234567)
+        assert url == "https://www.goodreads.com/book/show/2"
+
+    def test_goodreads_book_page(self, backend):
+        """Test that a book page is scored from its rating and ratings count."""
+        assert _parse_isbn_page(GOODREADS_BOOK_PAGE, "u", backend) == (4.5 * 2000, "u")
+        assert _parse_isbn_page("<html></html>", "u", backend) == (None, None)
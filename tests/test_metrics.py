@@ -0,0 +1,71 @@
+"""Unit tests for the Prometheus text metrics registry."""
+
+import pytest
+
+from book_framework.core.Metrics import Metrics
+
+
+@pytest.fixture
+def metrics() -> Metrics:
+    registry = Metrics(buckets=(0.01, 0.1, 1.0))
+    registry.describe("latency_seconds", "Request latency")
+    return registry
+
+
+class TestMetrics:
+    """Tests for histogram recording and exposition."""
+
+    def test_histogram_buckets_are_cumulative(self, metrics: Metrics):
+        """Test bucket counts, sum and count of one label set."""
+        for seconds in (0.005, 0.05, 0.05, 2.0):
+            metrics.observe("latency_seconds", seconds, route="/api/books")
+
+        lines = metrics.render().splitlines()
+
+        assert "# HELP latency_seconds Request latency" in lines
+        assert "# TYPE latency_seconds histogram" in lines
+        assert 'latency_seconds_bucket{route="/api/books",le="0.01"} 1' in lines
+        assert 'latency_seconds_bucket{route="/api/books",le="0.1"} 3' in lines
+        assert 'latency_seconds_bucket{route="/api/books",le="1"} 3' in lines
+        assert 'latency_seconds_bucket{route="/api/books",le="+Inf"} 4' in lines
+        assert 'latency_seconds_sum{route="/api/books"} 2.105' in lines
+        assert 'latency_seconds_count{route="/api/books"} 4' in lines
+
+    def test_label_sets_are_separate(self, metrics: Metrics):
+        """Test that each label combination gets its own series, in stable order."""
+        metrics.observe("latency_seconds", 0.5, route="/b", method="GET")
+        metrics.observe("latency_seconds", 0.5, method="GET", route="/a")
+
+        counts = [line for line in metrics.render().splitlines() if line.startswith("latency_seconds_count")]
+
+        assert counts == [
+            'latency_seconds_count{method="GET",route="/a"} 1',
+            'latency_seconds_count{method="GET",route="/b"} 1',
+        ]
+
+    def test_timer_observes(self, metrics: Metrics):
+        """Test that the timer records one observation even when the block raises."""
+        with pytest.raises(KeyError), metrics.timer("stage_seconds", stage="filter"):
+            raise KeyError("boom")
+
+        assert 'stage_seconds_count{stage="filter"} 1' in metrics.render().splitlines()
+
+    def test_samples_and_escaping(self, metrics: Metrics):
+        """Test scrape-time gauges and label value escaping."""
+        text = metrics.render([("rows", "gauge", "Rows", [({"path": 'a"b\\c'}, 12.0)]), ("ratio", "gauge", "R", [({}, 0.5)])])
+
+        assert "# TYPE rows gauge" in text
+        assert 'rows{path="a\\"b\\\\c"} 12' in text
+        assert "ratio 0.5" in text
+
+    def test_render_labels_apply_to_every_histogram(self, metrics: Metrics):
+        """Test that process labels such as pid and engine are added to every histogram series, not to samples."""
+        metrics.observe("latency_seconds", 0.05, route="/api/books")
+        metrics.observe("stage_seconds", 0.5, stage="filter")
+
+        lines = metrics.render([("rows", "gauge", "Rows", [({}, 3.0)])], labels={"pid": "42", "engine": "sql"}).splitlines()
+
+        assert 'latency_seconds_bucket{engine="sql",pid="42",route="/api/books",le="0.1"} 1' in lines
+        assert 'latency_seconds_count{engine="sql",pid="42",route="/api/books"} 1' in lines
+        assert 'stage_seconds_sum{engine="sql",pid="42",stage="filter"} 0.5' in lines
+        assert "rows 3" in lines
@@ -0,0 +1,47 @@
+"""Unit tests for opaque keyset pagination cursors."""
+
+import base64
+import json
+
+import pytest
+
+from book_framework.catalog import PageCursor
+
+
+class TestPageCursor:
+    """Tests for cursor encoding."""
+
+    @pytest.mark.parametrize("value", ["Ion Creangă", 12.5, None])
+    def test_round_trip(self, value):
+        """Test that decode() restores exactly what encode() wrote."""
+        cursor = PageCursor(3, 1041, "title", False, value, "https://example.ro/carte", 48)
+        token = cursor.encode()
+
+        assert "=" not in token
+        assert PageCursor.decode(token) == cursor
+
+    @pytest.mark.parametrize("token", ["", "not-a-cursor", "WzEsMl0", "eyJhIjogMX0"])
+    def test_malformed_tokens_raise(self, token: str):
+        """Test that garbage or truncated payloads raise ValueError."""
+        with pytest.raises(ValueError):
+            PageCursor.decode(token)
+
+    def test_boolean_value_raises(self):
+        """Test that a JSON boolean is not accepted as a numeric sort value."""
+        token = PageCursor(1, 0, "price", True, True, None).encode()
+        with pytest.raises(ValueError):
+            PageCursor.decode(token)
+
+    def test_tokens_without_offset_are_accepted(self):
+        """Test that a token issued before cursors carried an offset still decodes, with no offset."""
+        raw = json.dumps([2, 7, "price", True, 20.0, "u1"]).encode("utf-8")
+        token = base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+        assert PageCursor.decode(token) == PageCursor(2, 7, "price", True, 20.0, "u1")
+
+    @pytest.mark.parametrize("offset", [-1, 2.5, True, "24"])
+    def test_invalid_offset_raises(self, offset):
+        """Test that the offset must be a non-negative integer."""
+        token = PageCursor(1, 0, "price", True, 1.0, None, offset).encode()
+        with pytest.raises(ValueError):
+            PageCursor.decode(token)
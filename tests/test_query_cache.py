@@ -0,0 +1,77 @@
+"""Unit tests for query normalization and the per-snapshot result cache."""
+
+import numpy as np
+import pytest
+
+from book_framework.catalog import CatalogQuery, QueryCache
+
+
+class TestCatalogQuery:
+    """Tests for cache key normalization."""
+
+    def test_equivalent_filters_share_a_key(self):
+        """Test that order, case and diacritics do not create separate entries."""
+        a = CatalogQuery.normalize("Ștefan  cel", ["History", "arts"], ["B", "A"], sort_by="price")
+        b = CatalogQuery.normalize("stefan CEL", ["ARTS", "history", "arts"], ["A", "B"], sort_by="price")
+        assert a == b
+        assert hash(a) == hash(b)
+
+    def test_search_without_words_matches_nothing(self):
+        """Test that punctuation-only search is kept as a filter that matches nothing, unlike a blank one."""
+        assert CatalogQuery.normalize("!!!").matches_nothing
+        assert not CatalogQuery.normalize("  ").matches_nothing
+        assert not CatalogQuery.normalize("ion!").matches_nothing
+
+    def test_zero_rating_is_no_filter(self):
+        """Test that min_rating=0 normalizes to no rating filter."""
+        assert CatalogQuery.normalize(min_rating=0).min_rating is None
+
+    def test_unknown_sort_falls_back_to_title(self):
+        """Test that an unsupported sort column sorts by title."""
+        query = CatalogQuery.normalize(sort_by="isbn", sort_dir="desc")
+        assert query.sort_by == "title"
+        assert query.ascending is False
+
+
+class TestQueryCache:
+    """Tests for LRU behaviour and bounds."""
+
+    def test_put_then_get(self):
+        """Test that stored rows are returned read-only."""
+        cache = QueryCache()
+        query = CatalogQuery.normalize("a")
+        cache.put(query, np.arange(5, dtype=np.int32))
+
+        rows = cache.get(query)
+        assert rows.tolist() == [0, 1, 2, 3, 4]
+        assert not rows.flags.writeable
+        assert cache.hits == 1
+
+    def test_miss_is_counted(self):
+        """Test that a missing key returns None."""
+        cache = QueryCache()
+        assert cache.get(CatalogQuery.normalize("a")) is None
+        assert cache.misses == 1
+
+    def test_evicts_least_recently_used(self):
+        """Test that the entry bound evicts the oldest untouched entry."""
+        cache = QueryCache(max_entries=2)
+        q1, q2, q3 = (CatalogQuery.normalize(s) for s in ("a", "b", "c"))
+        cache.put(q1, np.arange(1, dtype=np.int32))
+        cache.put(q2, np.arange(1, dtype=np.int32))
+        cache.get(q1)
+        cache.put(q3, np.arange(1, dtype=np.int32))
+
+        assert cache.get(q1) is not None
+        assert cache.get(q2) is None
+        assert cache.get(q3) is not None
+
+    @pytest.mark.parametrize("n_rows", [100, 1000])
+    def test_byte_bound(self, n_rows: int):
+        """Test that the byte bound is enforced and oversized results are not kept."""
+        cache = QueryCache(max_bytes=1000 * 4)
+        cache.put(CatalogQuery.normalize("a"), np.arange(n_rows, dtype=np.int32))
+        cache.put(CatalogQuery.normalize("b"), np.arange(n_rows, dtype=np.int32))
+
+        assert cache.nbytes <= cache.max_bytes
+        assert len(cache) == (1 if n_rows == 1000 else 2)
@@ -0,0 +1,109 @@
+"""Unit tests for the catalog's inverted token index."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from book_framework.catalog import SearchIndex, normalize_text, tokenize
+
+
+@pytest.fixture
+def index() -> SearchIndex:
+    titles = pd.Series(
+        [
+            "Amintiri din copilărie",
+            "Crimă și pedeapsă",
+            "Ştefan cel Mare",
+            "Harry Potter și piatra filozofală",
+            "Țara de dincolo de negură",
+            None,
+        ]
+    )
+    authors = pd.Series(["Ion Creangă", "Dostoievski", None, "J.K. Rowling", "Mihail Sadoveanu", "Nobody"])
+    return SearchIndex.build(titles, authors)
+
+
+class TestNormalize:
+    """Tests for diacritic folding and tokenization."""
+
+    @pytest.mark.parametrize(
+        "raw,expected",
+        [
+            ("Ștefan", "stefan"),
+            ("Ştefan", "stefan"),
+            ("Țară", "tara"),
+            ("ţară", "tara"),
+            ("Învățătură", "invatatura"),
+            ("Émile", "emile"),
+        ],
+    )
+    def test_folds_romanian_and_latin_diacritics(self, raw: str, expected: str):
+        """Test that both comma-below and cedilla forms fold to ASCII."""
+        assert normalize_text(raw) == expected
+
+    def test_non_string_normalizes_to_empty(self):
+        """Test that missing values produce no text."""
+        assert normalize_text(None) == ""
+        assert normalize_text(float("nan")) == ""
+
+    def test_tokenize_splits_on_punctuation(self):
+        """Test that punctuation separates tokens."""
+        assert tokenize("J.K. Rowling, vol. 2") == ["j", "k", "rowling", "vol", "2"]
+
+
+class TestSearchIndex:
+    """Tests for posting list lookup."""
+
+    def test_single_token_matches_title_and_author(self, index: SearchIndex):
+        """Test that a token is found in either column."""
+        assert index.lookup("creanga").tolist() == [0]
+        assert index.lookup("nobody").tolist() == [5]
+
+    def test_query_diacritics_are_folded(self, index: SearchIndex):
+        """Test that queries with or without diacritics match the same rows."""
+        assert index.lookup("ștefan").tolist() == index.lookup("stefan").tolist() == [2]
+        assert index.lookup("tara").tolist() == [4]
+
+    def test_prefix_match(self, index: SearchIndex):
+        """Test that a partial token matches as a prefix."""
+        assert index.lookup("dosto").tolist() == [1]
+        assert index.lookup("p").tolist() == [1, 3]
+
+    def test_multi_word_intersects(self, index: SearchIndex):
+        """Test that every token of the query must match."""
+        assert index.lookup("si").tolist() == [1, 3]
+        assert index.lookup("potter si").tolist() == [3]
+        assert index.lookup("potter crima").tolist() == []
+
+    def test_token_order_and_case_do_not_matter(self, index: SearchIndex):
+        """Test that queries are normalized like the indexed text."""
+        assert index.lookup("ROWLING harry").tolist() == [3]
+
+    def test_blank_query_means_no_restriction(self, index: SearchIndex):
+        """Test that a missing or blank query is not a filter."""
+        assert index.lookup(None) is None
+        assert index.lookup("   ") is None
+        assert index.fuzzy_lookup("") is None
+
+    @pytest.mark.parametrize("query", ["...", "!!!", " - "])
+    def test_query_without_words_matches_nothing(self, index: SearchIndex, query: str):
+        """Test that a query with text but no word tokens matches no row instead of every row."""
+        assert index.lookup(query).tolist() == []
+        assert index.fuzzy_lookup(query).tolist() == []
+
+    def test_unknown_token_returns_empty(self, index: SearchIndex):
+        """Test that an unmatched token yields no rows."""
+        result = index.lookup("zzz")
+        assert isinstance(result, np.ndarray)
+        assert len(result) == 0
+
+    def test_repeated_token_in_row_is_posted_once(self):
+        """Test that a token appearing in both title and author is not duplicated."""
+        index = SearchIndex.build(pd.Series(["Eminescu"]), pd.Series(["Mihai Eminescu"]))
+        assert index.lookup("eminescu").tolist() == [0]
+
+    def test_empty_catalog(self):
+        """Test that an empty catalog builds an empty index."""
+        index = SearchIndex.build(pd.Series([], dtype=object), pd.Series([], dtype=object))
+        assert len(index) == 0
+        assert index.lookup("anything").tolist() == []
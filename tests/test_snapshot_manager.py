@@ -0,0 +1,136 @@
+"""Unit tests for SnapshotManager hot-swapping."""
+
+import os
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from book_framework.catalog import SnapshotManager
+
+
+def _touch(path: Path, content: str) -> None:
+    path.write_text(content)
+    # Force a distinct mtime even on coarse-grained filesystems.
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def db_file(tmp_path: Path) -> Path:
+    path = tmp_path / "final_books.db"
+    path.write_text("v1")
+    return path
+
+
+@pytest.fixture
+def loads() -> list:
+    return []
+
+
+@pytest.fixture
+def manager(db_file: Path, loads: list) -> SnapshotManager:
+    def _loader(path: str) -> pd.DataFrame:
+        loads.append(path)
+        return pd.DataFrame({"title": [f"Book {len(loads)}"], "price": [10.0]})
+
+    return SnapshotManager(str(db_file), _loader, poll_interval=3600)
+
+
+class TestSnapshotManager:
+    """Tests for loading and swapping catalog snapshots."""
+
+    def test_missing_db_raises(self, tmp_path: Path):
+        """Test that current() reports a missing database instead of waiting."""
+        manager = SnapshotManager(str(tmp_path / "missing.db"), lambda _: pd.DataFrame())
+
+        with pytest.raises(FileNotFoundError):
+            manager.current()
+
+    def test_first_refresh_loads_immediately(self, manager: SnapshotManager, loads: list):
+        """Test that the initial load does not wait for the file to settle."""
+        assert manager.refresh() is True
+
+        snapshot = manager.current()
+        assert snapshot.version == 1
+        assert snapshot.df.iloc[0]["title"] == "Book 1"
+        assert len(loads) == 1
+
+    def test_unchanged_file_is_not_reloaded(self, manager: SnapshotManager, loads: list):
+        """Test that polling an unchanged file never reloads it."""
+        manager.refresh()
+
+        assert manager.refresh() is False
+        assert manager.refresh() is False
+        assert len(loads) == 1
+
+    def test_changed_file_swaps_after_settling(self, manager: SnapshotManager, db_file: Path):
+        """Test that a new release is loaded once its signature is stable for two polls."""
+        manager.refresh()
+        old = manager.current()
+
+        _touch(db_file, "v2 with more rows")
+
+        assert manager.refresh() is False  # first sighting: wait for the copy to finish
+        assert manager.current() is old
+        assert manager.refresh() is True
+
+        new = manager.current()
+        assert new is not old
+        assert new.version == 2
+        # A request still holding the old snapshot keeps seeing consistent data.
+        assert old.df.iloc[0]["title"] == "Book 1"
+
+    def test_failed_reload_keeps_old_snapshot(self, db_file: Path):
+        """Test that a loader error leaves the previous snapshot in service."""
+        calls = []
+
+        def _loader(path: str) -> pd.DataFrame:
+            calls.append(path)
+            if len(calls) > 1:
+                raise RuntimeError("corrupt release")
+            return pd.DataFrame({"title": ["Book"]})
+
+        manager = SnapshotManager(str(db_file), _loader)
+        manager.refresh()
+        old = manager.current()
+
+        _touch(db_file, "broken")
+        manager.refresh()
+        assert manager.refresh() is False
+
+        assert manager.current() is old
+
+    def test_current_starts_watcher_and_waits_for_first_load(self, manager: SnapshotManager):
+        """Test that current() kicks off the watcher when nothing is loaded yet."""
+        try:
+            snapshot = manager.current(timeout=5)
+        finally:
+            manager.stop()
+
+        assert snapshot.version == 1
+
+    def test_prepare_runs_before_swap(self, db_file: Path):
+        """Test that the prepare hook warms the snapshot before it is served."""
+        seen = []
+
+        def _prepare(snapshot) -> None:
+            seen.append(snapshot.version)
+            snapshot.memo("payload", lambda s: len(s))
+
+        manager = SnapshotManager(str(db_file), lambda _: pd.DataFrame({"title": ["a", "b"]}), prepare=_prepare)
+        manager.refresh()
+
+        assert seen == [1]
+        assert manager.current().memo("payload", lambda s: -1) == 2
+
+    def test_prepare_failure_still_swaps(self, db_file: Path):
+        """Test that a failing prepare hook does not block the new snapshot."""
+
+        def _prepare(snapshot) -> None:
+            raise ValueError("boom")
+
+        manager = SnapshotManager(str(db_file), lambda _: pd.DataFrame({"title": ["a"]}), prepare=_prepare)
+
+        assert manager.refresh() is True
+        assert manager.current().version == 1
@@ -0,0 +1,83 @@
+"""Unit tests for presorted permutations and cursor seeks."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from book_framework.catalog import SortIndex
+
+
+@pytest.fixture
+def index() -> SortIndex:
+    return SortIndex.build(
+        {
+            "title": pd.Series(["b", None, "a", "c", "a"]),
+            "price": pd.Series([20.0, 5.0, np.nan, 20.0, 1.0]),
+        }
+    )
+
+
+class TestSortIndex:
+    """Tests for permutation order."""
+
+    def test_ascending_is_stable_with_nan_last(self, index: SortIndex):
+        """Test that ties keep catalog order and missing values sort last."""
+        assert index.permutation("title", True).tolist() == [2, 4, 0, 3, 1]
+        assert index.permutation("price", True).tolist() == [4, 1, 0, 3, 2]
+
+    def test_descending_is_stable_with_nan_last(self, index: SortIndex):
+        """Test that descending order also keeps ties stable and NaN last."""
+        assert index.permutation("title", False).tolist() == [3, 0, 2, 4, 1]
+        assert index.permutation("price", False).tolist() == [0, 3, 1, 4, 2]
+
+    def test_matches_pandas_stable_sort(self):
+        """Test parity with sort_values(kind='stable', na_position='last')."""
+        rng = np.random.default_rng(0)
+        values = pd.Series(rng.integers(0, 50, 500).astype(float))
+        values[rng.random(500) < 0.1] = np.nan
+        index = SortIndex.build({"price": values})
+
+        for ascending in (True, False):
+            expected = values.sort_values(ascending=ascending, kind="stable", na_position="last").index
+            assert index.permutation("price", ascending).tolist() == expected.tolist()
+
+
+class TestSeek:
+    """Tests for resuming inside an ordered subsequence of a permutation."""
+
+    @pytest.mark.parametrize("ascending", [True, False])
+    def test_seek_row_resumes_after_row(self, index: SortIndex, ascending: bool):
+        """Test that every row of the order resumes at the row that follows it."""
+        perm = index.permutation("price", ascending)
+        for i, row in enumerate(perm):
+            assert index.seek_row(perm, "price", ascending, int(row)) == i + 1
+
+    def test_seek_row_when_row_was_filtered_out(self, index: SortIndex):
+        """Test that the cursor row need not be part of the filtered rows."""
+        perm = index.permutation("title", True)  # [2, 4, 0, 3, 1]
+        filtered = perm[perm != 0]
+        assert filtered[index.seek_row(filtered, "title", True, 0) :].tolist() == [3, 1]
+
+    def test_seek_value_ascending(self, index: SortIndex):
+        """Test that a value resumes at its tie block, or after it with after=True."""
+        perm = index.permutation("price", True)  # prices 1, 5, 20, 20, NaN
+        assert index.seek_value(perm, "price", True, 20.0) == 2
+        assert index.seek_value(perm, "price", True, 20.0, after=True) == 4
+        assert index.seek_value(perm, "price", True, 10.0) == 2
+        assert index.seek_value(perm, "price", True, 10.0, after=True) == 2
+
+    def test_seek_value_descending(self, index: SortIndex):
+        """Test that descending order seeks to values at or below the cursor value."""
+        perm = index.permutation("price", False)  # prices 20, 20, 5, 1, NaN
+        assert index.seek_value(perm, "price", False, 20.0) == 0
+        assert index.seek_value(perm, "price", False, 20.0, after=True) == 2
+        assert index.seek_value(perm, "price", False, 3.0) == 3
+
+    def test_missing_value_sorts_last(self, index: SortIndex):
+        """Test that a cursor on a missing value resumes inside the trailing block."""
+        perm = index.permutation("title", True)
+        assert index.seek_value(perm, "title", True, None) == 4
+        assert index.seek_value(perm, "title", True, None, after=True) == 5
+        assert index.value("title", 1) is None
+        assert index.value("price", 4) == 1.0
+
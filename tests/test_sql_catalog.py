@@ -0,0 +1,172 @@
+"""Unit tests for the SQLite pushdown catalog engine."""
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from book_framework.catalog import CatalogQuery, PageCursor, SqlCatalog
+from book_framework.catalog.SqlCatalog import _runs
+
+ROWS = [
+    # isbn, title, author, category, rating, goodreads_url, store, url, price
+    (None, "Amintiri din copilărie", "Ion Creangă", "Literature", 4.5, None, "Targul Cartii", "u1", 20.0),
+    (None, "Istoria românilor", "Nicolae Iorga", "History,Arts", None, None, "Anticariat Unu", "u2", 35.0),
+    (None, "Ștefan cel Mare", None, "history", 3.0, None, "Targul Cartii", "u3", None),
+    (None, "Poezii", "Mihai Eminescu", None, 4.9, None, "Anticariat Unu", "u4", 20.0),
+]
+
+
+@pytest.fixture
+def catalog(tmp_path: Path) -> SqlCatalog:
+    path = str(tmp_path / "final_books.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE books (isbn TEXT, title TEXT NOT NULL, author TEXT, category TEXT, rating REAL,"
+        " goodreads_url TEXT, store TEXT, url TEXT, price REAL)"
+    )
+    conn.executemany("INSERT INTO books VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", ROWS)
+    conn.commit()
+    conn.close()
+    return SqlCatalog(SqlCatalog.prepare_db(path), version=1)
+
+
+def _ids(rows: list[dict]) -> list[int]:
+    return [row["rowid"] for row in rows]
+
+
+class TestSqlCatalog:
+    """Tests for filtering, ordering and paging in SQL."""
+
+    def test_check_is_read_only(self, tmp_path: Path, catalog: SqlCatalog):
+        """Test that the serving loader accepts a prepared DB and rejects a bare one without touching it."""
+        assert SqlCatalog.check_db(catalog.db_path) == catalog.db_path
+
+        bare = tmp_path / "bare.db"
+        conn = sqlite3.connect(bare)
+        conn.execute("CREATE TABLE books (title TEXT)")
+        conn.commit()
+        conn.close()
+        before = bare.read_bytes()
+        with pytest.raises(RuntimeError, match="books_fts"):
+            SqlCatalog.check_db(str(bare))
+        assert bare.read_bytes() == before
+
+    def test_prepare_is_idempotent(self, catalog: SqlCatalog):
+        """Test that preparing an already prepared release changes nothing."""
+        assert SqlCatalog.prepare_db(catalog.db_path) == catalog.db_path
+        assert len(catalog) == 4
+
+    def test_search_folds_diacritics_and_prefixes(self, catalog: SqlCatalog):
+        """Test that 'stef' finds 'Ștefan' and every token must match."""
+        assert _ids(catalog.rows(CatalogQuery.normalize("stef"), 10)) == [3]
+        assert _ids(catalog.rows(CatalogQuery.normalize("creanga amin"), 10)) == [1]
+        assert catalog.count(CatalogQuery.normalize("creanga poezii")) == 0
+
+    def test_search_without_words_matches_nothing(self, catalog: SqlCatalog):
+        """Test that a punctuation-only search returns no rows, not the whole catalog."""
+        assert catalog.count(CatalogQuery.normalize("!!!")) == 0
+        assert catalog.rows(CatalogQuery.normalize("-", fuzzy=True), 10) == []
+        assert catalog.count(CatalogQuery.normalize("  ")) == catalog.count(CatalogQuery())
+
+    def test_fuzzy_search_matches_similar_terms(self, catalog: SqlCatalog):
+        """Test that fuzzy search expands each token with FTS terms spelled like it."""
+        assert catalog.count(CatalogQuery.normalize("eminscu")) == 0
+        assert _ids(catalog.rows(CatalogQuery.normalize("eminscu", fuzzy=True), 10)) == [4]
+        assert _ids(catalog.rows(CatalogQuery.normalize("istorai romanilor", fuzzy=True), 10)) == [2]
+
+    def test_facets_ignore_their_own_filter(self, catalog: SqlCatalog):
+        """Test that store counts ignore the store filter while category counts apply it."""
+        facets = catalog.facets(CatalogQuery.normalize(stores=["Targul Cartii"]))
+
+        assert facets["total"] == 2
+        assert {f["value"]: f["count"] for f in facets["stores"]} == {"Anticariat Unu": 2, "Targul Cartii": 2}
+        categories = {f["value"]: f["count"] for f in facets["categories"]}
+        assert categories == {"Arts": 0, "History": 1, "Literature": 1, "history": 1}
+        assert sum(bucket["count"] for bucket in facets["price_histogram"]) == 1
+
+    def test_categories_are_case_insensitive(self, catalog: SqlCatalog):
+        """Test that category filters match any selected category regardless of case."""
+        query = CatalogQuery.normalize(categories=["HISTORY"])
+        assert _ids(catalog.rows(query, 10)) == [2, 3]
+
+    def test_missing_values_sort_last_and_ties_by_rowid(self, catalog: SqlCatalog):
+        """Test the pandas ordering contract in both directions."""
+        assert _ids(catalog.rows(CatalogQuery.normalize(sort_by="price"), 10)) == [1, 4, 2, 3]
+        assert _ids(catalog.rows(CatalogQuery.normalize(sort_by="price", sort_dir="desc"), 10)) == [2, 1, 4, 3]
+
+    def test_categories_are_returned_as_lists(self, catalog: SqlCatalog):
+        """Test that rows look like the DataFrame records the pandas engine returns."""
+        row = catalog.rows(CatalogQuery.normalize(), 1, offset=1)[0]
+        assert row["category"] == ["History", "Arts"]
+        assert row["rating"] is None
+
+    def test_keyset_resumes_after_cursor(self, catalog: SqlCatalog):
+        """Test that a cursor inside a tie resumes at the next row of the tie."""
+        query = CatalogQuery.normalize(sort_by="price")
+        cursor = PageCursor(1, 1, "price", True, 20.0, "u1")
+
+        assert _ids(catalog.rows(query, 10, after=cursor)) == [4, 2, 3]
+        assert catalog.count(query, cursor) == 3
+
+    @pytest.mark.parametrize("sort_by", ["title", "author", "price", "rating"])
+    @pytest.mark.parametrize("sort_dir", ["asc", "desc"])
+    def test_cursor_pages_match_offset_order(self, catalog: SqlCatalog, sort_by: str, sort_dir: str):
+        """Test that walking one row at a time through the keyset runs gives the ORDER BY order, missing values last."""
+        query = CatalogQuery.normalize(sort_by=sort_by, sort_dir=sort_dir)
+        walked, cursor = [], None
+        while page := catalog.rows(query, 1, after=cursor):
+            walked += page
+            last = page[-1]
+            cursor = PageCursor(1, last["rowid"], sort_by, query.ascending, last[sort_by], last["url"])
+
+        offset_pages = [catalog.rows(query, 1, offset=i)[0] for i in range(4)]
+        assert _ids(walked) == _ids(catalog.rows(query, 10)) == _ids(offset_pages)
+        assert catalog.count(query, cursor) == 0
+
+    def test_seek_is_an_index_range(self, catalog: SqlCatalog):
+        """Test that the runs after a title cursor are index searches, with no temp B-tree over the matches."""
+        query = CatalogQuery.normalize(sort_by="title")
+        cursor = PageCursor(1, 1, "title", True, "Amintiri din copilărie", "u1")
+        for clause, values, order_by in _runs(query, cursor)[:2]:
+            plan = catalog._conn().execute(
+                f"EXPLAIN QUERY PLAN SELECT * FROM books b WHERE {clause} ORDER BY {order_by} LIMIT 1", values
+            ).fetchall()
+            details = " ".join(row[-1] for row in plan)
+            assert "USING INDEX idx_title" in details
+            assert "TEMP B-TREE" not in details
+
+    def test_cursor_from_another_release_is_relocated_by_url(self, catalog: SqlCatalog):
+        """Test that a stale cursor resumes after the same book when it kept its value."""
+        stale = PageCursor(99, 1234, "price", True, 20.0, "u4")
+        assert _ids(catalog.rows(CatalogQuery.normalize(sort_by="price"), 10, after=catalog.locate(stale))) == [2, 3]
+
+        moved = PageCursor(99, 1234, "price", True, 20.0, "gone")
+        assert _ids(catalog.rows(CatalogQuery.normalize(sort_by="price"), 10, after=catalog.locate(moved))) == [1, 4, 2, 3]
+
+    def test_same_version_from_another_worker_is_checked_by_url(self, catalog: SqlCatalog):
+        """Test that a cursor whose version matches by chance is relocated when its rowid holds another book."""
+        query = CatalogQuery.normalize(sort_by="price")
+        own = PageCursor(1, 1, "price", True, 20.0, "u1")
+        assert catalog.locate(own) is own
+
+        foreign = PageCursor(1, 1, "price", True, 20.0, "u4")  # u4 is rowid 4 here
+        assert _ids(catalog.rows(query, 10, after=catalog.locate(foreign))) == [2, 3]
+
+    def test_payloads(self, catalog: SqlCatalog):
+        """Test the filters and insights payloads."""
+        filters = catalog.filters()
+        assert filters["categories"] == ["Arts", "History", "Literature", "history"]
+        assert filters["stores"] == ["Anticariat Unu", "Targul Cartii"]
+        assert filters["price_range"] == {"min": 20.0, "max": 35.0}
+
+        insights = catalog.insights()
+        assert insights["total_volumes"] == 4
+        assert [book["title"] for book in insights["top_rated"]] == ["Poezii", "Amintiri din copilărie", "Ștefan cel Mare"]
+
+    def test_bundle_pool(self, catalog: SqlCatalog):
+        """Test the recommendations candidate pool filters."""
+        rowids, prices, _ = catalog.bundle_pool(30.0, subject=None, store="targul cartii")
+        assert rowids.tolist() == [1]
+        assert prices.tolist() == [20.0]
+        assert catalog.bundle_pool(100.0, subject="HIST", store=None)[0].tolist() == [2]
@@ -0,0 +1,57 @@
+"""Unit tests for the typeahead prefix index."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from book_framework.catalog import SuggestIndex
+
+
+@pytest.fixture
+def index() -> SuggestIndex:
+    return SuggestIndex.build(
+        pd.Series(["Ion", "Ion", "Iona", "Ispita", "Baltagul", None, "Ion Creangă"]),
+        pd.Series(["Liviu Rebreanu", "Liviu Rebreanu", "Ana Ionescu", None, "Mihail Sadoveanu", "Ion Creangă", None]),
+        pd.Series([4.0, 9.0, 3.0, np.nan, 8.0, 7.0, 1.0]),
+    )
+
+
+def _texts(suggestions: list[dict]) -> list[tuple[str, str]]:
+    return [(s["text"], s["kind"]) for s in suggestions]
+
+
+class TestSuggestIndex:
+    """Tests for prefix matching and ranking."""
+
+    def test_prefix_matches_ranked_by_rating(self, index: SuggestIndex):
+        """Test that titles and authors starting with the prefix come best-rated first."""
+        assert _texts(index.suggest("io")) == [
+            ("Ion", "title"),
+            ("Ion Creangă", "author"),
+            ("Iona", "title"),  # ties keep titles before authors
+            ("Ana Ionescu", "author"),
+            ("Ion Creangă", "title"),
+        ]
+
+    def test_offers_of_one_title_collapse(self, index: SuggestIndex):
+        """Test that a title sold by several stores is one suggestion with its best rating."""
+        ion = index.suggest("ion", limit=1)[0]
+
+        assert ion == {"text": "Ion", "kind": "title", "rating": 9.0, "offers": 2}
+
+    def test_author_matches_any_word(self, index: SuggestIndex):
+        """Test that author keys include every word, titles only their start."""
+        assert _texts(index.suggest("rebr")) == [("Liviu Rebreanu", "author")]
+        assert index.suggest("creanga") == [{"text": "Ion Creangă", "kind": "author", "rating": 7.0, "offers": 1}]
+
+    def test_query_is_normalized(self, index: SuggestIndex):
+        """Test that case, diacritics and extra spaces are ignored."""
+        assert _texts(index.suggest("  ION   cREANGA ")) == [("Ion Creangă", "author"), ("Ion Creangă", "title")]
+
+    def test_limit_and_empty(self, index: SuggestIndex):
+        """Test the result limit, unrated entries and prefixes without matches."""
+        assert len(index.suggest("i", limit=2)) == 2
+        assert index.suggest("isp")[0]["rating"] is None
+        assert index.suggest("zz") == []
+        assert index.suggest("") == []
+        assert index.suggest(None) == []
@@ -0,0 +1,70 @@
+"""Unit tests for the trigram index behind fuzzy search."""
+
+import pandas as pd
+import pytest
+
+from book_framework.catalog import SearchIndex, TrigramIndex
+from book_framework.catalog.TrigramIndex import trigrams
+
+
+@pytest.fixture
+def index() -> SearchIndex:
+    titles = pd.Series(["Crimă și pedeapsă", "Poezii", "Ion", "Enigma Otiliei", "Frații Karamazov"])
+    authors = pd.Series(["Dostoievski", "Mihai Eminescu", "Liviu Rebreanu", "George Călinescu", "Dostoievski"])
+    return SearchIndex.build(titles, authors)
+
+
+class TestTrigramIndex:
+    """Tests for similarity ranking over a vocabulary."""
+
+    def test_trigrams_are_padded(self):
+        """Test that words are padded like pg_trgm so their start weighs more than their end."""
+        assert trigrams("ion") == {"  i", " io", "ion", "on "}
+
+    def test_similar_ranks_by_jaccard(self):
+        """Test that candidates come back best first, with their similarity."""
+        vocab = ["calinescu", "eminescu", "enescu", "rebreanu"]
+        ids, scores = TrigramIndex.build(vocab).similar("eminscu", threshold=0.1)
+
+        assert [vocab[i] for i in ids] == ["eminescu", "enescu", "calinescu"]
+        assert scores.tolist() == pytest.approx([6 / 11, 3 / 12, 2 / 16])
+
+    def test_threshold_and_limit(self):
+        """Test that weak matches are dropped and at most limit tokens are returned."""
+        index = TrigramIndex.build(["calinescu", "eminescu", "enescu", "rebreanu"])
+
+        assert len(index.similar("eminscu")[0]) == 1
+        assert len(index.similar("eminscu", threshold=0.1)[0]) == 3
+        assert len(index.similar("eminscu", threshold=0.1, limit=2)[0]) == 2
+        assert len(index.similar("zzzzzz")[0]) == 0
+
+    def test_short_tokens_are_not_expanded(self):
+        """Test that one- and two-letter tokens never match fuzzily."""
+        assert len(TrigramIndex.build(["io", "ion"]).similar("io")[0]) == 0
+
+    def test_empty_vocabulary(self):
+        """Test that an empty vocabulary builds and matches nothing."""
+        assert len(TrigramIndex.build([]).similar("anything")[0]) == 0
+
+
+class TestFuzzyLookup:
+    """Tests for SearchIndex.fuzzy_lookup()."""
+
+    def test_misspelled_tokens_match(self, index: SearchIndex):
+        """Test that a typo or a transliteration finds the indexed spelling."""
+        assert index.lookup("dostoevsky").tolist() == []
+        assert index.fuzzy_lookup("dostoevsky").tolist() == [0, 4]
+        assert index.fuzzy_lookup("eminscu").tolist() == [1]
+
+    def test_prefixes_still_match(self, index: SearchIndex):
+        """Test that fuzzy search keeps every exact prefix match."""
+        assert index.fuzzy_lookup("rebr").tolist() == index.lookup("rebr").tolist() == [2]
+
+    def test_every_token_must_match(self, index: SearchIndex):
+        """Test that multi-word fuzzy queries still intersect per token."""
+        assert index.fuzzy_lookup("karamazof dostoevsky").tolist() == [4]
+        assert index.fuzzy_lookup("karamazof eminescu").tolist() == []
+
+    def test_no_tokens_means_no_restriction(self, index: SearchIndex):
+        """Test that a blank query is not a filter."""
+        assert index.fuzzy_lookup("  ") is None
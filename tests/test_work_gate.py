@@ -0,0 +1,90 @@
+"""Unit tests for the WorkGate backpressure limiter."""
+
+import threading
+
+import pytest
+
+from book_framework.catalog import Overloaded, WorkGate
+
+
+def _hold(gate: WorkGate, entered: threading.Event, release: threading.Event) -> threading.Thread:
+    def _run() -> None:
+        with gate.slot():
+            entered.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=_run)
+    thread.start()
+    assert entered.wait(5)
+    return thread
+
+
+class TestWorkGate:
+    """Tests for slot limits, queueing and shedding."""
+
+    def test_slot_is_released(self):
+        """Test that finished and failed work both give their slot back."""
+        gate = WorkGate(limit=1)
+
+        with gate.slot():
+            assert gate.in_flight == 1
+        with pytest.raises(ValueError), gate.slot():
+            raise ValueError("handler error")
+
+        assert gate.in_flight == 0
+        with gate.slot():
+            pass
+
+    def test_full_backlog_sheds_immediately(self):
+        """Test that a request beyond limit + backlog is rejected without waiting."""
+        gate = WorkGate(limit=1, backlog=0, timeout=30)
+        release = threading.Event()
+        holder = _hold(gate, threading.Event(), release)
+        try:
+            with pytest.raises(Overloaded), gate.slot():
+                pass
+        finally:
+            release.set()
+            holder.join()
+
+        assert gate.rejected == 1
+        assert gate.in_flight == 0
+
+    def test_queued_request_times_out(self):
+        """Test that a queued request gives up after the timeout."""
+        gate = WorkGate(limit=1, backlog=1, timeout=0.05)
+        release = threading.Event()
+        holder = _hold(gate, threading.Event(), release)
+        try:
+            with pytest.raises(Overloaded), gate.slot():
+                pass
+        finally:
+            release.set()
+            holder.join()
+
+        assert gate.in_flight == 0
+
+    def test_queued_request_runs_when_slot_frees(self):
+        """Test that a request within the backlog waits and then runs."""
+        gate = WorkGate(limit=1, backlog=1, timeout=5)
+        release = threading.Event()
+        holder = _hold(gate, threading.Event(), release)
+
+        ran = []
+
+        def _wait() -> None:
+            with gate.slot():
+                ran.append(True)
+
+        waiter = threading.Thread(target=_wait)
+        waiter.start()
+        release.set()
+        holder.join()
+        waiter.join()
+
+        assert ran == [True]
+
+    def test_limit_must_be_positive(self):
+        """Test that a gate without slots is refused."""
+        with pytest.raises(ValueError):
+            WorkGate(limit=0)